@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Benchmarks the PCRaster algorithms on synthetic rasters.
+
+Generates DEM, LDD, nominal, ordinal, boolean, directional and fraction rasters
+of each requested size, runs every PCRaster algorithm through the processing
+registry and records the run time, throughput in cells per second and peak
+memory use. The result cache and the LDD index are turned off while benchmarking,
+so that every run is a cold run.
+
+Results can be stored as a baseline and compared against later:
+
+    python benchmarks/benchmark.py --sizes 1000 4000 --save-baseline benchmarks/baseline.json
+    python benchmarks/benchmark.py --sizes 1000 4000 --baseline benchmarks/baseline.json
+
+The script exits with status 1 when an algorithm is slower or uses more memory than
+its baseline by more than the tolerance. It needs QGIS and PCRaster, e.g. run it
+from the environment set up by scripts/run-env-linux.sh.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy
+from osgeo import gdal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from qgis.core import (  # noqa: E402 pylint: disable=wrong-import-position
+    Qgis,
+    QgsApplication,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterFolderDestination,
+    QgsProcessingParameterMultipleLayers,
+    QgsProcessingParameterRasterDestination,
+    QgsProcessingParameterRasterLayer
+)
+
+DEFAULT_SIZES = (1000, 4000, 16000)
+
+CELL_SIZE = 25.0
+
+# rows generated per block, bounding the memory used for the synthetic rasters
+BLOCK_ROWS = 256
+
+# synthetic raster: (PCRaster value scale, GDAL data type, missing value)
+RASTERS = {
+    'dem': ('VS_SCALAR', gdal.GDT_Float32, -3.4028234663852886e+38),
+    'ldd': ('VS_LDD', gdal.GDT_Byte, 255),
+    'nominal': ('VS_NOMINAL', gdal.GDT_Int32, -2147483648),
+    'ordinal': ('VS_ORDINAL', gdal.GDT_Int32, -2147483648),
+    'boolean': ('VS_BOOLEAN', gdal.GDT_Byte, 255),
+    'directional': ('VS_DIRECTION', gdal.GDT_Float32, -3.4028234663852886e+38),
+    'fraction': ('VS_SCALAR', gdal.GDT_Float32, -3.4028234663852886e+38),
+}
+
+# words in a raster parameter description and the synthetic raster used for it, first match wins
+RASTER_KEYWORDS = (
+    (('ldd', 'drain direction', 'flow direction'), 'ldd'),
+    (('directional',), 'directional'),
+    (('fraction',), 'fraction'),
+    (('boolean', 'mask', 'points', 'viewpoints', 'outlet', 'condition', 'cells to which'), 'boolean'),
+    (('ordinal',), 'ordinal'),
+    (('class', 'nominal', 'discrete'), 'nominal'),
+)
+
+# algorithms which don't run on rasters
+SKIPPED_ALGORITHMS = ('batchrun', 'col2map', 'lookuptablefromrat')
+
+
+def synthetic_block(name: str, size: int, row: int, rows: int) -> numpy.ndarray:
+    """
+    Returns rows rows of a synthetic raster, starting at row
+    """
+    y, x = numpy.meshgrid(numpy.arange(row, row + rows, dtype=numpy.float64),
+                          numpy.arange(size, dtype=numpy.float64), indexing='ij')
+    if name == 'dem':
+        # a tilted surface with hills and some noise
+        noise = numpy.random.default_rng(row).random((rows, size))
+        return (100 + 0.05 * y + 20 * numpy.sin(x / 50) * numpy.cos(y / 70) + noise).astype(numpy.float32)
+    if name == 'ldd':
+        # cells drain to the central column, which drains south to a single pit
+        centre = size // 2
+        ldd = numpy.where(x < centre, 6, 4).astype(numpy.uint8)
+        ldd[x == centre] = 2
+        ldd[(x == centre) & (y == size - 1)] = 5
+        return ldd
+    if name in ('nominal', 'ordinal'):
+        return (1 + (x // 100) % 5 + 5 * ((y // 100) % 2)).astype(numpy.int32)
+    if name == 'boolean':
+        return ((x % 97 == 0) & (y % 89 == 0)).astype(numpy.uint8)
+    if name == 'directional':
+        return (numpy.degrees(numpy.arctan2(y - size / 2, x - size / 2)) % 360).astype(numpy.float32)
+    return numpy.full((rows, size), 0.5, dtype=numpy.float32)
+
+
+def create_rasters(folder: str, size: int) -> dict:
+    """
+    Writes the synthetic rasters of size by size cells to folder, returning their paths by name
+    """
+    paths = {}
+    driver = gdal.GetDriverByName('PCRaster')
+    for name, (value_scale, data_type, missing_value) in RASTERS.items():
+        path = os.path.join(folder, '{}.map'.format(name))
+        ds = driver.Create(path, size, size, 1, data_type, options=['PCRASTER_VALUESCALE={}'.format(value_scale)])
+        ds.SetGeoTransform((0, CELL_SIZE, 0, size * CELL_SIZE, 0, -CELL_SIZE))
+        band = ds.GetRasterBand(1)
+        band.SetNoDataValue(missing_value)
+        for row in range(0, size, BLOCK_ROWS):
+            band.WriteArray(synthetic_block(name, size, row, min(BLOCK_ROWS, size - row)), 0, row)
+        ds.FlushCache()
+        ds = None
+        paths[name] = path
+    return paths
+
+
+def current_rss():
+    """
+    Returns the resident memory of the process in bytes, or None if not known
+    """
+    try:
+        import psutil  # pylint: disable=import-outside-toplevel
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r', encoding='utf-8') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemorySampler(threading.Thread):
+    """
+    Samples the resident memory of the process while an algorithm runs
+    """
+
+    INTERVAL = 0.01
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.INTERVAL):
+            rss = current_rss()
+            if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+                self.peak_rss = rss
+
+    def peak_increase(self):
+        """
+        Stops sampling and returns the peak memory used above the memory at the start, in bytes
+        """
+        self._done.set()
+        self.join()
+        if self.start_rss is None or self.peak_rss is None:
+            return None
+        return self.peak_rss - self.start_rss
+
+
+def synthetic_raster(definition) -> str:
+    """
+    Returns the name of the synthetic raster used for a raster parameter, from its description
+    """
+    description = definition.description().lower()
+    return next((raster for keywords, raster in RASTER_KEYWORDS
+                 if any(keyword in description for keyword in keywords)), 'dem')
+
+
+def algorithm_parameters(algorithm, rasters: dict, output_folder: str):
+    """
+    Returns parameters running algorithm on the synthetic rasters, or None if a required
+    parameter has no synthetic input or default value. Multiple raster parameters get
+    the synthetic rasters of the same value scale.
+    """
+    parameters = {}
+    for definition in algorithm.parameterDefinitions():
+        name = definition.name()
+        if isinstance(definition, QgsProcessingParameterRasterLayer):
+            parameters[name] = rasters[synthetic_raster(definition)]
+        elif isinstance(definition, QgsProcessingParameterMultipleLayers) and \
+                not definition.flags() & definition.FlagOptional:
+            raster = synthetic_raster(definition)
+            value_scale = RASTERS[raster][0]
+            parameters[name] = [rasters[raster]] + [rasters[other] for other, (other_value_scale, _, _) in RASTERS.items()
+                                                    if other != raster and other_value_scale == value_scale]
+        elif isinstance(definition, QgsProcessingParameterFolderDestination):
+            parameters[name] = os.path.join(output_folder, name.lower())
+        elif isinstance(definition, QgsProcessingParameterRasterDestination):
+            parameters[name] = os.path.join(output_folder, '{}.map'.format(name.lower()))
+        elif isinstance(definition, QgsProcessingParameterFileDestination):
+            parameters[name] = os.path.join(output_folder, '{}.{}'.format(name.lower(),
+                                                                         definition.defaultFileExtension()))
+        elif definition.defaultValue() is not None:
+            parameters[name] = definition.defaultValue()
+        elif not definition.flags() & definition.FlagOptional:
+            return None
+    return parameters
+
+
+def run_algorithm(algorithm_id: str, rasters: dict, size: int, repeat: int, work_folder: str) -> dict:  # pylint: disable=too-many-locals
+    """
+    Runs an algorithm repeat times on the rasters and returns its best run time and peak memory use
+    """
+    from pcraster_tools.processing import RasterRegistry  # pylint: disable=import-outside-toplevel
+    from pcraster_tools.processing.ldd_index import LddIndex  # pylint: disable=import-outside-toplevel
+
+    registry = QgsApplication.processingRegistry()
+    algorithm = registry.createAlgorithmById(algorithm_id)
+    output_folder = tempfile.mkdtemp(dir=work_folder)
+    try:
+        parameters = algorithm_parameters(algorithm, rasters, output_folder)
+        if parameters is None:
+            return {'status': 'skipped'}
+
+        best = None
+        peak = None
+        for _ in range(repeat):
+            # read every input from disk and rebuild LDD indices, as in a new session
+            RasterRegistry.instance().clear()
+            LddIndex.clear()
+            context = QgsProcessingContext()
+            feedback = QgsProcessingFeedback()
+            sampler = MemorySampler()
+            sampler.start()
+            start = time.perf_counter()
+            try:
+                _, ok = algorithm.run(parameters, context, feedback)
+            except Exception as e:  # pylint: disable=broad-except
+                sampler.peak_increase()
+                return {'status': 'failed', 'error': str(e)}
+            elapsed = time.perf_counter() - start
+            increase = sampler.peak_increase()
+            if not ok:
+                return {'status': 'failed'}
+
+            best = elapsed if best is None else min(best, elapsed)
+            if increase is not None:
+                peak = increase if peak is None else max(peak, increase)
+
+        return {'status': 'ok',
+                'seconds': round(best, 4),
+                'cells_per_second': round(size * size / best) if best else None,
+                'peak_memory_mb': round(peak / (1024 * 1024), 1) if peak is not None else None}
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns descriptions of the runs which are slower or use more memory than in baseline
+    by more than tolerance (a fraction)
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        previous = baseline.get(key)
+        if not previous or previous.get('status') != 'ok' or result.get('status') != 'ok':
+            if previous and previous.get('status') == 'ok' and result.get('status') == 'failed':
+                regressions.append('{}: failed, was ok'.format(key))
+            continue
+
+        if result['seconds'] > previous['seconds'] * (1 + tolerance):
+            regressions.append('{}: {:.3f} s, was {:.3f} s'.format(key, result['seconds'], previous['seconds']))
+
+        memory, previous_memory = result.get('peak_memory_mb'), previous.get('peak_memory_mb')
+        # ignore small absolute differences, which are mostly noise
+        if memory is not None and previous_memory is not None and \
+                memory > previous_memory * (1 + tolerance) and memory - previous_memory > 10:
+            regressions.append('{}: {:.1f} MB, was {:.1f} MB'.format(key, memory, previous_memory))
+    return regressions
+
+
+def environment() -> dict:
+    """
+    Returns the versions of the software used for a benchmark run
+    """
+    from pcraster_tools.processing import PCRasterRuntime  # pylint: disable=import-outside-toplevel
+    return {'qgis': Qgis.version(),
+            'gdal': gdal.VersionInfo('RELEASE_NAME'),
+            'pcraster': PCRasterRuntime.version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+
+def disable_caches() -> dict:
+    """
+    Turns off the result cache and the LDD index, so that repeated runs are not reused
+    from earlier runs. Returns the previous setting values, for restore_settings().
+    """
+    from processing.core.ProcessingConfig import ProcessingConfig  # pylint: disable=import-outside-toplevel,import-error
+    from pcraster_tools.processing.settings import PCRasterSettings  # pylint: disable=import-outside-toplevel
+
+    previous = {}
+    for name in (PCRasterSettings.RESULT_CACHE, PCRasterSettings.LDD_INDEX):
+        previous[name] = ProcessingConfig.getSetting(name)
+        ProcessingConfig.setSettingValue(name, False)
+    return previous
+
+
+def restore_settings(previous: dict):
+    """
+    Restores the setting values returned by disable_caches()
+    """
+    from processing.core.ProcessingConfig import ProcessingConfig  # pylint: disable=import-outside-toplevel,import-error
+
+    for name, value in previous.items():
+        ProcessingConfig.setSettingValue(name, value)
+
+
+def start_qgis():
+    """
+    Starts a headless QGIS application with the Processing framework and the PCRaster provider
+    """
+    app = QgsApplication([], False)
+    app.initQgis()
+
+    sys.path.append(os.path.join(QgsApplication.pkgDataPath(), 'python', 'plugins'))
+    from processing.core.Processing import Processing  # pylint: disable=import-outside-toplevel,import-error
+    Processing.initialize()
+
+    from pcraster_tools.processing import PCRasterAlgorithmProvider  # pylint: disable=import-outside-toplevel
+    provider = PCRasterAlgorithmProvider()
+    QgsApplication.processingRegistry().addProvider(provider)
+    return app, provider
+
+
+def main():  # pylint: disable=too-many-locals
+    """
+    Runs the benchmark
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the PCRaster algorithms on synthetic rasters')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='raster sizes (cells per side)')
+    parser.add_argument('--algorithms', nargs='+', help='algorithm names to run, e.g. slope accuflux (default: all)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per algorithm, the fastest is kept')
+    parser.add_argument('--output', help='JSON file for the results')
+    parser.add_argument('--baseline', help='JSON file of earlier results to compare against')
+    parser.add_argument('--save-baseline', help='JSON file to store the results as a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown or memory increase against the baseline, as a fraction')
+    parser.add_argument('--work-folder', help='folder for the synthetic rasters and outputs (default: temporary)')
+    args = parser.parse_args()
+
+    app, provider = start_qgis()
+    algorithm_ids = sorted(algorithm.id() for algorithm in provider.algorithms()
+                           if algorithm.name() not in SKIPPED_ALGORITHMS and
+                           (not args.algorithms or algorithm.name() in args.algorithms))
+
+    work_folder = args.work_folder or tempfile.mkdtemp(prefix='pcraster_benchmark_')
+    results = {}
+    previous_settings = disable_caches()
+    try:
+        for size in args.sizes:
+            raster_folder = os.path.join(work_folder, 'rasters_{}'.format(size))
+            os.makedirs(raster_folder, exist_ok=True)
+            print('Creating {0}x{0} synthetic rasters'.format(size), flush=True)
+            rasters = create_rasters(raster_folder, size)
+
+            for algorithm_id in algorithm_ids:
+                key = '{}@{}'.format(algorithm_id, size)
+                results[key] = run_algorithm(algorithm_id, rasters, size, args.repeat, work_folder)
+                result = results[key]
+                if result['status'] == 'ok':
+                    print('{:<45} {:>10.3f} s {:>14,} cells/s {:>10} MB'.format(
+                        key, result['seconds'], result['cells_per_second'] or 0, result['peak_memory_mb']),
+                        flush=True)
+                else:
+                    print('{:<45} {}'.format(key, result['status']), flush=True)
+
+            shutil.rmtree(raster_folder, ignore_errors=True)
+    finally:
+        restore_settings(previous_settings)
+        if not args.work_folder:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    report = {'environment': environment(), 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print('Regression: {}'.format(regression))
+        exit_code = 1 if regressions else 0
+
+    QgsApplication.processingRegistry().removeProvider(provider)
+    app.exitQgis()
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
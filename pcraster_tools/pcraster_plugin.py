@@ -25,7 +25,10 @@ from qgis.core import (
 from qgis.gui import QgisInterface
 from qgis.PyQt.QtWidgets import QPushButton
 
-from pcraster_tools.processing import PCRasterAlgorithmProvider
+from pcraster_tools.processing import (
+    PCRasterAlgorithmProvider,
+    PCRasterRuntime
+)
 
 VERSION = '0.0.1'
 
@@ -100,9 +103,7 @@ class PCRasterToolsPlugin:
         self.initProcessing()
 
         # Show a warning if PCRaster isn't available
-        try:
-            import pcraster  # pylint: disable=import-outside-toplevel,unused-import
-        except ImportError:
+        if not PCRasterRuntime.is_available():
             show_warning(self.iface.messageBar(),
                          self.tr(
                              'PCRaster is not installed -- algorithms will not be available'),
@@ -3,3 +3,7 @@ PCRaster Processing Module
 """
 from .provider import PCRasterAlgorithmProvider
 from .algorithm import PCRasterAlgorithm
+from .raster_registry import RasterRegistry
+from .result_cache import ResultCache
+from .pcraster_runtime import PCRasterRuntime
+from .batch import BatchExecution
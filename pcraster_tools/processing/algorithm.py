@@ -17,16 +17,39 @@
 ***************************************************************************
 """
 
+import functools
+import os
+from contextlib import nullcontext
+from xml.sax.saxutils import escape
+from typing import Dict, List, Optional, Tuple
+
 from osgeo import gdal, osr
 
 from qgis.PyQt.QtCore import (
     QCoreApplication
 )
 from qgis.core import (
-    QgsProcessingAlgorithm
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterMultipleLayers,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterRasterLayer
 )
 
 from pcraster_tools.gui.gui_utils import GuiUtils
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.ldd_index import LddIndex
+from pcraster_tools.processing.parallel import ParallelExecution
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+from pcraster_tools.processing.profiler import Profiler
+from pcraster_tools.processing.raster_registry import RasterRegistry
+from pcraster_tools.processing.raster_writer import RasterWriter
+from pcraster_tools.processing.result_cache import ResultCache
+from pcraster_tools.processing.settings import PCRasterSettings
+from pcraster_tools.processing.tiling import TiledExecution
 
 
 class PCRasterAlgorithm(QgsProcessingAlgorithm):  # pylint: disable=too-many-public-methods
@@ -34,6 +57,25 @@ class PCRasterAlgorithm(QgsProcessingAlgorithm):  # pylint: disable=too-many-pub
     Base class for PCRaster Algorithms
     """
 
+    INPUT_SEED = 'SEED'
+    INPUT_STRIPS = 'STRIPS'
+
+    # algorithms drawing random values are only reused from the result cache when a seed is given
+    STOCHASTIC = False
+
+    TILING_LOCAL = 'local'
+    TILING_WINDOW = 'window'
+    TILING_GLOBAL = 'global'
+
+    # TILING_LOCAL for cell by cell operators and TILING_WINDOW for window operators
+    # which can be run in blocks of rows, TILING_GLOBAL for operators which depend on
+    # the whole raster and implement process_tiled() themselves, None otherwise.
+    # TILING_GLOBAL operators only run in strips when their strips parameter is set.
+    TILING = None
+
+    # phase timings of the current run, see processAlgorithm()
+    profiler = None
+
     def icon(self):
         """
         Returns the algorithm's icon
@@ -61,6 +103,404 @@ class PCRasterAlgorithm(QgsProcessingAlgorithm):  # pylint: disable=too-many-pub
         """
         return 'https://pcraster.geo.uu.nl/pcraster/latest/documentation/pcraster_manual/sphinx/{}'.format(path)
 
+    @staticmethod
+    def pcraster_module():
+        """
+        Returns the pcraster module, raising a QgsProcessingException if PCRaster is not available
+        """
+        pcraster = PCRasterRuntime.module()
+        if pcraster is None:
+            raise QgsProcessingException('PCRaster library is not available: {}'.format(PCRasterRuntime.error()))
+        return pcraster
+
+    def canExecute(self):  # pylint: disable=missing-function-docstring
+        if not PCRasterRuntime.is_available():
+            return False, self.tr('PCRaster library is not available')
+        return True, ''
+
+    def raster_inputs(self) -> List[str]:
+        """
+        Returns the names of the raster layer parameters which are read as PCRaster
+        fields and passed to run_operator()
+        """
+        return []
+
+    def raster_value_scales(self) -> Dict[str, str]:
+        """
+        Returns a dictionary of raster_inputs() names to the PCRaster value scale names the
+        operator expects, used for rasters without value scale metadata (e.g. an LDD or a Boolean
+        mask in a Byte GeoTIFF) instead of guessing it from the data type
+        """
+        return {}
+
+    def clone_input(self) -> Optional[str]:
+        """
+        Returns the name of the raster layer parameter used as the clone map and as the
+        source of the output CRS. Defaults to the first of raster_inputs().
+        """
+        inputs = self.raster_inputs()
+        return inputs[0] if inputs else None
+
+    def global_options(self, parameters, context) -> List[str]:  # pylint: disable=unused-argument
+        """
+        Returns the PCRaster global options to set before running the operator
+        """
+        return []
+
+    def run_operator(self, pcr, rasters: Dict[str, object], parameters, context, feedback) -> Dict[str, object]:
+        """
+        Runs the PCRaster operation.
+
+        pcr is the pcraster module and rasters maps the names from raster_inputs() to the
+        fields read from those layers. Returns a dictionary of raster destination parameter
+        names to the resulting fields.
+        """
+        raise QgsProcessingException('Algorithm {} does not define a PCRaster operation'.format(self.id()))
+
+    def ldd_index(self, pcr, parameters, name: str, ldd, context, *,  # pylint: disable=too-many-arguments
+                  in_memory: bool = False) -> Optional[LddIndex]:
+        """
+        Returns the flow graph index of the LDD layer parameter name, whose field is ldd,
+        or None if LDD indices are disabled or the LDD is better left to PCRaster. With
+        in_memory, the index is built and kept in memory only when LDD indices are disabled.
+        """
+        folder = PCRasterSettings.ldd_index_folder()
+        if folder is None and not in_memory:
+            return None
+        path = self.parameterAsRasterLayer(parameters, name, context).dataProvider().dataSourceUri()
+        with self.phase('ldd index'):
+            index = LddIndex.for_file(path, lambda: pcr.pcr2numpy(ldd, 0), folder)
+        clone = pcr.clone()
+        if index.shape != (clone.nrRows(), clone.nrCols()) or not index.efficient():
+            return None
+        return index
+
+    def parameter_as_option(self, parameters, name: str, context, options) -> str:
+        """
+        Returns the PCRaster global option from options which corresponds to the value of
+        the enum parameter name
+        """
+        return options[self.parameterAsEnum(parameters, name, context)]
+
+    def add_seed_parameter(self):
+        """
+        Adds the optional random seed parameter, for algorithms drawing random values
+        """
+        param = QgsProcessingParameterNumber(
+            self.INPUT_SEED,
+            self.tr('Random seed'),
+            type=QgsProcessingParameterNumber.Integer,
+            minValue=1,
+            optional=True
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+    def add_strips_parameter(self):
+        """
+        Adds the parameter which runs a TILING_GLOBAL algorithm in strips, with a method of
+        its own rather than the PCRaster operator, whose results can differ
+        """
+        param = QgsProcessingParameterBoolean(
+            self.INPUT_STRIPS,
+            self.tr('Use the strip-wise method instead of PCRaster (for rasters larger than memory)'),
+            defaultValue=False
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+    def runs_tiled(self, parameters, context) -> bool:
+        """
+        Returns True if the algorithm is run in blocks of rows: with the tile rows or worker
+        processes settings, and for TILING_GLOBAL algorithms only with their strips parameter
+        """
+        if self.TILING == self.TILING_GLOBAL:
+            return self.parameterDefinition(self.INPUT_STRIPS) is not None and \
+                self.parameterAsBoolean(parameters, self.INPUT_STRIPS, context)
+        return self.TILING is not None and (PCRasterSettings.tile_rows() or PCRasterSettings.worker_count() > 1)
+
+    def random_seed(self, parameters, context) -> Optional[int]:
+        """
+        Returns the random seed given for the algorithm, or None if no seed was given
+        """
+        if self.parameterDefinition(self.INPUT_SEED) is None or parameters.get(self.INPUT_SEED) in (None, ''):
+            return None
+        return self.parameterAsInt(parameters, self.INPUT_SEED, context)
+
+    def result_cache_key(self, parameters, context) -> Optional[str]:
+        """
+        Returns the key identifying the results of the algorithm in the result cache, built from
+        the hashes of the input files, the parameter values, the PCRaster global options, the
+        output file formats and the GeoTIFF writer settings. Returns None if the results can't be cached.
+        """
+        if self.STOCHASTIC and self.random_seed(parameters, context) is None:
+            return None
+
+        cache = ResultCache.instance()
+        input_hashes = {}
+        parameter_values = {}
+        for definition in self.parameterDefinitions():
+            if definition.isDestination():
+                continue
+
+            name = definition.name()
+            if isinstance(definition, QgsProcessingParameterFile) \
+                    and definition.behavior() == QgsProcessingParameterFile.File:
+                path = self.parameterAsFile(parameters, name, context)
+                file_hash = cache.file_hash(path) if path else None
+                if path and file_hash is None:
+                    return None
+                input_hashes[name] = [file_hash]
+                continue
+            if isinstance(definition, QgsProcessingParameterRasterLayer):
+                layers = [self.parameterAsRasterLayer(parameters, name, context)]
+            elif isinstance(definition, QgsProcessingParameterMultipleLayers):
+                layers = self.parameterAsLayerList(parameters, name, context)
+            else:
+                parameter_values[name] = definition.valueAsPythonString(parameters.get(name), context)
+                continue
+
+            hashes = []
+            for layer in layers:
+                if layer is None:
+                    hashes.append(None)
+                    continue
+                file_hash = cache.file_hash(layer.dataProvider().dataSourceUri())
+                if file_hash is None:
+                    # not a file based layer
+                    return None
+                hashes.append([file_hash, layer.crs().toWkt()])
+            input_hashes[name] = hashes
+
+        output_formats = {name: os.path.splitext(path)[1].lower()
+                          for name, path in self.output_files(parameters, context).items()}
+        writer_settings = {}
+        if any(extension in RasterWriter.GEOTIFF_EXTENSIONS for extension in output_formats.values()):
+            writer_settings = {'compression': PCRasterSettings.geotiff_compression(),
+                               'overviews': PCRasterSettings.geotiff_overviews(),
+                               'cog': RasterWriter.use_cog()}
+
+        return ResultCache.key(self.id(), input_hashes, parameter_values,
+                               self.global_options(parameters, context),
+                               output_formats=output_formats, writer_settings=writer_settings)
+
+    def tile_halo(self, parameters, context, cell_size: float) -> int:
+        """
+        Returns the number of rows to add above and below each block in tiled execution.
+        Window operators use their INPUT_WINDOWLENGTH and INPUT_UNITS parameters.
+        """
+        if self.TILING != self.TILING_WINDOW:
+            return 0
+
+        window_length = self.parameterAsDouble(parameters, self.INPUT_WINDOWLENGTH, context)  # pylint: disable=no-member
+        true_units = self.parameterAsEnum(parameters, self.INPUT_UNITS, context) == 0  # pylint: disable=no-member
+        return TiledExecution.window_halo(window_length, cell_size, true_units)
+
+    def tile_operator(self, parameters, context) -> Optional[Tuple[str, tuple]]:  # pylint: disable=unused-argument
+        """
+        Returns the operator as a (pcraster function name, arguments) tuple, for algorithms whose
+        run_operator() calls a single pcraster function with the raster_inputs() followed by
+        arguments. Algorithms returning an operator can run their blocks in parallel worker processes.
+        """
+        return None
+
+    def output_files(self, parameters, context) -> Dict[str, str]:
+        """
+        Returns the dictionary of raster destination parameter names to output file paths
+        """
+        return {definition.name(): self.parameterAsOutputLayer(parameters, definition.name(), context)
+                for definition in self.destinationParameterDefinitions()}
+
+    def process_tiled(self, pcr, parameters, context, feedback, output_files: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        Runs the operator in blocks of rows. Returns the dictionary of output names to file paths,
+        or None if the inputs can't be processed in blocks and the algorithm should be run on the
+        whole rasters instead.
+        """
+        inputs = {}
+        for name in self.raster_inputs():
+            inputs[name] = self.parameterAsRasterLayer(parameters, name, context).dataProvider().dataSourceUri()
+
+        clone_layer = self.parameterAsRasterLayer(parameters, self.clone_input(), context)
+        halo = self.tile_halo(parameters, context, clone_layer.rasterUnitsPerPixelX())
+        # the CRS is set while creating the outputs, rather than by reopening them afterwards
+        crs_wkt = self.gdal_crs_wkt(clone_layer.crs())
+
+        workers = PCRasterSettings.worker_count()
+        operator = self.tile_operator(parameters, context) if workers > 1 else None
+        if operator is not None and len(output_files) == 1:
+            name, output_file = next(iter(output_files.items()))
+            output_file = ParallelExecution.run(self, list(inputs.values()), output_file, operator=operator,
+                                                options=self.global_options(parameters, context), halo=halo,
+                                                workers=workers, strip_rows=PCRasterSettings.tile_rows(),
+                                                feedback=feedback, crs_wkt=crs_wkt)
+            outputs = {name: output_file} if output_file is not None else None
+        elif PCRasterSettings.tile_rows():
+            outputs = TiledExecution.run(self, pcr, inputs, output_files, strip_rows=PCRasterSettings.tile_rows(),
+                                         halo=halo, parameters=parameters, context=context, feedback=feedback,
+                                         crs_wkt=crs_wkt)
+        else:
+            outputs = None
+
+        return outputs
+
+    def phase(self, name: str):
+        """
+        Returns a context manager recording the time spent in a phase of the current run
+        """
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring
+        self.profiler = Profiler(self.id() or self.name())
+        status = 'failed'
+        try:
+            outputs = self.process_phases(parameters, context, feedback)
+            status = 'canceled' if feedback.isCanceled() else 'ok'
+            return outputs
+        finally:
+            self.profiler.report(feedback)
+            log_file = PCRasterSettings.profile_log()
+            if log_file:
+                try:
+                    self.profiler.write_log(log_file, status)
+                except OSError as e:
+                    feedback.reportError(self.tr('Could not write profile log {}: {}').format(log_file, e))
+            self.profiler = None
+
+    def process_phases(self, parameters, context, feedback) -> Dict[str, str]:  # pylint: disable=too-many-locals
+        """
+        Runs the algorithm, timing each phase: reading the inputs, running the operator,
+        writing the outputs and assigning their CRS
+        """
+        pcr = self.pcraster_module()
+
+        output_files = None
+        cache_folder = PCRasterSettings.result_cache_folder()
+        cache_key = self.result_cache_key(parameters, context) if cache_folder else None
+        if cache_key is not None:
+            output_files = self.output_files(parameters, context)
+            with self.phase('result cache'):
+                fetched = ResultCache.instance().fetch(cache_folder, cache_key, output_files)
+            if fetched:
+                feedback.pushInfo(self.tr('Reusing cached results from an identical run'))
+                return output_files
+
+        for option in self.global_options(parameters, context):
+            pcr.setglobaloption(option)
+
+        seed = self.random_seed(parameters, context)
+        if seed is not None:
+            pcr.setrandomseed(seed)
+
+        outputs = None
+        if self.runs_tiled(parameters, context):
+            if output_files is None:
+                output_files = self.output_files(parameters, context)
+            with self.phase('tiled'):
+                outputs = self.process_tiled(pcr, parameters, context, feedback, output_files)
+
+        if outputs is None:
+            clone_layer = self.parameterAsRasterLayer(parameters, self.clone_input(), context)
+            with self.phase('read'):
+                GdalLoader.set_clone(pcr, clone_layer.dataProvider().dataSourceUri())
+
+                rasters = {}
+                value_scales = self.raster_value_scales()
+                for name in self.raster_inputs():
+                    rasters[name] = self.read_raster(self.parameterAsRasterLayer(parameters, name, context),
+                                                     value_scales.get(name))
+
+            with self.phase('operator'):
+                results = self.run_operator(pcr, rasters, parameters, context, feedback)
+
+            outputs = self.report_outputs(results, parameters, context, feedback, crs=clone_layer.crs(),
+                                          output_files=output_files)
+
+        if cache_key is not None and not feedback.isCanceled():
+            with self.phase('result cache'):
+                ResultCache.instance().store(cache_folder, cache_key, outputs, PCRasterSettings.result_cache_size())
+        return outputs
+
+    def report_outputs(self, results: Dict[str, object], parameters, context, feedback, *, crs=None,
+                       output_files: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Writes the fields from results to their raster destination parameters and assigns crs
+        to them. output_files optionally gives the already resolved output file paths.
+        Returns the dictionary of output parameter names to file paths.
+        """
+        outputs = {}
+        crs_wkt = self.gdal_crs_wkt(crs) if crs is not None else ''
+        for name, field in results.items():
+            if output_files and name in output_files:
+                output_file_path = output_files[name]
+            else:
+                output_file_path = self.parameterAsOutputLayer(parameters, name, context)
+            with self.phase('report'):
+                self.report_raster(field, output_file_path, crs_wkt)
+            # the CRS of GeoTIFF outputs is set while writing them
+            if crs is not None and not RasterWriter.is_geotiff(output_file_path):
+                with self.phase('crs'):
+                    self.set_output_crs(output_file=output_file_path, crs=crs, feedback=feedback, context=context)
+            outputs[name] = output_file_path
+
+        return outputs
+
+    @staticmethod
+    def field_size(pcr) -> int:
+        """
+        Returns the estimated memory used by a field covering the current clone, in bytes
+        """
+        clone = pcr.clone()
+        # cells are stored as at most 4 bytes (REAL4/INT4)
+        return clone.nrRows() * clone.nrCols() * 4
+
+    @staticmethod
+    def read_raster(source, value_scale_name: Optional[str] = None):
+        """
+        Reads a raster layer or file path as a PCRaster field. Rasters in other formats than
+        PCRaster .map are read through GDAL, with value_scale_name as their value scale if
+        they have no value scale metadata.
+
+        Decoded fields are kept in the RasterRegistry read cache, so reading a file which was
+        read or written earlier in this session on the same clone and has not changed since
+        returns the cached field instead of reading the file again.
+        """
+        path = source if isinstance(source, str) else source.dataProvider().dataSourceUri()
+
+        pcr = PCRasterAlgorithm.pcraster_module()
+        clone = RasterRegistry.clone_geometry(pcr.clone())
+        registry = RasterRegistry.instance()
+        registry.set_max_size(PCRasterSettings.read_cache_size())
+        field = registry.field(path, clone)
+        if field is not None and (value_scale_name is None or field.dataType().name == value_scale_name
+                                  or GdalLoader.is_pcraster_map(path)):
+            return field
+
+        if GdalLoader.is_pcraster_map(path):
+            field = pcr.readmap(path)
+        else:
+            field = GdalLoader.read_field(pcr, path, expected=value_scale_name)
+        registry.register(path, field, PCRasterAlgorithm.field_size(pcr), clone)
+        return field
+
+    @staticmethod
+    def report_raster(field, output_file: str, crs_wkt: str = ''):
+        """
+        Writes a PCRaster field to output_file, as PCRaster map or, for .tif files, as
+        GeoTIFF with the CRS crs_wkt. The live field is kept available for subsequent
+        algorithms which read the same file.
+        """
+        pcr = PCRasterAlgorithm.pcraster_module()
+        if RasterWriter.is_geotiff(output_file):
+            RasterWriter.write_field(pcr, field, output_file, crs_wkt)
+        else:
+            pcr.report(field, output_file)
+
+        registry = RasterRegistry.instance()
+        registry.set_max_size(PCRasterSettings.read_cache_size())
+        registry.register(output_file, field, PCRasterAlgorithm.field_size(pcr),
+                          RasterRegistry.clone_geometry(pcr.clone()))
+
     @staticmethod
     def set_output_crs(output_file: str, crs, context, feedback) -> bool:
         """
@@ -75,6 +515,53 @@ class PCRasterAlgorithm(QgsProcessingAlgorithm):  # pylint: disable=too-many-pub
         crs_wkt = crs.toWkt(QgsCoordinateReferenceSystem.WKT_PREFERRED_GDAL)
         return PCRasterAlgorithm.set_output_crs_wkt(output_file, crs_wkt, context, feedback)
 
+    @staticmethod
+    def gdal_crs_wkt(crs) -> str:
+        """
+        Returns the WKT of a CRS as assigned to GDAL datasets, or an empty string if the CRS is invalid
+        """
+        if not crs.isValid():
+            return ''
+
+        # can't import this on CI -- causes a segfault
+        from qgis.core import QgsCoordinateReferenceSystem  # pylint: disable=import-outside-toplevel
+        res, wkt, _ = PCRasterAlgorithm.parse_crs(crs.toWkt(QgsCoordinateReferenceSystem.WKT_PREFERRED_GDAL))
+        return '' if res else wkt
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def parse_crs(crs_wkt: str) -> Tuple[int, str, str]:
+        """
+        Parses a CRS definition once per session. Returns the GDAL result code, the WKT
+        and the data axis to CRS axis mapping written to .aux.xml files.
+        """
+        sr = osr.SpatialReference()
+        res = sr.SetFromUserInput(crs_wkt)
+        if res:
+            return res, '', ''
+
+        sr.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        return 0, sr.ExportToWkt(), ','.join(str(axis) for axis in sr.GetDataAxisToSRSAxisMapping())
+
+    @staticmethod
+    def write_crs_sidecar(output_file: str, wkt: str, axis_mapping: str) -> bool:
+        """
+        Writes the CRS of a PCRaster map to a new .aux.xml file, as GDAL does, without
+        opening the map. Returns False if the output is not a PCRaster map or already has
+        an .aux.xml file, which must then be updated through GDAL.
+        """
+        sidecar = output_file + '.aux.xml'
+        if os.path.splitext(output_file)[1].lower() != '.map' or os.path.exists(sidecar):
+            return False
+
+        try:
+            with open(sidecar, 'w', encoding='utf-8') as f:
+                f.write('<PAMDataset>\n  <SRS dataAxisToSRSAxisMapping="{}">{}</SRS>\n</PAMDataset>\n'.format(
+                    axis_mapping, escape(wkt)))
+        except OSError:
+            return False
+        return True
+
     @staticmethod
     def set_output_crs_wkt(output_file: str, crs_wkt: str, context, feedback) -> bool:  # pylint: disable=unused-argument
         """
@@ -83,20 +570,25 @@ class PCRasterAlgorithm(QgsProcessingAlgorithm):  # pylint: disable=too-many-pub
         if not crs_wkt:
             return False
 
-        ds = gdal.Open(output_file, gdal.GA_Update)
-        assert ds
-        sr = osr.SpatialReference()
-        res = sr.SetFromUserInput(str(crs_wkt))
+        res, wkt, axis_mapping = PCRasterAlgorithm.parse_crs(str(crs_wkt))
         if res and feedback:
             feedback.reportError(QCoreApplication.translate('PCRasterTools', 'Could not create output layer CRS . GDAL result code {}').format(res))
         if res:
             return False
 
-        wkt = sr.ExportToWkt()
+        if PCRasterAlgorithm.write_crs_sidecar(output_file, wkt, axis_mapping):
+            return True
+
+        ds = gdal.Open(output_file, gdal.GA_Update)
+        assert ds
         res = ds.SetProjection(wkt)
         if res and feedback:
             feedback.reportError(QCoreApplication.translate('PCRasterTools', 'Could not assign CRS to output layer. GDAL result code {}').format(res))
         if res:
             return False
 
+        # closing the dataset may touch the file, but the cell values are unchanged
+        ds = None
+        RasterRegistry.instance().refresh(output_file)
+
         return True
@@ -1,106 +1,24 @@
 """
 PCRaster Processing algorithms
+
+Algorithm modules are imported on first access to their class, see manifest.py
 """
-from .col2map import Col2mapAlgorithm
-from .map2col import Map2colAlgorithm
-from .convert_to_pcraster import ConvertToPCRasterAlgorithm
-from .lookuptablefromrat import LookupTableFromRat
-from .pcraster_abs_algorithm import PCRasterAbsAlgorithm
-from .pcraster_accucapacityflux_algorithm import PCRasterAccucapacityfluxAlgorithm
-from .pcraster_accuflux_algorithm import PCRasterAccuFluxAlgorithm
-from .pcraster_accufractionflux_algorithm import PCRasterAccufractionfluxAlgorithm
-from .pcraster_accuthresholdflux_algorithm import PCRasterAccuthresholdfluxAlgorithm
-from .pcraster_accutraveltimeflux_algorithm import PCRasterAccutraveltimefluxAlgorithm
-from .pcraster_accutraveltimefractionflux_algorithm import PCRasterAccutraveltimefractionfluxAlgorithm
-from .pcraster_accutriggerflux_algorithm import PCRasterAccutriggerfluxAlgorithm
-from .pcraster_acos_algorithm import PCRasterAcosAlgorithm
-from .pcraster_areaarea_algorithm import PCRasterAreaareaAlgorithm
-from .pcraster_areaaverage_algorithm import PCRasterAreaaverageAlgorithm
-from .pcraster_areadiversity_algorithm import PCRasterAreadiversityAlgorithm
-from .pcraster_areamajority_algorithm import PCRasterAreamajorityAlgorithm
-from .pcraster_areamaximum_algorithm import PCRasterAreamaximumAlgorithm
-from .pcraster_areaminimum_algorithm import PCRasterAreaminimumAlgorithm
-from .pcraster_areanormal_algorithm import PCRasterAreanormalAlgorithm
-from .pcraster_areaorder_algorithm import PCRasterAreaorderAlgorithm
-from .pcraster_areatotal_algorithm import PCRasterAreatotalAlgorithm
-from .pcraster_areauniform_algorithm import PCRasterAreauniformAlgorithm
-from .pcraster_asin_algorithm import PCRasterAsinAlgorithm
-from .pcraster_aspect_algorithm import PCRasterAspectAlgorithm
-from .pcraster_atan_algorithm import PCRasterAtanAlgorithm
-from .pcraster_booleanoperators_algorithm import PCRasterBooleanOperatorsAlgorithm
-from .pcraster_catchment_algorithm import PCRasterCatchmentAlgorithm
-from .pcraster_catchmenttotal_algorithm import PCRasterCatchmenttotalAlgorithm
-from .pcraster_cellarea_algorithm import PCRastercellareaAlgorithm
-from .pcraster_celllength_algorithm import PCRastercelllengthAlgorithm
-from .pcraster_clump_algorithm import PCRasterClumpAlgorithm
-from .pcraster_comparisonoperators_algorithm import PCRasterComparisonOperatorsAlgorithm
-from .pcraster_convertdatatype_algorithm import PCRasterConvertdatatypeAlgorithm
-from .pcraster_cos_algorithm import PCRastercosAlgorithm
-from .pcraster_cover_algorithm import PCRasterCoverAlgorithm
-from .pcraster_defined_algorithm import PCRasterDefinedAlgorithm
-from .pcraster_downstream_algorithm import PCRasterDownstreamAlgorithm
-from .pcraster_downstreamdist_algorithm import PCRasterDownstreamdistAlgorithm
-from .pcraster_exp_algorithm import PCRasterexpAlgorithm
-from .pcraster_extentofview_algorithm import PCRasterExtentofviewAlgorithm
-from .pcraster_fac_algorithm import PCRasterfacAlgorithm
-from .pcraster_horizontan_algorithm import PCRasterHorizontanAlgorithm
-from .pcraster_ifthen_algorithm import PCRasterIfThenAlgorithm
-from .pcraster_ifthenelse_algorithm import PCRasterIfThenElseAlgorithm
-from .pcraster_inversedistance_algorithm import PCRasterInversedistanceAlgorithm
-from .pcraster_lddcreate_algorithm import PCRasterLDDCreateAlgorithm
-from .pcraster_lddcreatedem_algorithm import PCRasterLDDCreateDEMAlgorithm
-from .pcraster_ldddist_algorithm import PCRasterLDDDistAlgorithm
-from .pcraster_lddmask_algorithm import PCRasterLddMaskAlgorithm
-from .pcraster_lddrepair_algorithm import PCRasterlddrepairAlgorithm
-from .pcraster_ln_algorithm import PCRasterlnAlgorithm
-from .pcraster_log10_algorithm import PCRasterlog10Algorithm
-from .pcraster_lookup_algorithm import PCRasterLookupAlgorithm
-from .pcraster_lookuplinear_algorithm import PCRasterLookuplinearAlgorithm
-from .pcraster_maparea_algorithm import PCRasterMapareaAlgorithm
-from .pcraster_mapmaximum_algorithm import PCRasterMapmaximumAlgorithm
-from .pcraster_mapminimum_algorithm import PCRasterMapminimumAlgorithm
-from .pcraster_mapnormal_algorithm import PCRasterMapnormalAlgorithm
-from .pcraster_maptotal_algorithm import PCRasterMaptotalAlgorithm
-from .pcraster_mapuniform_algorithm import PCRasterMapuniformAlgorithm
-from .pcraster_nodirection_algorithm import PCRasterNodirectionAlgorithm
-from .pcraster_normal_algorithm import PCRasterNormalAlgorithm
-from .pcraster_order_algorithm import PCRasterorderAlgorithm
-from .pcraster_path_algorithm import PCRasterPathAlgorithm
-from .pcraster_pit_algorithm import PCRasterPitAlgorithm
-from .pcraster_plancurv_algorithm import PCRasterPlancurvAlgorithm
-from .pcraster_pred_algorithm import PCRasterpredAlgorithm
-from .pcraster_profcurv_algorithm import PCRasterProfcurvAlgorithm
-from .pcraster_rounddown_algorithm import PCRasterrounddownAlgorithm
-from .pcraster_roundoff_algorithm import PCRasterroundoffAlgorithm
-from .pcraster_roundup_algorithm import PCRasterroundupAlgorithm
-from .pcraster_sin_algorithm import PCRastersinAlgorithm
-from .pcraster_slope_algorithm import PCRasterSlopeAlgorithm
-from .pcraster_slopelength_algorithm import PCRasterSlopelengthAlgorithm
-from .pcraster_spatial_algorithm import PCRasterSpatialAlgorithm
-from .pcraster_spread_algorithm import PCRasterSpreadAlgorithm
-from .pcraster_spreadldd_algorithm import PCRasterSpreadlddAlgorithm
-from .pcraster_spreadlddzone_algorithm import PCRasterSpreadlddzoneAlgorithm
-from .pcraster_spreadmax_algorithm import PCRasterSpreadmaxAlgorithm
-from .pcraster_spreadmaxzone_algorithm import PCRasterSpreadmaxzoneAlgorithm
-from .pcraster_spreadzone_algorithm import PCRasterSpreadzoneAlgorithm
-from .pcraster_sqr_algorithm import PCRastersqrAlgorithm
-from .pcraster_sqrt_algorithm import PCRastersqrtAlgorithm
-from .pcraster_streamorder_algorithm import PCRasterStreamOrderAlgorithm
-from .pcraster_subcatchment_algorithm import PCRasterSubcatchmentAlgorithm
-from .pcraster_succ_algorithm import PCRastersuccAlgorithm
-from .pcraster_tan_algorithm import PCRastertanAlgorithm
-from .pcraster_transient_algorithm import PCRasterTransientAlgorithm
-from .pcraster_uniform_algorithm import PCRasterUniformAlgorithm
-from .pcraster_uniqueid_algorithm import PCRasterUniqueidAlgorithm
-from .pcraster_upstream_algorithm import PCRasterUpstreamAlgorithm
-from .pcraster_view_algorithm import PCRasterViewAlgorithm
-from .pcraster_window4total_algorithm import PCRasterwindow4totalAlgorithm
-from .pcraster_windowaverage_algorithm import PCRasterWindowAverageAlgorithm
-from .pcraster_windowdiversity_algorithm import PCRasterWindowDiversityAlgorithm
-from .pcraster_windowhighpass_algorithm import PCRasterWindowHighPassAlgorithm
-from .pcraster_windowmajority_algorithm import PCRasterWindowMajorityAlgorithm
-from .pcraster_windowmaximum_algorithm import PCRasterWindowMaximumAlgorithm
-from .pcraster_windowminimum_algorithm import PCRasterWindowMinimumAlgorithm
-from .pcraster_windowtotal_algorithm import PCRasterWindowTotalAlgorithm
-from .resample import ResampleAlgorithm
-from .pcraster_not_algorithm import PCRasterNotAlgorithm
+import importlib
+
+from .manifest import ALGORITHMS
+
+_CLASS_MODULES = {entry.class_name: entry.module for entry in ALGORITHMS}
+
+
+def __getattr__(name):
+    """
+    Imports algorithm classes on first access
+    """
+    module = _CLASS_MODULES.get(name)
+    if module is None:
+        raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+    return getattr(importlib.import_module('.{}'.format(module), __name__), name)
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_CLASS_MODULES.keys()))
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import csv
+import json
+import os
+
+from qgis.core import (QgsProcessingException,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterFileDestination,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingOutputNumber)
+
+from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.algorithms.manifest import ALGORITHMS
+from pcraster_tools.processing.batch import BatchExecution
+
+
+class BatchRunAlgorithm(PCRasterAlgorithm):
+    """
+    Runs a PCRaster algorithm on many input sets using a pool of worker processes
+    """
+
+    INPUT_ALGORITHM = 'ALGORITHM'
+    INPUT_TABLE = 'TABLE'
+    INPUT_WORKERS = 'WORKERS'
+    OUTPUT_REPORT = 'OUTPUT'
+    OUTPUT_SUCCEEDED = 'SUCCEEDED'
+    OUTPUT_FAILED = 'FAILED'
+
+    @staticmethod
+    def batch_algorithms():
+        """
+        Returns the manifest entries of the algorithms which can be run in a batch
+        """
+        return [entry for entry in ALGORITHMS if entry.module != 'batch_run']
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return BatchRunAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'batchrun'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Batch run PCRaster algorithm')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Data management')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'data'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr(
+            """Runs a PCRaster algorithm on many input sets in parallel worker processes.
+
+            Parameters:
+
+            * <b>Algorithm</b> (required) - the PCRaster algorithm to run
+            * <b>Batch table</b> (required) - CSV file with a column per algorithm parameter name (e.g. INPUT, OUTPUT) and a row per run. Empty cells use the parameter's default value
+            * <b>Worker processes</b> (required) - number of input sets run at the same time, 0 for the number of CPU cores
+            * <b>Report</b> (required) - CSV file with the status, run time, error and outputs of each input set
+            """
+        )
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.INPUT_ALGORITHM,
+                self.tr('Algorithm'),
+                ['{} ({})'.format(self.tr(entry.display_name), entry.name) for entry in self.batch_algorithms()]
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFile(
+                self.INPUT_TABLE,
+                self.tr('Batch table'),
+                extension='csv'
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.INPUT_WORKERS,
+                self.tr('Worker processes'),
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=0,
+                minValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.OUTPUT_REPORT,
+                self.tr('Report'),
+                self.tr('CSV files (*.csv)')
+            )
+        )
+
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_SUCCEEDED, self.tr('Succeeded input sets')))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_FAILED, self.tr('Failed input sets')))
+
+    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        entry = self.batch_algorithms()[self.parameterAsEnum(parameters, self.INPUT_ALGORITHM, context)]
+        items = BatchExecution.read_table(self.parameterAsFile(parameters, self.INPUT_TABLE, context))
+        if not items:
+            raise QgsProcessingException(self.tr('The batch table has no input sets'))
+        BatchExecution.check_parameters(BatchExecution.create_algorithm(entry.name), items)
+
+        workers = self.parameterAsInt(parameters, self.INPUT_WORKERS, context) or os.cpu_count() or 1
+        feedback.pushInfo(self.tr('Running {} on {} input sets with {} worker processes').format(
+            entry.name, len(items), min(workers, len(items))))
+        results = BatchExecution.run(entry.name, items, workers, feedback)
+
+        report_file = self.parameterAsFileOutput(parameters, self.OUTPUT_REPORT, context)
+        with open(report_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['input_set', 'status', 'seconds', 'error', 'outputs'])
+            for result in results:
+                writer.writerow([result.index + 1, 'ok' if result.ok else 'failed', '{:.3f}'.format(result.elapsed),
+                                 result.error, json.dumps(result.results)])
+
+        succeeded = sum(1 for result in results if result.ok)
+        return {self.OUTPUT_REPORT: report_file,
+                self.OUTPUT_SUCCEEDED: succeeded,
+                self.OUTPUT_FAILED: len(results) - succeeded}
@@ -11,7 +11,7 @@
 ***************************************************************************
 """
 
-import os
+import numpy
 
 from qgis.core import (QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterEnum,
@@ -20,6 +20,12 @@ from qgis.core import (QgsProcessingParameterRasterLayer,
                        )
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.column_files import (
+    CellAggregator,
+    ColumnFiles
+)
+from pcraster_tools.processing.tiling import TiledExecution
 
 
 class Col2mapAlgorithm(PCRasterAlgorithm):
@@ -30,8 +36,24 @@ class Col2mapAlgorithm(PCRasterAlgorithm):
     INPUT_CSV = 'INPUT'
     INPUT_MASK = 'INPUT1'
     INPUT_DATATYPE = 'INPUT2'
+    INPUT_AGGREGATION = 'AGGREGATION'
     OUTPUT_PCRASTER = 'OUTPUT'
 
+    # (PCRaster value scale, default aggregation) for the output data types
+    DATATYPES = (
+        ('Boolean', CellAggregator.MAJORITY),
+        ('Nominal', CellAggregator.MAJORITY),
+        ('Ordinal', CellAggregator.MAJORITY),
+        ('Scalar', CellAggregator.AVERAGE),
+        ('Directional', CellAggregator.AVERAGE),
+        ('Ldd', CellAggregator.MAJORITY),
+        ('Nominal', CellAggregator.MAJORITY),
+        ('Ordinal', CellAggregator.MAJORITY),
+        ('Directional', CellAggregator.AVERAGE),
+    )
+
+    AGGREGATIONS = (CellAggregator.MAJORITY, CellAggregator.AVERAGE, CellAggregator.HIGHEST, CellAggregator.LOWEST)
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return Col2mapAlgorithm()
 
@@ -45,12 +67,14 @@ class Col2mapAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr(
             """
-            Convert CSV files to PCRaster format with control of the output data type. The algorithm uses <a href="{}">col2map</a>
+            Convert CSV files to PCRaster format with control of the output data type. The algorithm works like <a href="{}">col2map</a>
+            The first three columns of the file hold the x and y coordinates and the value, separated by whitespace or commas. Values of 1e31 are treated as missing values.
+            When several values fall in the same cell they are aggregated with the chosen method. By default the majority (the most frequent value, the highest one on ties) is used for boolean, nominal, ordinal and LDD maps and the average for scalar and directional maps.
             For nominal and ordinal maps you can choose between small and large integers. With small integers you can store values from 0 to 255. Only choose large when you have higher numbers.
             """).format(PCRasterAlgorithm.documentation_url('app_col2map.html'))
 
@@ -80,6 +104,17 @@ class Col2mapAlgorithm(PCRasterAlgorithm):
             )
         )
 
+        aggregations = [self.tr('Default for the data type'), self.tr('Majority'), self.tr('Average'),
+                        self.tr('Highest'), self.tr('Lowest')]
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.INPUT_AGGREGATION,
+                self.tr('Aggregation of values in the same cell'),
+                aggregations,
+                defaultValue=0
+            )
+        )
+
         # We add a feature sink in which to store our processed features (this
         # usually takes the form of a newly created vector layer when the
         # algorithm is run in QGIS).
@@ -91,45 +126,42 @@ class Col2mapAlgorithm(PCRasterAlgorithm):
         )
 
     def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
+        pcr = self.pcraster_module()
+
         input_mask = self.parameterAsRasterLayer(parameters, self.INPUT_MASK, context)
         clone = input_mask.dataProvider().dataSourceUri()
-        # print(input_dem.dataProvider().dataSourceUri())
 
         table = self.parameterAsFile(parameters, self.INPUT_CSV, context)
 
         dst_filename = self.parameterAsOutputLayer(parameters, self.OUTPUT_PCRASTER, context)
 
         input_datatype = self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)
-        if input_datatype == 0:
-            cmd = 'col2map -B "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 1:
-            cmd = 'col2map -N "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 2:
-            cmd = 'col2map -O "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 3:
-            cmd = 'col2map -S "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 4:
-            cmd = 'col2map -D "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 5:
-            cmd = 'col2map -L "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 6:
-            cmd = 'col2map -N --large "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        elif input_datatype == 7:
-            cmd = 'col2map -O --large "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-        else:
-            cmd = 'col2map -D --radians "{}" "{}" --clone "{}"'.format(table, dst_filename, clone)
-            feedback.pushInfo('Running command {}'.format(cmd))
-
-        os.system(cmd)
-
-        self.set_output_crs(output_file=dst_filename, crs=input_mask.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_PCRASTER: dst_filename}
+        value_scale, default_aggregation = self.DATATYPES[input_datatype]
+        aggregation = self.parameterAsEnum(parameters, self.INPUT_AGGREGATION, context)
+        method = self.AGGREGATIONS[aggregation - 1] if aggregation > 0 else default_aggregation
+
+        GdalLoader.set_clone(pcr, clone)
+        if value_scale == 'Directional':
+            pcr.setglobaloption('radians' if input_datatype == 8 else 'degrees')
+
+        clone_map = pcr.clone()
+        geo_transform = (clone_map.west(), clone_map.cellSize(), 0, clone_map.north(), 0, -clone_map.cellSize())
+        values = ColumnFiles.columns_to_cells(table, method, geo_transform, clone_map.nrRows(), clone_map.nrCols(),
+                                              feedback=feedback)
+        if feedback.isCanceled():
+            return {}
+
+        # directional maps are stored like scalar maps
+        _, _, missing_value, numpy_type = TiledExecution.VALUE_SCALES.get(value_scale, TiledExecution.VALUE_SCALES['Scalar'])
+        missing = values == ColumnFiles.MISSING_VALUE
+        values[missing] = 0
+        if value_scale == 'Boolean':
+            values = values != 0
+        elif numpy.issubdtype(numpy_type, numpy.integer):
+            values = numpy.rint(values)
+        array = values.astype(numpy_type)
+        array[missing] = missing_value
+
+        result = pcr.numpy2pcr(getattr(pcr, value_scale), array, missing_value)
+        return self.report_outputs({self.OUTPUT_PCRASTER: result}, parameters, context, feedback,
+                                   crs=input_mask.crs(), output_files={self.OUTPUT_PCRASTER: dst_filename})
@@ -11,13 +11,15 @@
 ***************************************************************************
 """
 
-from osgeo import gdal, gdalconst
 from qgis.core import (QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterEnum,
                        QgsProcessingParameterRasterDestination
                        )
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.raster_writer import RasterWriter
+from pcraster_tools.processing.settings import PCRasterSettings
 
 
 class ConvertToPCRasterAlgorithm(PCRasterAlgorithm):
@@ -29,6 +31,8 @@ class ConvertToPCRasterAlgorithm(PCRasterAlgorithm):
     INPUT_DATATYPE = 'INPUT2'
     OUTPUT_PCRASTER = 'OUTPUT'
 
+    VALUE_SCALES = ['Boolean', 'Nominal', 'Ordinal', 'Scalar', 'Directional', 'Ldd']
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return ConvertToPCRasterAlgorithm()
 
@@ -42,7 +46,7 @@ class ConvertToPCRasterAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr("Convert GDAL supported raster layers to PCRaster format with control of the output data type")
@@ -73,34 +77,19 @@ class ConvertToPCRasterAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        # print(input_dem.dataProvider().dataSourceUri())
-
-        # Open existing dataset
-        src_ds = gdal.Open(input_raster.dataProvider().dataSourceUri())
+    def canExecute(self):  # pylint: disable=missing-function-docstring
+        # the conversion only uses GDAL
+        return True, ''
 
-        # GDAL Translate
+    def process_phases(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring
+        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
         dst_filename = self.parameterAsOutputLayer(parameters, self.OUTPUT_PCRASTER, context)
+        value_scale_name = self.VALUE_SCALES[self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)]
 
-        input_datatype = self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)
-        if input_datatype == 0:
-            gdal.Translate(dst_filename, src_ds, format='PCRaster', outputType=gdalconst.GDT_Byte,
-                           metadataOptions="VS_BOOLEAN")
-        elif input_datatype == 1:
-            gdal.Translate(dst_filename, src_ds, format='PCRaster', outputType=gdalconst.GDT_Int32,
-                           metadataOptions="VS_NOMINAL")
-        elif input_datatype == 2:
-            gdal.Translate(dst_filename, src_ds, format='PCRaster', outputType=gdalconst.GDT_Int32,
-                           metadataOptions="VS_ORDINAL")
-        elif input_datatype == 3:
-            gdal.Translate(dst_filename, src_ds, format='PCRaster', outputType=gdalconst.GDT_Float32,
-                           metadataOptions="VS_SCALAR")
-        elif input_datatype == 4:
-            gdal.Translate(dst_filename, src_ds, format='PCRaster', outputType=gdalconst.GDT_Float32,
-                           metadataOptions="VS_DIRECTION")
-        else:
-            gdal.Translate(dst_filename, src_ds, format='PCRaster', outputType=gdalconst.GDT_Byte,
-                           metadataOptions="VS_LDD")
+        with self.phase('convert'), GdalLoader.gdal_config(PCRasterSettings.gdal_cache_size(),
+                                                           PCRasterSettings.gdal_threads()):
+            if not RasterWriter.copy_raster(input_raster.dataProvider().dataSourceUri(), dst_filename,
+                                            value_scale_name=value_scale_name, feedback=feedback):
+                return {}
 
         return {self.OUTPUT_PCRASTER: dst_filename}
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+
+from qgis.core import (QgsProcessing,
+                       QgsProcessingException,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterString,
+                       QgsProcessingOutputNumber)
+
+from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.algorithms.convert_to_pcraster import ConvertToPCRasterAlgorithm
+from pcraster_tools.processing.batch_conversion import (
+    BatchConversion,
+    ConversionTask
+)
+from pcraster_tools.processing.settings import PCRasterSettings
+
+
+class ConvertToPCRasterBatchAlgorithm(PCRasterAlgorithm):
+    """
+    Converts many GDAL supported rasters to PCRaster format in parallel
+    """
+
+    INPUT_RASTERS = 'INPUT'
+    INPUT_FOLDER = 'FOLDER'
+    INPUT_PATTERN = 'PATTERN'
+    INPUT_DATATYPE = 'INPUT2'
+    INPUT_CLONE = 'CLONE'
+    INPUT_WORKERS = 'WORKERS'
+    OUTPUT_FOLDER = 'OUTPUT'
+    OUTPUT_CONVERTED = 'CONVERTED'
+    OUTPUT_FAILED = 'FAILED'
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return ConvertToPCRasterBatchAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'converttopcrasterformatbatch'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Convert multiple rasters to PCRaster Format')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Data management')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'data'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr(
+            """Converts GDAL supported rasters to PCRaster format in parallel worker processes.
+
+            Parameters:
+
+            * <b>Raster layers</b> (optional) - rasters to convert
+            * <b>Input folder</b> (optional) - folder with further rasters to convert
+            * <b>File name pattern</b> (required) - pattern of the rasters converted from the input folder, e.g. *.tif
+            * <b>Output data type</b> (required) - value scale of the PCRaster maps
+            * <b>Clone layer</b> (optional) - raster whose grid (extent, cell size and CRS) the outputs are aligned to. Scalar maps are interpolated bilinearly, other value scales use the nearest cell
+            * <b>Worker processes</b> (required) - number of rasters converted at the same time, 0 for the number of CPU cores
+            * <b>Output folder</b> (required) - folder the PCRaster maps are written to, named after the input rasters
+            """
+        )
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.INPUT_RASTERS,
+                self.tr('Raster layers'),
+                QgsProcessing.TypeRaster,
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFile(
+                self.INPUT_FOLDER,
+                self.tr('Input folder'),
+                behavior=QgsProcessingParameterFile.Folder,
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.INPUT_PATTERN,
+                self.tr('File name pattern'),
+                defaultValue='*.tif'
+            )
+        )
+
+        data_types = [self.tr('Boolean'), self.tr('Nominal'), self.tr('Ordinal'), self.tr('Scalar'),
+                      self.tr('Directional'), self.tr('LDD')]
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.INPUT_DATATYPE,
+                self.tr('Output data type'),
+                data_types,
+                defaultValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_CLONE,
+                self.tr('Clone layer'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.INPUT_WORKERS,
+                self.tr('Worker processes'),
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=0,
+                minValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFolderDestination(
+                self.OUTPUT_FOLDER,
+                self.tr('Output folder')
+            )
+        )
+
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_CONVERTED, self.tr('Converted rasters')))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_FAILED, self.tr('Failed rasters')))
+
+    def canExecute(self):  # pylint: disable=missing-function-docstring
+        # the conversion only uses GDAL
+        return True, ''
+
+    def process_phases(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,too-many-locals
+        sources = [layer.source() for layer in self.parameterAsLayerList(parameters, self.INPUT_RASTERS, context)]
+        folder = self.parameterAsFile(parameters, self.INPUT_FOLDER, context)
+        if folder:
+            sources += BatchConversion.folder_rasters(
+                folder, self.parameterAsString(parameters, self.INPUT_PATTERN, context))
+        if not sources:
+            raise QgsProcessingException(self.tr('No rasters to convert'))
+
+        output_folder = self.parameterAsFileOutput(parameters, self.OUTPUT_FOLDER, context)
+        os.makedirs(output_folder, exist_ok=True)
+
+        clone_layer = self.parameterAsRasterLayer(parameters, self.INPUT_CLONE, context)
+        grid = BatchConversion.clone_grid(clone_layer.source()) if clone_layer else None
+        value_scale_name = ConvertToPCRasterAlgorithm.VALUE_SCALES[
+            self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)]
+
+        workers = self.parameterAsInt(parameters, self.INPUT_WORKERS, context) or os.cpu_count() or 1
+        threads = PCRasterSettings.gdal_threads()
+        if threads == 'ALL_CPUS' and workers > 1:
+            # share the cores between the workers
+            threads = str(max(1, (os.cpu_count() or 1) // workers))
+        tasks = [ConversionTask(index, source, output, value_scale_name=value_scale_name, grid=grid,
+                                cache_size=PCRasterSettings.gdal_cache_size(), threads=threads)
+                 for index, (source, output) in enumerate(
+                     zip(sources, BatchConversion.output_files(sources, output_folder)))]
+
+        feedback.pushInfo(self.tr('Converting {} rasters with {} worker processes').format(
+            len(tasks), min(workers, len(tasks))))
+        with self.phase('convert'):
+            results = BatchConversion.run(tasks, workers, feedback)
+
+        failed = 0
+        for index, error in results:
+            if error:
+                failed += 1
+                feedback.reportError(self.tr('Could not convert {}: {}').format(tasks[index].source, error), False)
+
+        return {self.OUTPUT_FOLDER: output_folder,
+                self.OUTPUT_CONVERTED: len(results) - failed,
+                self.OUTPUT_FAILED: failed}
@@ -12,6 +12,7 @@
 """
 
 import csv
+from typing import List
 
 from osgeo import gdal
 from qgis.core import (QgsProcessingParameterRasterLayer,
@@ -70,60 +71,68 @@ class LookupTableFromRat(PCRasterAlgorithm):
             )
         )
 
+    # columns which are not written to the lookup table
+    SKIP_COLUMNS = ('Count', 'R', 'G', 'B', 'A')
+
+    # number of RAT rows converted at once
+    BLOCK_ROWS = 65536
+
+    @staticmethod
+    def column_values(rat, col: int, col_type: int, start: int, length: int) -> List[str]:
+        """
+        Returns the values of rows start to start + length of a RAT column as strings,
+        formatted like GetValueAsString()
+        """
+        values = rat.ReadAsArray(col, start, length).tolist()
+        if col_type == gdal.GFT_Integer:
+            return [str(value) for value in values]
+        if col_type == gdal.GFT_Real:
+            return ['%.16g' % value for value in values]
+        return [value.decode('utf8') if isinstance(value, bytes) else str(value) for value in values]
+
     @staticmethod
-    def to_csv(rat, filepath, table_type):  # pylint: disable=too-many-branches
+    def to_csv(rat, filepath, table_type, feedback=None):  # pylint: disable=too-many-locals
         """
         Converts a file to CSV
         """
+        col_count = rat.GetColumnCount()
+        row_count = rat.GetRowCount()
+
+        # resolve column names and types once, rather than for every cell
+        if table_type == 'thematic':
+            columns = [col for col in range(col_count) if rat.GetNameOfCol(col) not in LookupTableFromRat.SKIP_COLUMNS]
+        else:
+            columns = [col for col in range(min(3, col_count)) if rat.GetNameOfCol(col) not in LookupTableFromRat.SKIP_COLUMNS]
+        col_types = {col: rat.GetTypeOfCol(col) for col in columns}
+
         with open(filepath, 'w', newline='', encoding='utf8') as csv_file:
             csv_writer = csv.writer(csv_file, delimiter=' ')
 
-            # Write out column headers
-            col_count = rat.GetColumnCount()
-            cols = []
-            skip_cols = ['Count', 'R', 'G', 'B', 'A']
-            for col in range(col_count):
-                if rat.GetNameOfCol(col) not in skip_cols:
-                    cols.append(rat.GetNameOfCol(col))
-            # csv_writer.writerow(cols)
-
-            # Write out each row.
-            row_count = rat.GetRowCount()
-
-            for row in range(row_count):  # pylint: disable=too-many-nested-blocks
-                cols = []
-                if table_type == 'thematic':
-                    for col in range(col_count):
-                        if rat.GetNameOfCol(col) not in skip_cols:
-                            col_type = rat.GetTypeOfCol(col)
-                            if col_type == gdal.GFT_Integer:
-                                value = '%s' % rat.GetValueAsInt(row, col)
-                            elif col_type == gdal.GFT_Real:
-                                value = '%.16g' % rat.GetValueAsDouble(row, col)
-                            else:
-                                value = '%s' % rat.GetValueAsString(row, col)
-                            cols.append(value)
-                    csv_writer.writerow(cols)
-
+            for start in range(0, row_count, LookupTableFromRat.BLOCK_ROWS):
+                if feedback and feedback.isCanceled():
+                    break
+
+                length = min(LookupTableFromRat.BLOCK_ROWS, row_count - start)
+                values = []
+                for col in columns:
+                    col_values = LookupTableFromRat.column_values(rat, col, col_types[col], start, length)
+                    if table_type == 'athematic' and col_types[col] == gdal.GFT_Real:
+                        # class boundaries: [lowest,upper] for the first class, <lower,upper] for the others
+                        if col == 1:
+                            col_values = ['{}]'.format(value) for value in col_values]
+                        else:
+                            col_values = ['<{}'.format(value) for value in col_values]
+                            if col == 0 and start == 0:
+                                col_values[0] = '[' + col_values[0][1:]
+                    values.append(col_values)
+
+                rows = zip(*values)
                 if table_type == 'athematic':
-                    for col in range(3):
-                        if rat.GetNameOfCol(col) not in skip_cols:
-                            col_type = rat.GetTypeOfCol(col)
-                            if col_type == gdal.GFT_Integer:
-                                value = '%s' % rat.GetValueAsInt(row, col)
-                            elif col_type == gdal.GFT_Real:
-                                # value='%.16g'%rat.GetValueAsDouble(row,col)
-                                if col == 0 and row == 0:
-                                    value = '[%s' % rat.GetValueAsString(row, col)
-                                elif col == 1:
-                                    value = '%s]' % rat.GetValueAsString(row, col)
-                                else:
-                                    value = '<%s' % rat.GetValueAsString(row, col)
-                            else:
-                                value = '%s' % rat.GetValueAsString(row, col)
-                            cols.append(value)
-                    cols[0:2] = [','.join(cols[0:2])]
-                    csv_writer.writerow(cols)
+                    rows = ([','.join(row[0:2])] + list(row[2:]) for row in rows)
+                csv_writer.writerows(rows)
+
+                if feedback:
+                    feedback.setProgress(100 * (start + length) / row_count)
 
     def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
         output_lookup_table = self.parameterAsFile(parameters, self.OUTPUT_TABLE, context)
@@ -136,6 +145,6 @@ class LookupTableFromRat(PCRasterAlgorithm):
         else:
             table_type = 'thematic'
 
-        self.to_csv(rat, output_lookup_table, table_type)
+        self.to_csv(rat, output_lookup_table, table_type, feedback)
 
         return {self.OUTPUT_TABLE: output_lookup_table}
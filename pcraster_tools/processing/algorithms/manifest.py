@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from typing import NamedTuple
+
+
+class AlgorithmEntry(NamedTuple):
+    """
+    Static description of an algorithm, used to list it in the toolbox without
+    importing its module
+    """
+
+    module: str
+    class_name: str
+    name: str
+    display_name: str
+    group: str
+    group_id: str
+
+
+# Keep in sync with the algorithm classes -- test_algorithm_manifest checks the entries
+ALGORITHMS = (
+    AlgorithmEntry('batch_run', 'BatchRunAlgorithm',
+                   'batchrun', 'Batch run PCRaster algorithm', 'Data management', 'data'),
+    AlgorithmEntry('col2map', 'Col2mapAlgorithm',
+                   'col2map', 'Column file to PCRaster Map', 'Data management', 'data'),
+    AlgorithmEntry('convert_to_pcraster', 'ConvertToPCRasterAlgorithm',
+                   'converttopcrasterformat', 'Convert to PCRaster Format', 'Data management', 'data'),
+    AlgorithmEntry('convert_to_pcraster_batch', 'ConvertToPCRasterBatchAlgorithm',
+                   'converttopcrasterformatbatch', 'Convert multiple rasters to PCRaster Format', 'Data management', 'data'),
+    AlgorithmEntry('lookuptablefromrat', 'LookupTableFromRat',
+                   'lookuptablefromrat', 'Lookup table from RAT', 'Relations in tables', 'relations'),
+    AlgorithmEntry('map2col', 'Map2colAlgorithm',
+                   'map2col', 'PCRaster maps to column file', 'Data management', 'data'),
+    AlgorithmEntry('pcraster_abs_algorithm', 'PCRasterAbsAlgorithm',
+                   'abs', 'abs', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_accucapacityflux_algorithm', 'PCRasterAccucapacityfluxAlgorithm',
+                   'accucapacityflux', 'accucapacityflux and accucapicitystate', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accuflux_algorithm', 'PCRasterAccuFluxAlgorithm',
+                   'accuflux', 'accuflux', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accufluxmultiple_algorithm', 'PCRasterAccuFluxMultipleAlgorithm',
+                   'accufluxmultiple', 'accuflux (multiple materials)', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accufractionflux_algorithm', 'PCRasterAccufractionfluxAlgorithm',
+                   'accufractionflux', 'accufractionflux and accufractionstate', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accusweep_algorithm', 'PCRasterAccusweepAlgorithm',
+                   'accusweep', 'accuthreshold, accucapacity and accufraction parameter sweep', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accuthresholdflux_algorithm', 'PCRasterAccuthresholdfluxAlgorithm',
+                   'accuthresholdflux', 'accuthresholdflux and accuthresholdstate', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accutraveltimeflux_algorithm', 'PCRasterAccutraveltimefluxAlgorithm',
+                   'accutraveltimeflux', 'accutraveltimeflux and accutraveltimestate', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accutraveltimefractionflux_algorithm', 'PCRasterAccutraveltimefractionfluxAlgorithm',
+                   'accutraveltimefractionflux', 'accutraveltimefractionflux, accutraveltimefractionstate and accutraveltimefractionremoved', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accutraveltimeseries_algorithm', 'PCRasterAccutraveltimeseriesAlgorithm',
+                   'accutraveltimeseries', 'accutraveltimeflux and accutraveltimefractionflux time series', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_accutriggerflux_algorithm', 'PCRasterAccutriggerfluxAlgorithm',
+                   'accutriggerflux', 'accutriggerflux and accutriggerstate', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_acos_algorithm', 'PCRasterAcosAlgorithm',
+                   'acos', 'acos', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_areaarea_algorithm', 'PCRasterAreaareaAlgorithm',
+                   'areaarea', 'areaarea', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areaaverage_algorithm', 'PCRasterAreaaverageAlgorithm',
+                   'areaaverage', 'areaaverage', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areadiversity_algorithm', 'PCRasterAreadiversityAlgorithm',
+                   'areadiversity', 'areadiversity', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areamajority_algorithm', 'PCRasterAreamajorityAlgorithm',
+                   'areamajority', 'areamajority', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areamaximum_algorithm', 'PCRasterAreamaximumAlgorithm',
+                   'areamaximum', 'areamaximum', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areaminimum_algorithm', 'PCRasterAreaminimumAlgorithm',
+                   'areaminimum', 'areaminimum', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areanormal_algorithm', 'PCRasterAreanormalAlgorithm',
+                   'areanormal', 'areanormal', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areaorder_algorithm', 'PCRasterAreaorderAlgorithm',
+                   'areaorder', 'areaorder', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areatotal_algorithm', 'PCRasterAreatotalAlgorithm',
+                   'areatotal', 'areatotal', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_areauniform_algorithm', 'PCRasterAreauniformAlgorithm',
+                   'areauniform', 'areauniform', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_asin_algorithm', 'PCRasterAsinAlgorithm',
+                   'asin', 'asin', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_aspect_algorithm', 'PCRasterAspectAlgorithm',
+                   'aspect', 'aspect', 'Derivatives of digital elevation models', 'demderivatives'),
+    AlgorithmEntry('pcraster_atan_algorithm', 'PCRasterAtanAlgorithm',
+                   'atan', 'atan', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_booleanoperators_algorithm', 'PCRasterBooleanOperatorsAlgorithm',
+                   'booleanoperators', 'boolean operators', 'Conditional and boolean operators', 'conditional'),
+    AlgorithmEntry('pcraster_catchment_algorithm', 'PCRasterCatchmentAlgorithm',
+                   'catchment', 'catchment', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_catchmenttotal_algorithm', 'PCRasterCatchmenttotalAlgorithm',
+                   'catchmenttotal', 'catchmenttotal', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_cellarea_algorithm', 'PCRastercellareaAlgorithm',
+                   'cellarea', 'cellarea', 'Data management', 'data'),
+    AlgorithmEntry('pcraster_celllength_algorithm', 'PCRastercelllengthAlgorithm',
+                   'celllength', 'celllength', 'Data management', 'data'),
+    AlgorithmEntry('pcraster_clump_algorithm', 'PCRasterClumpAlgorithm',
+                   'clump', 'clump', 'Area operations', 'area'),
+    AlgorithmEntry('pcraster_comparisonoperators_algorithm', 'PCRasterComparisonOperatorsAlgorithm',
+                   'comparisonoperators', 'comparison operators', 'Conditional and boolean operators', 'conditional'),
+    AlgorithmEntry('pcraster_convertdatatype_algorithm', 'PCRasterConvertdatatypeAlgorithm',
+                   'convertdatatype', 'convert layer data type', 'Data management', 'data'),
+    AlgorithmEntry('pcraster_cos_algorithm', 'PCRastercosAlgorithm',
+                   'cos', 'cos', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_cover_algorithm', 'PCRasterCoverAlgorithm',
+                   'cover', 'cover', 'Missing value creation, detection, alteration', 'missingvalues'),
+    AlgorithmEntry('pcraster_defined_algorithm', 'PCRasterDefinedAlgorithm',
+                   'defined', 'defined', 'Missing value creation, detection, alteration', 'missingvalues'),
+    AlgorithmEntry('pcraster_downstream_algorithm', 'PCRasterDownstreamAlgorithm',
+                   'downstream', 'downstream', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_downstreamdist_algorithm', 'PCRasterDownstreamdistAlgorithm',
+                   'downstreamdist', 'downstreamdist', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_exp_algorithm', 'PCRasterexpAlgorithm',
+                   'exp', 'exp', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_extentofview_algorithm', 'PCRasterExtentofviewAlgorithm',
+                   'extentofview', 'extentofview', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_fac_algorithm', 'PCRasterfacAlgorithm',
+                   'fac', 'fac', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_horizontan_algorithm', 'PCRasterHorizontanAlgorithm',
+                   'horizontan', 'horizontan', 'Derivatives of digital elevation models', 'demderivatives'),
+    AlgorithmEntry('pcraster_ifthen_algorithm', 'PCRasterIfThenAlgorithm',
+                   'ifthen', 'if then', 'Conditional and boolean operators', 'conditional'),
+    AlgorithmEntry('pcraster_ifthenelse_algorithm', 'PCRasterIfThenElseAlgorithm',
+                   'ifthenelse', 'if then else', 'Conditional and boolean operators', 'conditional'),
+    AlgorithmEntry('pcraster_inversedistance_algorithm', 'PCRasterInversedistanceAlgorithm',
+                   'inversedistance', 'inversedistance', 'Missing value creation, detection, alteration', 'missingvalues'),
+    AlgorithmEntry('pcraster_lddcreate_algorithm', 'PCRasterLDDCreateAlgorithm',
+                   'lddcreate', 'lddcreate', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_lddcreatedem_algorithm', 'PCRasterLDDCreateDEMAlgorithm',
+                   'lddcreatedem', 'lddcreatedem', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_ldddist_algorithm', 'PCRasterLDDDistAlgorithm',
+                   'ldddist', 'ldddist', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_lddmask_algorithm', 'PCRasterLddMaskAlgorithm',
+                   'lddmask', 'lddmask', 'Missing value creation, detection, alteration', 'missingvalues'),
+    AlgorithmEntry('pcraster_lddrepair_algorithm', 'PCRasterlddrepairAlgorithm',
+                   'lddrepair', 'lddrepair', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_ln_algorithm', 'PCRasterlnAlgorithm',
+                   'ln', 'ln', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_log10_algorithm', 'PCRasterlog10Algorithm',
+                   'log10', 'log10', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_lookup_algorithm', 'PCRasterLookupAlgorithm',
+                   'lookup', 'lookup', 'Relations in tables', 'relations'),
+    AlgorithmEntry('pcraster_lookuplinear_algorithm', 'PCRasterLookuplinearAlgorithm',
+                   'lookuplinear', 'lookuplinear', 'Relations in tables', 'relations'),
+    AlgorithmEntry('pcraster_maparea_algorithm', 'PCRasterMapareaAlgorithm',
+                   'maparea', 'maparea', 'Map operations', 'map'),
+    AlgorithmEntry('pcraster_mapmaximum_algorithm', 'PCRasterMapmaximumAlgorithm',
+                   'mapmaximum', 'mapmaximum', 'Map operations', 'map'),
+    AlgorithmEntry('pcraster_mapminimum_algorithm', 'PCRasterMapminimumAlgorithm',
+                   'mapminimum', 'mapminimum', 'Map operations', 'map'),
+    AlgorithmEntry('pcraster_mapnormal_algorithm', 'PCRasterMapnormalAlgorithm',
+                   'mapnormal', 'mapnormal', 'Map operations', 'map'),
+    AlgorithmEntry('pcraster_maptotal_algorithm', 'PCRasterMaptotalAlgorithm',
+                   'maptotal', 'maptotal', 'Map operations', 'map'),
+    AlgorithmEntry('pcraster_mapuniform_algorithm', 'PCRasterMapuniformAlgorithm',
+                   'mapuniform', 'mapuniform', 'Map operations', 'map'),
+    AlgorithmEntry('pcraster_nodirection_algorithm', 'PCRasterNodirectionAlgorithm',
+                   'nodirection', 'nodirection', 'Missing value creation, detection, alteration', 'missingvalues'),
+    AlgorithmEntry('pcraster_normal_algorithm', 'PCRasterNormalAlgorithm',
+                   'normal', 'normal', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_not_algorithm', 'PCRasterNotAlgorithm',
+                   'not', 'not', 'Conditional and boolean operators', 'conditional'),
+    AlgorithmEntry('pcraster_order_algorithm', 'PCRasterorderAlgorithm',
+                   'order', 'order', 'Order', 'order'),
+    AlgorithmEntry('pcraster_path_algorithm', 'PCRasterPathAlgorithm',
+                   'path', 'path', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_pit_algorithm', 'PCRasterPitAlgorithm',
+                   'pit', 'pit', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_plancurv_algorithm', 'PCRasterPlancurvAlgorithm',
+                   'plancurv', 'plancurv', 'Derivatives of digital elevation models', 'demderivatives'),
+    AlgorithmEntry('pcraster_pred_algorithm', 'PCRasterpredAlgorithm',
+                   'pred', 'pred', 'Order', 'order'),
+    AlgorithmEntry('pcraster_profcurv_algorithm', 'PCRasterProfcurvAlgorithm',
+                   'profcurv', 'profcurv', 'Derivatives of digital elevation models', 'demderivatives'),
+    AlgorithmEntry('pcraster_rounddown_algorithm', 'PCRasterrounddownAlgorithm',
+                   'rounddown', 'rounddown', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_roundoff_algorithm', 'PCRasterroundoffAlgorithm',
+                   'roundoff', 'roundoff', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_roundup_algorithm', 'PCRasterroundupAlgorithm',
+                   'roundup', 'roundup', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_sin_algorithm', 'PCRastersinAlgorithm',
+                   'sin', 'sin', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_slope_algorithm', 'PCRasterSlopeAlgorithm',
+                   'Slope', 'slope', 'Derivatives of digital elevation models', 'demderivatives'),
+    AlgorithmEntry('pcraster_slopelength_algorithm', 'PCRasterSlopelengthAlgorithm',
+                   'slopelength', 'slopelength', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_spatial_algorithm', 'PCRasterSpatialAlgorithm',
+                   'spatial', 'spatial', 'Data management', 'data'),
+    AlgorithmEntry('pcraster_spread_algorithm', 'PCRasterSpreadAlgorithm',
+                   'spread', 'spread', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_spreadldd_algorithm', 'PCRasterSpreadlddAlgorithm',
+                   'spreadldd', 'spreadldd', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_spreadlddzone_algorithm', 'PCRasterSpreadlddzoneAlgorithm',
+                   'spreadlddzone', 'spreadlddzone', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_spreadmax_algorithm', 'PCRasterSpreadmaxAlgorithm',
+                   'spreadmax', 'spreadmax', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_spreadmaxzone_algorithm', 'PCRasterSpreadmaxzoneAlgorithm',
+                   'spreadmaxzone', 'spreadmaxzone', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_spreadzone_algorithm', 'PCRasterSpreadzoneAlgorithm',
+                   'spreadzone', 'spreadzone', 'Proximity analysis', 'proximity'),
+    AlgorithmEntry('pcraster_sqr_algorithm', 'PCRastersqrAlgorithm',
+                   'sqr', 'sqr', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_sqrt_algorithm', 'PCRastersqrtAlgorithm',
+                   'sqrt', 'sqrt', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_streamorder_algorithm', 'PCRasterStreamOrderAlgorithm',
+                   'streamorder', 'streamorder', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_subcatchment_algorithm', 'PCRasterSubcatchmentAlgorithm',
+                   'subcatchment', 'subcatchment', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_succ_algorithm', 'PCRastersuccAlgorithm',
+                   'succ', 'succ', 'Order', 'order'),
+    AlgorithmEntry('pcraster_tan_algorithm', 'PCRastertanAlgorithm',
+                   'tan', 'tan', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_transient_algorithm', 'PCRasterTransientAlgorithm',
+                   'transient', 'transient', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_uniform_algorithm', 'PCRasterUniformAlgorithm',
+                   'uniform', 'uniform', 'Mathematical operators', 'operators'),
+    AlgorithmEntry('pcraster_uniqueid_algorithm', 'PCRasterUniqueidAlgorithm',
+                   'uniqueid', 'uniqueid', 'Missing value creation, detection, alteration', 'missingvalues'),
+    AlgorithmEntry('pcraster_upstream_algorithm', 'PCRasterUpstreamAlgorithm',
+                   'upstream', 'upstream', 'Hydrological and material transport operations', 'hydrological'),
+    AlgorithmEntry('pcraster_view_algorithm', 'PCRasterViewAlgorithm',
+                   'view', 'view', 'Derivatives of digital elevation models', 'demderivatives'),
+    AlgorithmEntry('pcraster_window4total_algorithm', 'PCRasterwindow4totalAlgorithm',
+                   'window4total', 'window4total', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowaverage_algorithm', 'PCRasterWindowAverageAlgorithm',
+                   'windowaverage', 'windowaverage', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowdiversity_algorithm', 'PCRasterWindowDiversityAlgorithm',
+                   'windowdiversity', 'windowdiversity', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowhighpass_algorithm', 'PCRasterWindowHighPassAlgorithm',
+                   'windowhighpass', 'windowhighpass', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowmajority_algorithm', 'PCRasterWindowMajorityAlgorithm',
+                   'windowmajority', 'windowmajority', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowmaximum_algorithm', 'PCRasterWindowMaximumAlgorithm',
+                   'windowmaximum', 'windowmaximum', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowminimum_algorithm', 'PCRasterWindowMinimumAlgorithm',
+                   'windowminimum', 'windowminimum', 'Window operations', 'window'),
+    AlgorithmEntry('pcraster_windowtotal_algorithm', 'PCRasterWindowTotalAlgorithm',
+                   'windowtotal', 'windowtotal', 'Window operations', 'window'),
+    AlgorithmEntry('resample', 'ResampleAlgorithm',
+                   'resample', 'resample', 'Data management', 'data'),
+)
@@ -11,15 +11,13 @@
 ***************************************************************************
 """
 
-import os
-
 from qgis.core import (QgsProcessing,
                        QgsProcessingParameterMultipleLayers,
-                       QgsProcessingParameterFileDestination,
-                       QgsProcessingException
+                       QgsProcessingParameterFileDestination
                        )
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.column_files import ColumnFiles
 
 
 class Map2colAlgorithm(PCRasterAlgorithm):
@@ -43,7 +41,7 @@ class Map2colAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr(
@@ -54,7 +52,7 @@ class Map2colAlgorithm(PCRasterAlgorithm):
             Parameters:
 
             * <b>Input Raster layers</b> (required) - raster layers from any data type. The maps must have the same projection, the other location attributes (use the resample tool if this is not the case) and the data types may be different between the maps.
-            * <b>Output text file</b> (required) - text file with comma separated columns
+            * <b>Output text file</b> (required) - text file with comma separated columns of the x and y coordinates of the cell centres and the values on each map. Cells which are missing on all maps are skipped, other missing values are written as 1e31.
             """
         ).format(PCRasterAlgorithm.documentation_url('app_map2col.html'))
 
@@ -80,14 +78,10 @@ class Map2colAlgorithm(PCRasterAlgorithm):
     def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
         input_rasters = []
         for layer in self.parameterAsLayerList(parameters, self.INPUT_RASTERS, context):
-            if not layer.source().lower().endswith('.map'):
-                raise QgsProcessingException('Only PCRaster .map format can be used as input')
             input_rasters.append(layer.source())
 
         dst_filename = self.parameterAsFileOutput(parameters, self.OUTPUT_CSV, context)
-        rasterstrings = ' '.join(f'"{raster}"' for raster in input_rasters)
-        cmd = f'map2col -s , {rasterstrings} "{dst_filename}"'
-        feedback.pushInfo(cmd)
-        os.system(cmd)
+        lines = ColumnFiles.map_to_columns(input_rasters, dst_filename, separator=',', feedback=feedback)
+        feedback.pushInfo(self.tr('Wrote {} cells').format(lines))
 
         return {self.OUTPUT_CSV: dst_filename}
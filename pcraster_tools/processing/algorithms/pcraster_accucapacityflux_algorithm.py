@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -96,35 +95,13 @@ class PCRasterAccucapacityfluxAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                accucapacityflux,
-                accucapacitystate,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_flow_direction = self.parameterAsRasterLayer(parameters, self.INPUT_FLOWDIRECTION, context)
-        input_material = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL, context)
-        input_capacity = self.parameterAsRasterLayer(parameters, self.INPUT_CAPACITY, context)
-        setclone(input_flow_direction.dataProvider().dataSourceUri())
-        ldd = readmap(input_flow_direction.dataProvider().dataSourceUri())
-        material = readmap(input_material.dataProvider().dataSourceUri())
-        transport_capacity = readmap(input_capacity.dataProvider().dataSourceUri())
-        result_flux = accucapacityflux(ldd, material, transport_capacity)
-        result_state = accucapacitystate(ldd, material, transport_capacity)
-
-        output_flux = self.parameterAsOutputLayer(parameters, self.OUTPUT_FLUX, context)
-        output_state = self.parameterAsOutputLayer(parameters, self.OUTPUT_STATE, context)
-
-        report(result_flux, output_flux)
-        report(result_state, output_state)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_FLOWDIRECTION, self.INPUT_MATERIAL, self.INPUT_CAPACITY]
 
-        self.set_output_crs(output_file=output_flux, crs=input_flow_direction.crs(), feedback=feedback, context=context)
-        self.set_output_crs(output_file=output_state, crs=input_flow_direction.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_FLOWDIRECTION: 'Ldd'}
 
-        return {self.OUTPUT_FLUX: output_flux, self.OUTPUT_STATE: output_state}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        result_flux = pcr.accucapacityflux(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_CAPACITY])
+        result_state = pcr.accucapacitystate(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_CAPACITY])
+        return {self.OUTPUT_FLUX: result_flux, self.OUTPUT_STATE: result_state}
@@ -12,10 +12,10 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.ldd_index import LddIndex
 
 
 class PCRasterAccuFluxAlgorithm(PCRasterAlgorithm):
@@ -79,26 +79,17 @@ class PCRasterAccuFluxAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                accuflux,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_ldd = self.parameterAsRasterLayer(parameters, self.INPUT_LDD, context)
-        input_material = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL, context)
-        setclone(input_ldd.dataProvider().dataSourceUri())
-        ldd = readmap(input_ldd.dataProvider().dataSourceUri())
-        material = readmap(input_material.dataProvider().dataSourceUri())
-        result_flux = accuflux(ldd, material)
-        output_file_path = self.parameterAsOutputLayer(parameters, self.OUTPUT_ACCUFLUX, context)
-        report(result_flux, output_file_path)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_LDD, self.INPUT_MATERIAL]
 
-        self.set_output_crs(output_file=output_file_path, crs=input_ldd.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_LDD: 'Ldd'}
 
-        return {self.OUTPUT_ACCUFLUX: output_file_path}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        index = self.ldd_index(pcr, parameters, self.INPUT_LDD, rasters[self.INPUT_LDD], context)
+        if index is not None:
+            material = LddIndex.field_array(pcr, rasters[self.INPUT_MATERIAL])
+            # negative material is left to PCRaster
+            if not (material < 0).any():
+                return {self.OUTPUT_ACCUFLUX: LddIndex.to_field(pcr, index.accuflux(material), 'Scalar')}
+        return {self.OUTPUT_ACCUFLUX: pcr.accuflux(rasters[self.INPUT_LDD], rasters[self.INPUT_MATERIAL])}
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+
+import numpy
+from qgis.core import (QgsProcessing,
+                       QgsProcessingOutputMultipleLayers,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterRasterLayer)
+
+from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.batch_conversion import BatchConversion
+from pcraster_tools.processing.ldd_index import LddIndex
+
+
+class PCRasterAccuFluxMultipleAlgorithm(PCRasterAlgorithm):
+    """
+    Accumulated material flowing into downstream cell, for several materials at once
+    """
+
+    INPUT_LDD = 'INPUT'
+    INPUT_MATERIALS = 'INPUT2'
+    OUTPUT_FOLDER = 'OUTPUT'
+    OUTPUT_LAYERS = 'OUTPUT_LAYERS'
+
+    # memory used for the materials accumulated at once, in bytes
+    CHUNK_MEMORY = 512 * 1024 * 1024
+
+    # memory used per cell of each material accumulated at once: the float64 material and flux,
+    # the missing value mask and the temporary arrays of each level
+    CELL_MEMORY = 32
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return PCRasterAccuFluxMultipleAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'accufluxmultiple'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('accuflux (multiple materials)')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Hydrological and material transport operations')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'hydrological'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr(
+            """Accumulated material flowing into downstream cell, for several materials routed over the same LDD in a single pass
+
+            <a href="{}">PCRaster documentation</a>
+
+            Parameters:
+
+            * <b>Input flow direction raster</b> (required) - Flow direction raster in PCRaster LDD format (see lddcreate)
+            * <b>Input material rasters</b> (required) - Scalar rasters with material (>= 0)
+            * <b>Output folder</b> (required) - folder the scalar rasters with the accumulated amount of each material are written to, named after the material rasters with an _accuflux suffix
+            """
+        ).format(PCRasterAlgorithm.documentation_url('op_accuflux.html'))
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_LDD,
+                self.tr('LDD layer')
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.INPUT_MATERIALS,
+                self.tr('Material layers'),
+                QgsProcessing.TypeRaster
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFolderDestination(
+                self.OUTPUT_FOLDER,
+                self.tr('Output folder')
+            )
+        )
+
+        self.addOutput(QgsProcessingOutputMultipleLayers(self.OUTPUT_LAYERS, self.tr('Result flux layers')))
+
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_LDD]
+
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_LDD: 'Ldd'}
+
+    def result_cache_key(self, parameters, context):  # pylint: disable=missing-function-docstring,unused-argument
+        # the outputs depend on the material layer names
+        return None
+
+    def output_paths(self, layers, folder: str):
+        """
+        Returns the output file in folder for each material layer
+        """
+        os.makedirs(folder, exist_ok=True)
+        names = ['{}_accuflux'.format(os.path.splitext(os.path.basename(layer.dataProvider().dataSourceUri()))[0])
+                 for layer in layers]
+        return BatchConversion.output_files(names, folder)
+
+    def chunk_size(self, pcr) -> int:
+        """
+        Returns the number of materials accumulated at once, bounding the memory used
+        """
+        clone = pcr.clone()
+        return max(1, self.CHUNK_MEMORY // (clone.nrRows() * clone.nrCols() * self.CELL_MEMORY))
+
+    def accumulate(self, pcr, index, ldd, layers):
+        """
+        Returns the accumulated material fields of the material layers
+        """
+        materials = [self.read_raster(layer, 'Scalar') for layer in layers]
+        if index is not None:
+            stack = numpy.stack([LddIndex.field_array(pcr, material) for material in materials])
+            # negative material is left to PCRaster
+            if not (stack < 0).any():
+                return [LddIndex.to_field(pcr, flux, 'Scalar') for flux in index.accuflux(stack)]
+        return [pcr.accuflux(ldd, material) for material in materials]
+
+    def accumulate_chunks(self, pcr, index, ldd, layers, paths):
+        """
+        Yields dictionaries of output file paths to accumulated material fields, for chunks
+        of the material layers
+        """
+        chunk_size = self.chunk_size(pcr)
+        for start in range(0, len(layers), chunk_size):
+            with self.phase('operator'):
+                fluxes = self.accumulate(pcr, index, ldd, layers[start:start + chunk_size])
+            yield dict(zip(paths[start:start + chunk_size], fluxes))
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        layers = self.parameterAsLayerList(parameters, self.INPUT_MATERIALS, context)
+        folder = self.parameterAsFileOutput(parameters, self.OUTPUT_FOLDER, context)
+        paths = self.output_paths(layers, folder)
+        ldd = rasters[self.INPUT_LDD]
+        # the materials are routed in one traversal of the LDD, also when LDD indices are disabled
+        index = self.ldd_index(pcr, parameters, self.INPUT_LDD, ldd, context, in_memory=True)
+        return {self.OUTPUT_FOLDER: folder, self.OUTPUT_LAYERS: self.accumulate_chunks(pcr, index, ldd, layers, paths)}
+
+    def report_outputs(self, results, parameters, context, feedback, *, crs=None,
+                       output_files=None):  # pylint: disable=missing-function-docstring,unused-argument
+        # the materials are accumulated and written in chunks, so that they don't all have to fit in memory
+        total = len(self.parameterAsLayerList(parameters, self.INPUT_MATERIALS, context))
+        written = []
+        for fluxes in results[self.OUTPUT_LAYERS]:
+            outputs = super().report_outputs(fluxes, parameters, context, feedback, crs=crs,
+                                             output_files={path: path for path in fluxes})
+            written.extend(outputs.values())
+            feedback.setProgress(100 * len(written) / total)
+            if feedback.isCanceled():
+                break
+
+        return {self.OUTPUT_FOLDER: results[self.OUTPUT_FOLDER], self.OUTPUT_LAYERS: written}
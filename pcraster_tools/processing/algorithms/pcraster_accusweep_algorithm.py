@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+
+from qgis.core import (QgsProcessing,
+                       QgsProcessingException,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterFileDestination,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterString)
+
+from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.sweep import SweepExecution
+
+
+class PCRasterAccusweepAlgorithm(PCRasterAlgorithm):
+    """
+    Transport of material with a threshold, capacity or fraction for each of a list of parameter values
+    """
+
+    INPUT_OPERATION = 'OPERATION'
+    INPUT_FLOWDIRECTION = 'INPUT'
+    INPUT_MATERIAL = 'INPUT2'
+    INPUT_VALUES = 'VALUES'
+    INPUT_VALUE_RASTERS = 'VALUE_RASTERS'
+    INPUT_WORKERS = 'WORKERS'
+    OUTPUT_FLUX = 'OUTPUT'
+    OUTPUT_STATE = 'OUTPUT2'
+
+    OPERATIONS = ['accuthreshold', 'accucapacity', 'accufraction']
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return PCRasterAccusweepAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'accusweep'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('accuthreshold, accucapacity and accufraction parameter sweep')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Hydrological and material transport operations')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'hydrological'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr(
+            """Evaluates accuthresholdflux, accucapacityflux or accufractionflux and the matching state for a list of transport threshold, capacity or fraction values, e.g. for calibration. The LDD and material are read once per worker process.
+
+            <a href="{}">PCRaster documentation</a>
+
+            Parameters:
+
+            * <b>Operation</b> (required) - transport operation to evaluate
+            * <b>Input flow direction raster</b> (required) - Flow direction in PCRaster LDD format (see lddcreate)
+            * <b>Input material raster</b> (required) - Scalar raster with amount of material input (>= 0)
+            * <b>Parameter values</b> (optional) - comma separated threshold, capacity or fraction values
+            * <b>Parameter rasters</b> (optional) - Scalar rasters with threshold, capacity or fraction values, evaluated after the parameter values
+            * <b>Worker processes</b> (required) - number of values evaluated at the same time, 0 for the number of CPU cores
+            * <b>Output flux stack</b> (required) - GeoTIFF with the material flux of each parameter value as band
+            * <b>Output state stack</b> (required) - GeoTIFF with the state of stored material of each parameter value as band
+            """
+        ).format(PCRasterAlgorithm.documentation_url('op_accuthreshold.html'))
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.INPUT_OPERATION,
+                self.tr('Operation'),
+                self.OPERATIONS,
+                defaultValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_FLOWDIRECTION,
+                self.tr('Input Flow Direction Raster Layer')
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_MATERIAL,
+                self.tr('Input Material Raster Layer')
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.INPUT_VALUES,
+                self.tr('Parameter values'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.INPUT_VALUE_RASTERS,
+                self.tr('Parameter rasters'),
+                QgsProcessing.TypeRaster,
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.INPUT_WORKERS,
+                self.tr('Worker processes'),
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=0,
+                minValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.OUTPUT_FLUX,
+                self.tr('Output Material Flux Stack'),
+                self.tr('GeoTIFF files (*.tif)')
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.OUTPUT_STATE,
+                self.tr('Output State Stack'),
+                self.tr('GeoTIFF files (*.tif)')
+            )
+        )
+
+    def process_phases(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring
+        values = SweepExecution.parse_values(self.parameterAsString(parameters, self.INPUT_VALUES, context))
+        values += [layer.dataProvider().dataSourceUri()
+                   for layer in self.parameterAsLayerList(parameters, self.INPUT_VALUE_RASTERS, context)]
+        if not values:
+            raise QgsProcessingException(self.tr('No parameter values to evaluate'))
+
+        ldd_layer = self.parameterAsRasterLayer(parameters, self.INPUT_FLOWDIRECTION, context)
+        material_layer = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL, context)
+        operation = self.OPERATIONS[self.parameterAsEnum(parameters, self.INPUT_OPERATION, context)]
+        outputs = [self.parameterAsFileOutput(parameters, self.OUTPUT_FLUX, context),
+                   self.parameterAsFileOutput(parameters, self.OUTPUT_STATE, context)]
+
+        workers = self.parameterAsInt(parameters, self.INPUT_WORKERS, context) or os.cpu_count() or 1
+        feedback.pushInfo(self.tr('Evaluating {} for {} parameter values with {} worker processes').format(
+            operation, len(values), min(workers, len(values))))
+        with self.phase('sweep'):
+            SweepExecution.run(operation, values, ldd_path=ldd_layer.dataProvider().dataSourceUri(),
+                               material_path=material_layer.dataProvider().dataSourceUri(), outputs=outputs,
+                               workers=workers, feedback=feedback, crs_wkt=self.gdal_crs_wkt(ldd_layer.crs()))
+
+        return {self.OUTPUT_FLUX: outputs[0], self.OUTPUT_STATE: outputs[1]}
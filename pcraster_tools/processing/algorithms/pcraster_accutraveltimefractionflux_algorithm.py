@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -114,42 +113,14 @@ class PCRasterAccutraveltimefractionfluxAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals,too-many-variables,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                accutraveltimefractionflux,
-                accutraveltimefractionstate,
-                accutraveltimefractionremoved
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_flow_direction = self.parameterAsRasterLayer(parameters, self.INPUT_FLOWDIRECTION, context)
-        input_material = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL, context)
-        input_velocity = self.parameterAsRasterLayer(parameters, self.INPUT_VELOCITY, context)
-        input_fraction = self.parameterAsRasterLayer(parameters, self.INPUT_FRACTION, context)
-        setclone(input_flow_direction.dataProvider().dataSourceUri())
-        LDD = readmap(input_flow_direction.dataProvider().dataSourceUri())
-        material = readmap(input_material.dataProvider().dataSourceUri())
-        transportvelocity = readmap(input_velocity.dataProvider().dataSourceUri())
-        transportfraction = readmap(input_fraction.dataProvider().dataSourceUri())
-        resultflux = accutraveltimefractionflux(LDD, material, transportvelocity, transportfraction)
-        resultstate = accutraveltimefractionstate(LDD, material, transportvelocity, transportfraction)
-        resultremoved = accutraveltimefractionremoved(LDD, material, transportvelocity, transportfraction)
-
-        outputFlux = self.parameterAsOutputLayer(parameters, self.OUTPUT_FLUX, context)
-        outputState = self.parameterAsOutputLayer(parameters, self.OUTPUT_STATE, context)
-        outputRemoved = self.parameterAsOutputLayer(parameters, self.OUTPUT_REMOVED, context)
-
-        report(resultflux, outputFlux)
-        report(resultstate, outputState)
-        report(resultremoved, outputRemoved)
-
-        self.set_output_crs(output_file=outputFlux, crs=input_flow_direction.crs(), feedback=feedback, context=context)
-        self.set_output_crs(output_file=outputState, crs=input_flow_direction.crs(), feedback=feedback, context=context)
-        self.set_output_crs(output_file=outputRemoved, crs=input_flow_direction.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_FLUX: outputFlux, self.OUTPUT_STATE: outputState, self.OUTPUT_REMOVED: outputRemoved}
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_FLOWDIRECTION, self.INPUT_MATERIAL, self.INPUT_VELOCITY, self.INPUT_FRACTION]
+
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_FLOWDIRECTION: 'Ldd'}
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        resultflux = pcr.accutraveltimefractionflux(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_VELOCITY], rasters[self.INPUT_FRACTION])
+        resultstate = pcr.accutraveltimefractionstate(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_VELOCITY], rasters[self.INPUT_FRACTION])
+        resultremoved = pcr.accutraveltimefractionremoved(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_VELOCITY], rasters[self.INPUT_FRACTION])
+        return {self.OUTPUT_FLUX: resultflux, self.OUTPUT_STATE: resultstate, self.OUTPUT_REMOVED: resultremoved}
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import csv
+from typing import List
+
+from qgis.core import (QgsProcessing,
+                       QgsProcessingException,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterFileDestination,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterRasterDestination,
+                       QgsProcessingParameterRasterLayer)
+
+from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.raster_writer import RasterWriter
+from pcraster_tools.processing.time_series import TravelTimeSeries
+
+
+class PCRasterAccutraveltimeseriesAlgorithm(PCRasterAlgorithm):
+    """
+    Transports a time series of material inputs downstream over a distance dependent on a given velocity
+    """
+
+    INPUT_OPERATION = 'OPERATION'
+    INPUT_FLOWDIRECTION = 'INPUT'
+    INPUT_MATERIAL_STACK = 'INPUT2'
+    INPUT_MATERIALS = 'MATERIALS'
+    INPUT_VELOCITY = 'INPUT3'
+    INPUT_FRACTION = 'INPUT4'
+    INPUT_INITIAL_STATE = 'INITIAL_STATE'
+    INPUT_CADENCE = 'CADENCE'
+    INPUT_SAMPLES = 'SAMPLES'
+    OUTPUT_FLUX = 'OUTPUT'
+    OUTPUT_STATE = 'OUTPUT2'
+    OUTPUT_REMOVED = 'OUTPUT3'
+    OUTPUT_FINAL_STATE = 'FINAL_STATE'
+    OUTPUT_TABLE = 'TABLE'
+
+    OPERATIONS = ['accutraveltime', 'accutraveltimefraction']
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return PCRasterAccutraveltimeseriesAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'accutraveltimeseries'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('accutraveltimeflux and accutraveltimefractionflux time series')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Hydrological and material transport operations')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'hydrological'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr(
+            """Transports a time series of material inputs downstream over a distance dependent on a given velocity. The material in transit (the state) of each time step is added to the material input of the next time step.
+
+            <a href="{}">PCRaster documentation</a>
+
+            Parameters:
+
+            * <b>Operation</b> (required) - accutraveltime or accutraveltimefraction
+            * <b>Input flow direction raster</b> (required) - Flow direction in PCRaster LDD format (see lddcreate)
+            * <b>Input material stack</b> (optional) - Scalar raster with the material input (>= 0) of each time step as band
+            * <b>Input material rasters</b> (optional) - Scalar rasters with the material input (>= 0) of each time step, instead of a material stack
+            * <b>Input velocity raster</b> (required) - Scalar raster with the distance per time step in map units (>=0)
+            * <b>Input fraction raster</b> (optional) - Scalar raster with the fraction of material removed per cell (0-1), required for accutraveltimefraction
+            * <b>Initial state raster</b> (optional) - Scalar raster with the material in transit before the first time step, 0 by default
+            * <b>Output cadence</b> (required) - the results are written every given number of time steps
+            * <b>Sample locations</b> (optional) - Nominal raster with the ids of the locations written to the time series table
+            * <b>Output Flux stack</b> (required) - GeoTIFF with the flux of material of the written time steps as bands
+            * <b>Output State stack</b> (optional) - GeoTIFF with the state of stored material of the written time steps as bands
+            * <b>Output Removed stack</b> (optional) - GeoTIFF with the removed material of the written time steps as bands (accutraveltimefraction)
+            * <b>Final state raster</b> (optional) - Scalar raster with the state after the last time step, to continue the series in a later run
+            * <b>Time series table</b> (optional) - CSV file with the flux at each sample location per written time step
+            """
+        ).format(PCRasterAlgorithm.documentation_url('op_accutraveltime.html'))
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.INPUT_OPERATION,
+                self.tr('Operation'),
+                self.OPERATIONS,
+                defaultValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_FLOWDIRECTION,
+                self.tr('Input Flow Direction Raster Layer')
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_MATERIAL_STACK,
+                self.tr('Input Material Stack (band per time step)'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.INPUT_MATERIALS,
+                self.tr('Input Material Raster Layers (layer per time step)'),
+                QgsProcessing.TypeRaster,
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_VELOCITY,
+                self.tr('Input Velocity Raster Layer')
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_FRACTION,
+                self.tr('Input Fraction Raster Layer'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_INITIAL_STATE,
+                self.tr('Initial State Raster Layer'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.INPUT_CADENCE,
+                self.tr('Output cadence (time steps)'),
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=1,
+                minValue=1
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(
+                self.INPUT_SAMPLES,
+                self.tr('Sample Locations Raster Layer'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.OUTPUT_FLUX,
+                self.tr('Output Material Flux Stack'),
+                self.tr('GeoTIFF files (*.tif)')
+            )
+        )
+
+        for name, description in ((self.OUTPUT_STATE, self.tr('Output State Stack')),
+                                  (self.OUTPUT_REMOVED, self.tr('Output Removed Material Stack'))):
+            self.addParameter(
+                QgsProcessingParameterFileDestination(
+                    name,
+                    description,
+                    self.tr('GeoTIFF files (*.tif)'),
+                    optional=True,
+                    createByDefault=False
+                )
+            )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_FINAL_STATE,
+                self.tr('Final State Raster Layer'),
+                optional=True,
+                createByDefault=False
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.OUTPUT_TABLE,
+                self.tr('Time Series Table'),
+                self.tr('CSV files (*.csv)'),
+                optional=True,
+                createByDefault=False
+            )
+        )
+
+    def material_inputs(self, pcr, parameters, context):
+        """
+        Returns the number of time steps and a function returning the material field of a
+        (0-based) time step
+        """
+        stack_layer = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL_STACK, context)
+        layers = self.parameterAsLayerList(parameters, self.INPUT_MATERIALS, context)
+        if bool(stack_layer) == bool(layers):
+            raise QgsProcessingException(self.tr('Give either a material stack or material raster layers'))
+
+        if layers:
+            return len(layers), lambda step: self.read_raster(layers[step])
+
+        stack = GdalLoader.open(stack_layer.dataProvider().dataSourceUri())
+        return stack.RasterCount, lambda step: GdalLoader.band_field(pcr, stack.GetRasterBand(step + 1), 'Scalar')
+
+    def optional_raster(self, parameters, name, context):
+        """
+        Returns the field of an optional raster layer parameter, or None if it is not set
+        """
+        layer = self.parameterAsRasterLayer(parameters, name, context)
+        return self.read_raster(layer) if layer else None
+
+    def read_series(self, pcr, parameters, ldd_layer, context) -> TravelTimeSeries:
+        """
+        Sets the clone to the LDD and reads the rasters of the operation
+        """
+        operation = self.OPERATIONS[self.parameterAsEnum(parameters, self.INPUT_OPERATION, context)]
+        GdalLoader.set_clone(pcr, ldd_layer.dataProvider().dataSourceUri())
+        fraction = None
+        if operation == 'accutraveltimefraction':
+            fraction = self.optional_raster(parameters, self.INPUT_FRACTION, context)
+            if fraction is None:
+                raise QgsProcessingException(self.tr('accutraveltimefraction needs a fraction raster'))
+        velocity = self.read_raster(self.parameterAsRasterLayer(parameters, self.INPUT_VELOCITY, context))
+        return TravelTimeSeries(pcr, operation, self.read_raster(ldd_layer, 'Ldd'), velocity, fraction=fraction,
+                                initial_state=self.optional_raster(parameters, self.INPUT_INITIAL_STATE, context))
+
+    def create_stacks(self, parameters, context, results: List[str], ldd_layer, report_steps: List[int]):
+        """
+        Creates the stacked GeoTIFF outputs of results which are set, a band per written time step.
+        Returns the output file paths and datasets by result name.
+        """
+        output_names = dict(zip(TravelTimeSeries.RESULTS, (self.OUTPUT_FLUX, self.OUTPUT_STATE, self.OUTPUT_REMOVED)))
+        output_files = {result: self.parameterAsFileOutput(parameters, output_names[result], context)
+                        for result in results}
+        output_files = {result: path for result, path in output_files.items() if path}
+        template = GdalLoader.open(ldd_layer.dataProvider().dataSourceUri())
+        crs_wkt = self.gdal_crs_wkt(ldd_layer.crs())
+        labels = ['step {}'.format(step) for step in report_steps]
+        return output_files, {result: RasterWriter.create_stack(path, 'Scalar', template, labels, crs_wkt)
+                              for result, path in output_files.items()}
+
+    def sample_table(self, pcr, samples):
+        """
+        Returns the header rows of the time series table and the cells of the sample locations
+        """
+        if samples is None:
+            raise QgsProcessingException(self.tr('The time series table needs sample locations'))
+        sample_ids, sample_cells = TravelTimeSeries.sample_cells(pcr.pcr2numpy(pcr.nominal(samples), 0))
+        return [['step'] + sample_ids], sample_cells
+
+    def process_phases(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,too-many-locals
+        pcr = self.pcraster_module()
+        ldd_layer = self.parameterAsRasterLayer(parameters, self.INPUT_FLOWDIRECTION, context)
+
+        with self.phase('read'):
+            series = self.read_series(pcr, parameters, ldd_layer, context)
+            steps, material = self.material_inputs(pcr, parameters, context)
+            samples = self.optional_raster(parameters, self.INPUT_SAMPLES, context)
+
+        report_steps = TravelTimeSeries.report_steps(steps, self.parameterAsInt(parameters, self.INPUT_CADENCE, context))
+        if not report_steps:
+            raise QgsProcessingException(self.tr('The output cadence is larger than the {} time steps').format(steps))
+
+        table_file = self.parameterAsFileOutput(parameters, self.OUTPUT_TABLE, context)
+        rows, sample_cells = self.sample_table(pcr, samples) if table_file else ([], None)
+        output_files, stacks = self.create_stacks(parameters, context, series.results(), ldd_layer, report_steps)
+
+        missing_value = GdalLoader.VALUE_SCALES['Scalar'][2]
+        band_numbers = {step_number: band_number for band_number, step_number in enumerate(report_steps, 1)}
+        for step in range(steps):
+            if feedback.isCanceled():
+                break
+            with self.phase('read'):
+                step_material = material(step)
+            with self.phase('operator'):
+                results = series.step(step_material)
+
+            band_number = band_numbers.get(series.step_number)
+            if band_number is not None:
+                with self.phase('report'):
+                    for result, ds in stacks.items():
+                        ds.GetRasterBand(band_number).WriteArray(pcr.pcr2numpy(results[result], missing_value))
+                    if table_file:
+                        rows.append(TravelTimeSeries.sample_row(series.step_number,
+                                                                pcr.pcr2numpy(results['flux'], missing_value),
+                                                                sample_cells, missing_value))
+            feedback.setProgress(100 * (step + 1) / steps)
+
+        with self.phase('report'):
+            for result, ds in stacks.items():
+                RasterWriter.finish(ds, output_files[result], 'Scalar')
+            # close the stacks
+            ds = None
+            stacks = None
+            for path in output_files.values():
+                RasterWriter.finalize(path, 'Scalar')
+
+            if table_file:
+                with open(table_file, 'w', encoding='utf-8', newline='') as f:
+                    csv.writer(f).writerows(rows)
+
+        outputs = {name: output_files[result] for result, name in zip(TravelTimeSeries.RESULTS, (
+            self.OUTPUT_FLUX, self.OUTPUT_STATE, self.OUTPUT_REMOVED)) if result in output_files}
+        if table_file:
+            outputs[self.OUTPUT_TABLE] = table_file
+        if self.parameterAsOutputLayer(parameters, self.OUTPUT_FINAL_STATE, context):
+            outputs.update(self.report_outputs({self.OUTPUT_FINAL_STATE: series.state}, parameters, context, feedback,
+                                               crs=ldd_layer.crs()))
+        return outputs
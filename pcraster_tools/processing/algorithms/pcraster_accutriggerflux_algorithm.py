@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -96,35 +95,13 @@ class PCRasterAccutriggerfluxAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                accutriggerflux,
-                accutriggerstate,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_flow_direction = self.parameterAsRasterLayer(parameters, self.INPUT_FLOWDIRECTION, context)
-        input_material = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL, context)
-        input_trigger = self.parameterAsRasterLayer(parameters, self.INPUT_TRIGGER, context)
-        setclone(input_flow_direction.dataProvider().dataSourceUri())
-        LDD = readmap(input_flow_direction.dataProvider().dataSourceUri())
-        material = readmap(input_material.dataProvider().dataSourceUri())
-        transporttrigger = readmap(input_trigger.dataProvider().dataSourceUri())
-        resultflux = accutriggerflux(LDD, material, transporttrigger)
-        resultstate = accutriggerstate(LDD, material, transporttrigger)
-
-        outputFlux = self.parameterAsOutputLayer(parameters, self.OUTPUT_FLUX, context)
-        outputState = self.parameterAsOutputLayer(parameters, self.OUTPUT_STATE, context)
-
-        report(resultflux, outputFlux)
-        report(resultstate, outputState)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_FLOWDIRECTION, self.INPUT_MATERIAL, self.INPUT_TRIGGER]
 
-        self.set_output_crs(output_file=outputFlux, crs=input_flow_direction.crs(), feedback=feedback, context=context)
-        self.set_output_crs(output_file=outputState, crs=input_flow_direction.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_FLOWDIRECTION: 'Ldd'}
 
-        return {self.OUTPUT_FLUX: outputFlux, self.OUTPUT_STATE: outputState}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        resultflux = pcr.accutriggerflux(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_TRIGGER])
+        resultstate = pcr.accutriggerstate(rasters[self.INPUT_FLOWDIRECTION], rasters[self.INPUT_MATERIAL], rasters[self.INPUT_TRIGGER])
+        return {self.OUTPUT_FLUX: resultflux, self.OUTPUT_STATE: resultstate}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -69,25 +68,8 @@ class PCRasterAcosAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                acos,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-
-        setclone(input_raster.dataProvider().dataSourceUri())
-        InputRaster = readmap(input_raster.dataProvider().dataSourceUri())
-        acosLayer = acos(InputRaster)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(acosLayer, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        return {self.OUTPUT_RASTER: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_RASTER: pcr.acos(rasters[self.INPUT_RASTER])}
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -82,31 +81,11 @@ class PCRasterAreaareaAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setglobaloption,
-                setclone,
-                readmap,
-                areaarea,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        AreaLayer = areaarea(ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREA, context)
-
-        report(AreaLayer, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
 
-        return {self.OUTPUT_AREA: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREA: pcr.areaarea(rasters[self.INPUT_DISCRETE])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -78,27 +77,8 @@ class PCRasterAreaaverageAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                areaaverage,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        input_scalar = self.parameterAsRasterLayer(parameters, self.INPUT_SCALAR, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        ScalarLayer = readmap(input_scalar.dataProvider().dataSourceUri())
-        AreaAverage = areaaverage(ScalarLayer, ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREAAVERAGE, context)
-
-        report(AreaAverage, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE, self.INPUT_SCALAR]
 
-        return {self.OUTPUT_AREAAVERAGE: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREAAVERAGE: pcr.areaaverage(rasters[self.INPUT_SCALAR], rasters[self.INPUT_DISCRETE])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -78,27 +77,8 @@ class PCRasterAreadiversityAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                areadiversity,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_class = self.parameterAsRasterLayer(parameters, self.INPUT_CLASS, context)
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_class.dataProvider().dataSourceUri())
-        DiscreteLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        AreaDiversity = areadiversity(DiscreteLayer, ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREADIVERSITY, context)
-
-        report(AreaDiversity, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE, self.INPUT_CLASS]
 
-        return {self.OUTPUT_AREADIVERSITY: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREADIVERSITY: pcr.areadiversity(rasters[self.INPUT_DISCRETE], rasters[self.INPUT_CLASS])}
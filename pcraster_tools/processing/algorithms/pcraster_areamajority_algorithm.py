@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -79,27 +78,8 @@ class PCRasterAreamajorityAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                areamajority,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_class = self.parameterAsRasterLayer(parameters, self.INPUT_CLASS, context)
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_class.dataProvider().dataSourceUri())
-        DiscreteLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        AreaMajority = areamajority(DiscreteLayer, ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREAMAJORITY, context)
-
-        report(AreaMajority, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE, self.INPUT_CLASS]
 
-        return {self.OUTPUT_AREAMAJORITY: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREAMAJORITY: pcr.areamajority(rasters[self.INPUT_DISCRETE], rasters[self.INPUT_CLASS])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -78,26 +77,8 @@ class PCRasterAreamaximumAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                areamaximum,
-                report
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-        input_class = self.parameterAsRasterLayer(parameters, self.INPUT_CLASS, context)
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        setclone(input_raster.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_class.dataProvider().dataSourceUri())
-        RasterLayer = readmap(input_raster.dataProvider().dataSourceUri())
-        AreaMaximum = areamaximum(RasterLayer, ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREAMAXIMUM, context)
-
-        report(AreaMaximum, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER, self.INPUT_CLASS]
 
-        return {self.OUTPUT_AREAMAXIMUM: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREAMAXIMUM: pcr.areamaximum(rasters[self.INPUT_RASTER], rasters[self.INPUT_CLASS])}
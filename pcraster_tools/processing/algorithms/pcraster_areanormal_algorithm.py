@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -26,6 +25,8 @@ class PCRasterAreanormalAlgorithm(PCRasterAlgorithm):
     INPUT_DISCRETE = 'INPUT'
     OUTPUT_AREANORMAL = 'OUTPUT'
 
+    STOCHASTIC = True
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterAreanormalAlgorithm()
 
@@ -51,6 +52,7 @@ class PCRasterAreanormalAlgorithm(PCRasterAlgorithm):
 
             * <b>Input class raster layer</b> (required) - boolean, nominal or ordinal raster layer
             * <b>Output area normal raster</b> (required) - scalar raster layer with value assigned to an area taken from a normal distribution
+            * <b>Random seed</b> (optional) - Seed for the random number generator, for reproducible results
             """
         ).format(PCRasterAlgorithm.documentation_url('op_areanormal.html'))
 
@@ -69,25 +71,10 @@ class PCRasterAreanormalAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                areanormal
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        AreaNormalLayer = areanormal(ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREANORMAL, context)
-
-        report(AreaNormalLayer, outputFilePath)
+        self.add_seed_parameter()
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE]
 
-        return {self.OUTPUT_AREANORMAL: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREANORMAL: pcr.areanormal(rasters[self.INPUT_DISCRETE])}
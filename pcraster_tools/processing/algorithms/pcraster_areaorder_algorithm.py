@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -78,27 +77,8 @@ class PCRasterAreaorderAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                areaorder
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        RasterLayer = readmap(input_raster.dataProvider().dataSourceUri())
-        AreaOrderLayer = areaorder(RasterLayer, ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREAORDER, context)
-
-        report(AreaOrderLayer, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE, self.INPUT_RASTER]
 
-        return {self.OUTPUT_AREAORDER: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREAORDER: pcr.areaorder(rasters[self.INPUT_RASTER], rasters[self.INPUT_DISCRETE])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -26,6 +25,8 @@ class PCRasterAreauniformAlgorithm(PCRasterAlgorithm):
     INPUT_DISCRETE = 'INPUT'
     OUTPUT_AREAUNIFORM = 'OUTPUT'
 
+    STOCHASTIC = True
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterAreauniformAlgorithm()
 
@@ -51,6 +52,7 @@ class PCRasterAreauniformAlgorithm(PCRasterAlgorithm):
 
             * <b>Input class raster layer</b> (required) - boolean, nominal or ordinal raster layer
             * <b>Output area normal raster</b> (required) - scalar raster layer with value assigned to an area taken from a uniform distribution
+            * <b>Random seed</b> (optional) - Seed for the random number generator, for reproducible results
             """
         ).format(PCRasterAlgorithm.documentation_url('op_areauniform.html'))
 
@@ -69,25 +71,10 @@ class PCRasterAreauniformAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                areauniform
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_DISCRETE, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        AreaUniformLayer = areauniform(ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_AREAUNIFORM, context)
-
-        report(AreaUniformLayer, outputFilePath)
+        self.add_seed_parameter()
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DISCRETE]
 
-        return {self.OUTPUT_AREAUNIFORM: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_AREAUNIFORM: pcr.areauniform(rasters[self.INPUT_DISCRETE])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -71,26 +70,8 @@ class PCRasterAspectAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                aspect
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_dem = self.parameterAsRasterLayer(parameters, self.INPUT_DEM, context)
-
-        setclone(input_dem.dataProvider().dataSourceUri())
-        DEM = readmap(input_dem.dataProvider().dataSourceUri())
-        AspectLayer = aspect(DEM)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_ASPECT, context)
-
-        report(AspectLayer, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_dem.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DEM]
 
-        return {self.OUTPUT_ASPECT: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_ASPECT: pcr.aspect(rasters[self.INPUT_DEM])}
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -29,6 +28,8 @@ class PCRasterBooleanOperatorsAlgorithm(PCRasterAlgorithm):
     INPUT_BOOLEAN2 = 'INPUT2'
     OUTPUT = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_LOCAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterBooleanOperatorsAlgorithm()
 
@@ -91,36 +92,21 @@ class PCRasterBooleanOperatorsAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                pcrand,
-                pcrxor,
-                pcror
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_BOOLEAN1, self.INPUT_BOOLEAN2]
+
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_BOOLEAN1: 'Boolean', self.INPUT_BOOLEAN2: 'Boolean'}
 
-        input_boolean1 = self.parameterAsRasterLayer(parameters, self.INPUT_BOOLEAN1, context)
-        input_boolean2 = self.parameterAsRasterLayer(parameters, self.INPUT_BOOLEAN2, context)
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        expression1 = rasters[self.INPUT_BOOLEAN1]
+        expression2 = rasters[self.INPUT_BOOLEAN2]
         booleanoperator = self.parameterAsEnum(parameters, self.INPUT_OPERATOR, context)
-        setclone(input_boolean1.dataProvider().dataSourceUri())
-        Expression1 = readmap(input_boolean1.dataProvider().dataSourceUri())
-        Expression2 = readmap(input_boolean2.dataProvider().dataSourceUri())
         if booleanoperator == 0:
-            ResultBoolean = pcrand(Expression1, Expression2)
+            result_boolean = pcr.pcrand(expression1, expression2)
         elif booleanoperator == 1:
-            ResultBoolean = pcror(Expression1, Expression2)
+            result_boolean = pcr.pcror(expression1, expression2)
         else:
-            ResultBoolean = pcrxor(Expression1, Expression2)
-
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT, context)
-
-        report(ResultBoolean, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_boolean1.crs(), feedback=feedback, context=context)
+            result_boolean = pcr.pcrxor(expression1, expression2)
 
-        return {self.OUTPUT: outputFilePath}
+        return {self.OUTPUT: result_boolean}
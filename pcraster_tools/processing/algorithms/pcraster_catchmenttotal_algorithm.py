@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -78,26 +77,11 @@ class PCRasterCatchmenttotalAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                catchmenttotal
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_ldd = self.parameterAsRasterLayer(parameters, self.INPUT_LDD, context)
-        input_material = self.parameterAsRasterLayer(parameters, self.INPUT_MATERIAL, context)
-        setclone(input_ldd.dataProvider().dataSourceUri())
-        LDD = readmap(input_ldd.dataProvider().dataSourceUri())
-        Material = readmap(input_material.dataProvider().dataSourceUri())
-        ResultFlux = catchmenttotal(Material, LDD)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_ACCUFLUX, context)
-        report(ResultFlux, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_LDD, self.INPUT_MATERIAL]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_ldd.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_LDD: 'Ldd'}
 
-        return {self.OUTPUT_ACCUFLUX: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_ACCUFLUX: pcr.catchmenttotal(rasters[self.INPUT_MATERIAL], rasters[self.INPUT_LDD])}
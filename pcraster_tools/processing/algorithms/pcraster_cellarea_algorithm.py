@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -41,7 +40,7 @@ class PCRastercellareaAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr(
@@ -89,29 +88,11 @@ class PCRastercellareaAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                report,
-                setglobaloption,
-                cellarea
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
-        setclone(input_raster.dataProvider().dataSourceUri())
-        cellareaLayer = cellarea()
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(cellareaLayer, outputFilePath)
+    def clone_input(self):  # pylint: disable=missing-function-docstring
+        return self.INPUT_RASTER
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
 
-        return {self.OUTPUT_RASTER: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_RASTER: pcr.cellarea()}
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -82,31 +81,11 @@ class PCRasterClumpAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                setglobaloption,
-                clump
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        direction_options = self.parameterAsEnum(parameters, self.INPUT_DIRECTIONS, context)
-        if direction_options == 0:
-            setglobaloption("diagonal")
-        else:
-            setglobaloption("nondiagonal")
-        setclone(input_raster.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_raster.dataProvider().dataSourceUri())
-        ClumpResult = clump(ClassLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_CLUMP, context)
-
-        report(ClumpResult, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_DIRECTIONS, context, ('diagonal', 'nondiagonal'))]
 
-        return {self.OUTPUT_CLUMP: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_CLUMP: pcr.clump(rasters[self.INPUT_RASTER])}
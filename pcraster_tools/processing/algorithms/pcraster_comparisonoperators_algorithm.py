@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -29,6 +28,8 @@ class PCRasterComparisonOperatorsAlgorithm(PCRasterAlgorithm):
     INPUT2 = 'INPUT2'
     OUTPUT = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_LOCAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterComparisonOperatorsAlgorithm()
 
@@ -91,39 +92,24 @@ class PCRasterComparisonOperatorsAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT1, self.INPUT2]
 
-        input1 = self.parameterAsRasterLayer(parameters, self.INPUT1, context)
-        input2 = self.parameterAsRasterLayer(parameters, self.INPUT2, context)
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        expression1 = rasters[self.INPUT1]
+        expression2 = rasters[self.INPUT2]
         comparisonoperator = self.parameterAsEnum(parameters, self.INPUT_OPERATOR, context)
-        setclone(input1.dataProvider().dataSourceUri())
-        Expression1 = readmap(input1.dataProvider().dataSourceUri())
-        Expression2 = readmap(input2.dataProvider().dataSourceUri())
         if comparisonoperator == 0:
-            ResultComparison = Expression1 == Expression2
+            result_comparison = expression1 == expression2
         elif comparisonoperator == 1:
-            ResultComparison = Expression1 >= Expression2
+            result_comparison = expression1 >= expression2
         elif comparisonoperator == 2:
-            ResultComparison = Expression1 > Expression2
+            result_comparison = expression1 > expression2
         elif comparisonoperator == 3:
-            ResultComparison = Expression1 <= Expression2
+            result_comparison = expression1 <= expression2
         elif comparisonoperator == 4:
-            ResultComparison = Expression1 < Expression2
+            result_comparison = expression1 < expression2
         else:
-            ResultComparison = Expression1 != Expression2
-
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT, context)
-
-        report(ResultComparison, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input1.crs(), feedback=feedback, context=context)
+            result_comparison = expression1 != expression2
 
-        return {self.OUTPUT: outputFilePath}
+        return {self.OUTPUT: result_comparison}
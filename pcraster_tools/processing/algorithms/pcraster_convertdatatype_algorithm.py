@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -28,6 +27,8 @@ class PCRasterConvertdatatypeAlgorithm(PCRasterAlgorithm):
     INPUT_DATATYPE = 'INPUT1'
     OUTPUT_RASTER = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_LOCAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterConvertdatatypeAlgorithm()
 
@@ -41,7 +42,7 @@ class PCRasterConvertdatatypeAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr(
@@ -77,42 +78,23 @@ class PCRasterConvertdatatypeAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                readmap,
-                report,
-                boolean,
-                ordinal,
-                scalar,
-                directional,
-                nominal,
-                ldd
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        InputRaster = readmap(input_raster.dataProvider().dataSourceUri())
-        # setclone(input_raster.dataProvider().dataSourceUri())
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        input_raster = rasters[self.INPUT_RASTER]
         input_datatype = self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)
         if input_datatype == 0:
-            ConversionResult = boolean(InputRaster)
+            conversion_result = pcr.boolean(input_raster)
         elif input_datatype == 1:
-            ConversionResult = nominal(InputRaster)
+            conversion_result = pcr.nominal(input_raster)
         elif input_datatype == 2:
-            ConversionResult = ordinal(InputRaster)
+            conversion_result = pcr.ordinal(input_raster)
         elif input_datatype == 3:
-            ConversionResult = scalar(InputRaster)
+            conversion_result = pcr.scalar(input_raster)
         elif input_datatype == 4:
-            ConversionResult = directional(InputRaster)
+            conversion_result = pcr.directional(input_raster)
         else:
-            ConversionResult = ldd(InputRaster)
-
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(ConversionResult, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+            conversion_result = pcr.ldd(input_raster)
 
-        return {self.OUTPUT_RASTER: outputFilePath}
+        return {self.OUTPUT_RASTER: conversion_result}
@@ -14,8 +14,7 @@
 from qgis.core import (QgsProcessing,
                        QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterMultipleLayers,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -81,31 +80,9 @@ class PCRasterCoverAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                cover
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        input_cover = []
-        for layer in self.parameterAsLayerList(parameters, self.INPUT_COVER, context):
-            input_cover.append(layer.source())
-
-        # input_cover = self.parameterAsFileList(parameters, self.INPUT_COVER, context)
-        setclone(input_raster.dataProvider().dataSourceUri())
-        InputRaster = readmap(input_raster.dataProvider().dataSourceUri())
-        # coverLayer = readmap(input_cover.dataProvider().dataSourceUri())
-        resultLayer = cover(InputRaster, *input_cover)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(resultLayer, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        return {self.OUTPUT_RASTER: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        input_cover = [self.read_raster(layer) for layer in self.parameterAsLayerList(parameters, self.INPUT_COVER, context)]
+        return {self.OUTPUT_RASTER: pcr.cover(rasters[self.INPUT_RASTER], *input_cover)}
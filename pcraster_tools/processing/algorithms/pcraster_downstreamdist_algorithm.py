@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -82,31 +81,14 @@ class PCRasterDownstreamdistAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                setglobaloption,
-                downstreamdist
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_ldd = self.parameterAsRasterLayer(parameters, self.INPUT_LDD, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
-        setclone(input_ldd.dataProvider().dataSourceUri())
-        LDD = readmap(input_ldd.dataProvider().dataSourceUri())
-        Distance = downstreamdist(LDD)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_DOWNSTREAMDIST, context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_LDD]
 
-        report(Distance, outputFilePath)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_LDD: 'Ldd'}
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_ldd.crs(), feedback=feedback, context=context)
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
 
-        return {self.OUTPUT_DOWNSTREAMDIST: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_DOWNSTREAMDIST: pcr.downstreamdist(rasters[self.INPUT_LDD])}
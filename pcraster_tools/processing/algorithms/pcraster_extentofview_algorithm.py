@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
-                       QgsProcessingParameterNumber,
-                       QgsProcessingException)
+                       QgsProcessingParameterNumber)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -80,26 +79,9 @@ class PCRasterExtentofviewAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                extentofview
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_CLASSES]
 
-        input_discrete = self.parameterAsRasterLayer(parameters, self.INPUT_CLASSES, context)
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         input_directions = self.parameterAsDouble(parameters, self.INPUT_DIRECTIONS, context)
-        setclone(input_discrete.dataProvider().dataSourceUri())
-        ClassLayer = readmap(input_discrete.dataProvider().dataSourceUri())
-        ResultExtentOfView = extentofview(ClassLayer, input_directions)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(ResultExtentOfView, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_discrete.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_RASTER: outputFilePath}
+        return {self.OUTPUT_RASTER: pcr.extentofview(rasters[self.INPUT_CLASSES], input_directions)}
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
-                       QgsProcessingParameterNumber,
-                       QgsProcessingException)
+                       QgsProcessingParameterNumber)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -80,26 +79,9 @@ class PCRasterHorizontanAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                horizontan
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DEM]
 
-        input_dem = self.parameterAsRasterLayer(parameters, self.INPUT_DEM, context)
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         input_angle = self.parameterAsDouble(parameters, self.INPUT_ANGLE, context)
-        setclone(input_dem.dataProvider().dataSourceUri())
-        DEM = readmap(input_dem.dataProvider().dataSourceUri())
-        ResultHorizontan = horizontan(DEM, input_angle)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(ResultHorizontan, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_dem.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_RASTER: outputFilePath}
+        return {self.OUTPUT_RASTER: pcr.horizontan(rasters[self.INPUT_DEM], input_angle)}
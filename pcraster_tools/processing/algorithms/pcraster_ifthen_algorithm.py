@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -27,6 +26,8 @@ class PCRasterIfThenAlgorithm(PCRasterAlgorithm):
     INPUT_TRUE = 'INPUT1'
     OUTPUT = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_LOCAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterIfThenAlgorithm()
 
@@ -78,28 +79,11 @@ class PCRasterIfThenAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                ifthen
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_condition = self.parameterAsRasterLayer(parameters, self.INPUT_CONDITION, context)
-        input_true = self.parameterAsRasterLayer(parameters, self.INPUT_TRUE, context)
-        setclone(input_condition.dataProvider().dataSourceUri())
-        conditionRaster = readmap(input_condition.dataProvider().dataSourceUri())
-        trueRaster = readmap(input_true.dataProvider().dataSourceUri())
-        resultRaster = ifthen(conditionRaster, trueRaster)
-
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT, context)
-
-        report(resultRaster, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_CONDITION, self.INPUT_TRUE]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_condition.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_CONDITION: 'Boolean'}
 
-        return {self.OUTPUT: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT: pcr.ifthen(rasters[self.INPUT_CONDITION], rasters[self.INPUT_TRUE])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -28,6 +27,8 @@ class PCRasterIfThenElseAlgorithm(PCRasterAlgorithm):
     INPUT_FALSE = 'INPUT2'
     OUTPUT = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_LOCAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterIfThenElseAlgorithm()
 
@@ -87,30 +88,11 @@ class PCRasterIfThenElseAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                ifthenelse
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_condition = self.parameterAsRasterLayer(parameters, self.INPUT_CONDITION, context)
-        input_true = self.parameterAsRasterLayer(parameters, self.INPUT_TRUE, context)
-        input_false = self.parameterAsRasterLayer(parameters, self.INPUT_FALSE, context)
-        setclone(input_condition.dataProvider().dataSourceUri())
-        conditionRaster = readmap(input_condition.dataProvider().dataSourceUri())
-        trueRaster = readmap(input_true.dataProvider().dataSourceUri())
-        falseRaster = readmap(input_false.dataProvider().dataSourceUri())
-        resultRaster = ifthenelse(conditionRaster, trueRaster, falseRaster)
-
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT, context)
-
-        report(resultRaster, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_CONDITION, self.INPUT_TRUE, self.INPUT_FALSE]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_condition.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_CONDITION: 'Boolean'}
 
-        return {self.OUTPUT: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT: pcr.ifthenelse(rasters[self.INPUT_CONDITION], rasters[self.INPUT_TRUE], rasters[self.INPUT_FALSE])}
@@ -14,8 +14,7 @@
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterNumber,
-                       QgsProcessingException)
+                       QgsProcessingParameterNumber)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -122,35 +121,17 @@ class PCRasterInversedistanceAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                setglobaloption,
-                inversedistance
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_MASK, self.INPUT_POINTS]
+
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_MASK: 'Boolean'}
+
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
 
-        input_mask = self.parameterAsRasterLayer(parameters, self.INPUT_MASK, context)
-        input_points = self.parameterAsRasterLayer(parameters, self.INPUT_POINTS, context)
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         input_idp = self.parameterAsDouble(parameters, self.INPUT_IDP, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
         input_radius = self.parameterAsDouble(parameters, self.INPUT_RADIUS, context)
         input_maxnr = self.parameterAsDouble(parameters, self.INPUT_MAXNR, context)
-        setclone(input_mask.dataProvider().dataSourceUri())
-        MaskLayer = readmap(input_mask.dataProvider().dataSourceUri())
-        PointsLayer = readmap(input_points.dataProvider().dataSourceUri())
-        IDW = inversedistance(MaskLayer, PointsLayer, input_idp, input_radius, input_maxnr)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_INVERSEDISTANCE, context)
-        report(IDW, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_mask.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_INVERSEDISTANCE: outputFilePath}
+        return {self.OUTPUT_INVERSEDISTANCE: pcr.inversedistance(rasters[self.INPUT_MASK], rasters[self.INPUT_POINTS], input_idp, input_radius, input_maxnr)}
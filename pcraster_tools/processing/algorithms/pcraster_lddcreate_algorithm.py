@@ -14,10 +14,11 @@
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterNumber,
-                       QgsProcessingException)
+                       QgsProcessingParameterNumber)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.ldd_tiling import TiledLddCreation
+from pcraster_tools.processing.settings import PCRasterSettings
 
 
 class PCRasterLDDCreateAlgorithm(PCRasterAlgorithm):
@@ -34,6 +35,8 @@ class PCRasterLDDCreateAlgorithm(PCRasterAlgorithm):
     INPUT_PRECIPITATION = 'INPUT5'
     OUTPUT_LDD = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_GLOBAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterLDDCreateAlgorithm()
 
@@ -64,7 +67,10 @@ class PCRasterLDDCreateAlgorithm(PCRasterAlgorithm):
             * <b>Core volume value</b> (required) - core volume
             * <b>Core area value</b> (required) - core area
             * <b>Catchment precipitation</b> (required) - catchment precipitation
+            * <b>Use the strip-wise method instead of PCRaster</b> (advanced) - create the LDD strip by strip with a priority-flood, for DEMs larger than memory
             * <b>Local drain direction layer output</b> (required) - raster with local drain direction (ldd data type)
+
+            The strip-wise method is not PCRaster lddcreate, and its LDD is not the same: it only runs when all pits are removed (edge pits not removed and all thresholds at least 9999999), fills depressions to their spill elevation and drains flat areas to the neighbour closest to the edge of the flat, with ties broken in a fixed neighbour order. Cells in flat areas, and cells with several equally steep downslope neighbours, can drain in other directions than with lddcreate. Its result does not depend on the strip size, set by the tile rows setting or about 4 million cells by default, nor on the number of worker processes. Each strip of 2 million cells takes a few seconds, so a DEM of billions of cells takes hours even with several workers.
             """
         ).format(PCRasterAlgorithm.documentation_url('op_lddcreate.html'))
 
@@ -132,6 +138,8 @@ class PCRasterLDDCreateAlgorithm(PCRasterAlgorithm):
             )
         )
 
+        self.add_strips_parameter()
+
         self.addParameter(
             QgsProcessingParameterRasterDestination(
                 self.OUTPUT_LDD,
@@ -139,39 +147,36 @@ class PCRasterLDDCreateAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                setglobaloption,
-                lddcreate
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_dem = self.parameterAsRasterLayer(parameters, self.INPUT_DEM, context)
-        edgesetting = self.parameterAsEnum(parameters, self.INPUT_EDGE, context)
-        if edgesetting == 0:
-            setglobaloption("lddout")
-        else:
-            setglobaloption("lddin")
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_DEM]
+
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [
+            self.parameter_as_option(parameters, self.INPUT_EDGE, context, ('lddout', 'lddin')),
+            self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))
+        ]
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         input_outflowdepth = self.parameterAsDouble(parameters, self.INPUT_OUTFLOWDEPTH, context)
         input_corearea = self.parameterAsDouble(parameters, self.INPUT_COREAREA, context)
         input_corevolume = self.parameterAsDouble(parameters, self.INPUT_COREVOLUME, context)
         input_precipitation = self.parameterAsDouble(parameters, self.INPUT_PRECIPITATION, context)
-        setclone(input_dem.dataProvider().dataSourceUri())
-        DEM = readmap(input_dem.dataProvider().dataSourceUri())
-        LDD = lddcreate(DEM, input_outflowdepth, input_corearea, input_corevolume, input_precipitation)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_LDD, context)
-        report(LDD, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_dem.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_LDD: outputFilePath}
+        return {self.OUTPUT_LDD: pcr.lddcreate(rasters[self.INPUT_DEM], input_outflowdepth, input_corearea, input_corevolume, input_precipitation)}
+
+    def process_tiled(self, pcr, parameters, context, feedback, output_files):  # pylint: disable=missing-function-docstring,unused-argument
+        thresholds = [self.parameterAsDouble(parameters, name, context) for name in
+                      (self.INPUT_OUTFLOWDEPTH, self.INPUT_COREAREA, self.INPUT_COREVOLUME, self.INPUT_PRECIPITATION)]
+        if not TiledLddCreation.removes_all_pits(self.global_options(parameters, context), thresholds):
+            feedback.pushInfo(self.tr('Only removing all pits runs in strips, processing the whole raster'))
+            return None
+
+        feedback.pushInfo(self.tr('Creating the LDD with the strip-wise method, which can differ from PCRaster lddcreate '
+                                  'in flat areas'))
+        dem_layer = self.parameterAsRasterLayer(parameters, self.INPUT_DEM, context)
+        workers = PCRasterSettings.worker_count()
+        strip_rows = TiledLddCreation.strip_rows(dem_layer.height(), dem_layer.width(), workers,
+                                                PCRasterSettings.tile_rows())
+        TiledLddCreation.run(dem_layer.dataProvider().dataSourceUri(), ldd_file=output_files[self.OUTPUT_LDD],
+                             strip_rows=strip_rows, workers=workers, feedback=feedback,
+                             crs_wkt=self.gdal_crs_wkt(dem_layer.crs()))
+        return {self.OUTPUT_LDD: output_files[self.OUTPUT_LDD]}
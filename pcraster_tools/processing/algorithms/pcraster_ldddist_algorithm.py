@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -100,34 +99,14 @@ class PCRasterLDDDistAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                ldddist,
-                setglobaloption
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_ldd = self.parameterAsRasterLayer(parameters, self.INPUT_LDD, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
-        input_points = self.parameterAsRasterLayer(parameters, self.INPUT_POINTS, context)
-        input_friction = self.parameterAsRasterLayer(parameters, self.INPUT_FRICTION, context)
-        setclone(input_ldd.dataProvider().dataSourceUri())
-        LDD = readmap(input_ldd.dataProvider().dataSourceUri())
-        Points = readmap(input_points.dataProvider().dataSourceUri())
-        Friction = readmap(input_friction.dataProvider().dataSourceUri())
-        LDDDistance = ldddist(LDD, Points, Friction)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_LDDDIST, context)
-        report(LDDDistance, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_ldd.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_LDDDIST: outputFilePath}
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_LDD, self.INPUT_POINTS, self.INPUT_FRICTION]
+
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_LDD: 'Ldd', self.INPUT_POINTS: 'Boolean'}
+
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_LDDDIST: pcr.ldddist(rasters[self.INPUT_LDD], rasters[self.INPUT_POINTS], rasters[self.INPUT_FRICTION])}
@@ -15,10 +15,10 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterFile,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterMultipleLayers,
-                       QgsProcessingException)
+                       QgsProcessingParameterMultipleLayers)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.gdal_loader import GdalLoader
 
 
 class PCRasterLookupAlgorithm(PCRasterAlgorithm):
@@ -97,25 +97,11 @@ class PCRasterLookupAlgorithm(PCRasterAlgorithm):
         )
 
     def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                report,
-                lookupboolean,
-                lookupnominal,
-                lookupordinal,
-                lookupscalar,
-                lookupdirectional,
-                lookupldd
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+        pcr = self.pcraster_module()
 
         input_rasters = []
         input_raster_crs = None
         for layer in self.parameterAsLayerList(parameters, self.INPUT_RASTERS, context):
-            if not layer.source().lower().endswith('.map'):
-                raise QgsProcessingException('Only PCRaster .map format can be used as input')
             input_rasters.append(layer.source())
             if input_raster_crs is None and layer.crs().isValid():
                 input_raster_crs = layer.crs()
@@ -123,26 +109,21 @@ class PCRasterLookupAlgorithm(PCRasterAlgorithm):
                 feedback.pushWarning(self.tr('Input raster layers have mixed CRS'))
 
         input_lookuptable = self.parameterAsFile(parameters, self.INPUT_TABLE, context)
-        setclone(input_rasters[0])
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
+        GdalLoader.set_clone(pcr, input_rasters[0])
+        input_fields = [self.read_raster(input_raster) for input_raster in input_rasters]
 
         input_datatype = self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)
         if input_datatype == 0:
-            Result = lookupboolean(input_lookuptable, *input_rasters)
+            result = pcr.lookupboolean(input_lookuptable, *input_fields)
         elif input_datatype == 1:
-            Result = lookupnominal(input_lookuptable, *input_rasters)
+            result = pcr.lookupnominal(input_lookuptable, *input_fields)
         elif input_datatype == 2:
-            Result = lookupordinal(input_lookuptable, *input_rasters)
+            result = pcr.lookupordinal(input_lookuptable, *input_fields)
         elif input_datatype == 3:
-            Result = lookupscalar(input_lookuptable, *input_rasters)
+            result = pcr.lookupscalar(input_lookuptable, *input_fields)
         elif input_datatype == 4:
-            Result = lookupdirectional(input_lookuptable, *input_rasters)
+            result = pcr.lookupdirectional(input_lookuptable, *input_fields)
         else:
-            Result = lookupldd(input_lookuptable, *input_rasters)
-
-        report(Result, outputFilePath)
-
-        if input_raster_crs is not None:
-            self.set_output_crs(output_file=outputFilePath, crs=input_raster_crs, feedback=feedback, context=context)
+            result = pcr.lookupldd(input_lookuptable, *input_fields)
 
-        return {self.OUTPUT_RASTER: outputFilePath}
+        return self.report_outputs({self.OUTPUT_RASTER: result}, parameters, context, feedback, crs=input_raster_crs)
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
-                       QgsProcessingParameterFile,
-                       QgsProcessingException)
+                       QgsProcessingParameterFile)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -79,27 +78,9 @@ class PCRasterLookuplinearAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                lookuplinear
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         input_lookuptable = self.parameterAsFile(parameters, self.INPUT_TABLE, context)
-        setclone(input_raster.dataProvider().dataSourceUri())
-        rasterlayer = readmap(input_raster.dataProvider().dataSourceUri())
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        resultlayer = lookuplinear(input_lookuptable, rasterlayer)
-
-        report(resultlayer, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_RASTER: outputFilePath}
+        return {self.OUTPUT_RASTER: pcr.lookuplinear(input_lookuptable, rasters[self.INPUT_RASTER])}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -26,6 +25,8 @@ class PCRasterMapnormalAlgorithm(PCRasterAlgorithm):
     INPUT_CLONE = 'INPUT'
     OUTPUT_MAPNORMAL = 'OUTPUT'
 
+    STOCHASTIC = True
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterMapnormalAlgorithm()
 
@@ -51,6 +52,7 @@ class PCRasterMapnormalAlgorithm(PCRasterAlgorithm):
 
             * <b>Input mask raster layer</b> (required) - Raster layer of any data type with the mask for which the values will be calculated
             * <b>Output map normal raster</b> (required) - scalar raster layer with value assigned from a normal distribution
+            * <b>Random seed</b> (optional) - Seed for the random number generator, for reproducible results
             """
         ).format(PCRasterAlgorithm.documentation_url('op_mapnormal.html'))
 
@@ -69,24 +71,10 @@ class PCRasterMapnormalAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                report,
-                mapnormal
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_clone = self.parameterAsRasterLayer(parameters, self.INPUT_CLONE, context)
-
-        setclone(input_clone.dataProvider().dataSourceUri())
-        MapNormalLayer = mapnormal()
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_MAPNORMAL, context)
-
-        report(MapNormalLayer, outputFilePath)
+        self.add_seed_parameter()
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_clone.crs(), feedback=feedback, context=context)
+    def clone_input(self):  # pylint: disable=missing-function-docstring
+        return self.INPUT_CLONE
 
-        return {self.OUTPUT_MAPNORMAL: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_MAPNORMAL: pcr.mapnormal()}
@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -26,6 +25,8 @@ class PCRasterNormalAlgorithm(PCRasterAlgorithm):
     INPUT_BOOLEAN = 'INPUT'
     OUTPUT = 'OUTPUT'
 
+    STOCHASTIC = True
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterNormalAlgorithm()
 
@@ -51,6 +52,7 @@ class PCRasterNormalAlgorithm(PCRasterAlgorithm):
 
             * <b>Input boolean raster</b> (required) - Raster layer with boolean data type
             * <b>Output raster</b> (required) - Scalar raster with values taken from a normal distribution
+            * <b>Random seed</b> (optional) - Seed for the random number generator, for reproducible results
             """
         ).format(PCRasterAlgorithm.documentation_url('op_normal.html'))
 
@@ -69,26 +71,13 @@ class PCRasterNormalAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                normal
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_boolean = self.parameterAsRasterLayer(parameters, self.INPUT_BOOLEAN, context)
-
-        setclone(input_boolean.dataProvider().dataSourceUri())
-        InputBoolean = readmap(input_boolean.dataProvider().dataSourceUri())
-        NormalLayer = normal(InputBoolean)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT, context)
+        self.add_seed_parameter()
 
-        report(NormalLayer, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_BOOLEAN]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_boolean.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_BOOLEAN: 'Boolean'}
 
-        return {self.OUTPUT: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT: pcr.normal(rasters[self.INPUT_BOOLEAN])}
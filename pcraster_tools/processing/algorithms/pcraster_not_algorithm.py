@@ -10,8 +10,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -24,6 +23,8 @@ class PCRasterNotAlgorithm(PCRasterAlgorithm):
     INPUT_RASTER = 'INPUT'
     OUTPUT_RASTER = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_LOCAL
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterNotAlgorithm()
 
@@ -67,26 +68,11 @@ class PCRasterNotAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel, redefined-builtin
-                setclone,
-                readmap,
-                report,
-                pcrnot
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-
-        setclone(input_raster.dataProvider().dataSourceUri())
-        input_raster = readmap(input_raster.dataProvider().dataSourceUri())
-        not_layer = pcrnot(input_raster)
-        output_file_path = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(not_layer, output_file_path)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        self.set_output_crs(output_file=output_file_path, crs=input_raster.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_RASTER: 'Boolean'}
 
-        return {self.OUTPUT_RASTER: output_file_path}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_RASTER: pcr.pcrnot(rasters[self.INPUT_RASTER])}
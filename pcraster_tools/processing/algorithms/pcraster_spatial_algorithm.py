@@ -43,7 +43,7 @@ class PCRasterSpatialAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr(
@@ -94,46 +94,26 @@ class PCRasterSpatialAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                report,
-                spatial,
-                boolean,
-                nominal,
-                ordinal,
-                scalar,
-                directional,
-                ldd
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
+    def clone_input(self):  # pylint: disable=missing-function-docstring
+        return self.INPUT_CLONE
 
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         input_nonspatial = self.parameterAsDouble(parameters, self.INPUT_NONSPATIAL, context)
-        input_clone = self.parameterAsRasterLayer(parameters, self.INPUT_CLONE, context)
-        setclone(input_clone.dataProvider().dataSourceUri())
         input_datatype = self.parameterAsEnum(parameters, self.INPUT_DATATYPE, context)
         if input_datatype == 0:
-            SpatialResult = spatial(boolean(input_nonspatial))
+            spatial_result = pcr.spatial(pcr.boolean(input_nonspatial))
         elif input_datatype == 1:
-            SpatialResult = spatial(nominal(input_nonspatial))
+            spatial_result = pcr.spatial(pcr.nominal(input_nonspatial))
         elif input_datatype == 2:
-            SpatialResult = spatial(ordinal(input_nonspatial))
+            spatial_result = pcr.spatial(pcr.ordinal(input_nonspatial))
         elif input_datatype == 3:
-            SpatialResult = spatial(scalar(input_nonspatial))
+            spatial_result = pcr.spatial(pcr.scalar(input_nonspatial))
         elif input_datatype == 4:
-            SpatialResult = spatial(directional(input_nonspatial))
+            spatial_result = pcr.spatial(pcr.directional(input_nonspatial))
         elif input_datatype == 5:
-            SpatialResult = spatial(ldd(input_nonspatial))
+            spatial_result = pcr.spatial(pcr.ldd(input_nonspatial))
         else:
             raise QgsProcessingException(
                 f'Invalid datatype: {input_datatype}')
 
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-
-        report(SpatialResult, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_clone.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_RASTER: outputFilePath}
+        return {self.OUTPUT_RASTER: spatial_result}
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
-                       QgsProcessingParameterEnum,
-                       QgsProcessingException)
+                       QgsProcessingParameterEnum)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -100,34 +99,11 @@ class PCRasterSpreadAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                spread,
-                setglobaloption
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_points = self.parameterAsRasterLayer(parameters, self.INPUT_POINTS, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
-        input_initial = self.parameterAsRasterLayer(parameters, self.INPUT_INITIALFRICTION, context)
-        input_friction = self.parameterAsRasterLayer(parameters, self.INPUT_FRICTION, context)
-        setclone(input_points.dataProvider().dataSourceUri())
-        PointsLayer = readmap(input_points.dataProvider().dataSourceUri())
-        InitialFriction = readmap(input_initial.dataProvider().dataSourceUri())
-        Friction = readmap(input_friction.dataProvider().dataSourceUri())
-        SpreadLayer = spread(PointsLayer, InitialFriction, Friction)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_SPREAD, context)
-        report(SpreadLayer, outputFilePath)
-
-        self.set_output_crs(output_file=outputFilePath, crs=input_points.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_SPREAD: outputFilePath}
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_POINTS, self.INPUT_INITIALFRICTION, self.INPUT_FRICTION]
+
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_SPREAD: pcr.spread(rasters[self.INPUT_POINTS], rasters[self.INPUT_INITIALFRICTION], rasters[self.INPUT_FRICTION])}
@@ -13,8 +13,7 @@
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterNumber,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -127,36 +126,10 @@ class PCRasterTransientAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                transient
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_elevation = self.parameterAsRasterLayer(parameters, self.INPUT_ELEVATION, context)
-        input_recharge = self.parameterAsRasterLayer(parameters, self.INPUT_RECHARGE, context)
-        input_transmissivity = self.parameterAsRasterLayer(parameters, self.INPUT_TRANSMISSIVITY, context)
-        input_flowcondition = self.parameterAsRasterLayer(parameters, self.INPUT_FLOWCONDITION, context)
-        input_storage = self.parameterAsRasterLayer(parameters, self.INPUT_STORAGE, context)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_ELEVATION, self.INPUT_RECHARGE, self.INPUT_TRANSMISSIVITY, self.INPUT_FLOWCONDITION, self.INPUT_STORAGE]
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
         timestep = self.parameterAsDouble(parameters, self.INPUT_TIMESTEP, context)
         tolerance = self.parameterAsDouble(parameters, self.INPUT_TOLERANCE, context)
-        setclone(input_elevation.dataProvider().dataSourceUri())
-        elevation = readmap(input_elevation.dataProvider().dataSourceUri())
-        recharge = readmap(input_recharge.dataProvider().dataSourceUri())
-        transmissivity = readmap(input_transmissivity.dataProvider().dataSourceUri())
-        flowcondition = readmap(input_flowcondition.dataProvider().dataSourceUri())
-        storage = readmap(input_storage.dataProvider().dataSourceUri())
-        resulttransient = transient(elevation, recharge, transmissivity, flowcondition, storage, timestep, tolerance)
-
-        outputTransient = self.parameterAsOutputLayer(parameters, self.OUTPUT_TRANSIENT, context)
-
-        report(resulttransient, outputTransient)
-
-        self.set_output_crs(output_file=outputTransient, crs=input_elevation.crs(), feedback=feedback, context=context)
-
-        return {self.OUTPUT_TRANSIENT: outputTransient}
+        return {self.OUTPUT_TRANSIENT: pcr.transient(rasters[self.INPUT_ELEVATION], rasters[self.INPUT_RECHARGE], rasters[self.INPUT_TRANSMISSIVITY], rasters[self.INPUT_FLOWCONDITION], rasters[self.INPUT_STORAGE], timestep, tolerance)}
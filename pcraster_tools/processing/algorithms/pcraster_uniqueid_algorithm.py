@@ -12,8 +12,7 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -69,26 +68,11 @@ class PCRasterUniqueidAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                uniqueid
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_boolean = self.parameterAsRasterLayer(parameters, self.INPUT_BOOLEAN, context)
-
-        setclone(input_boolean.dataProvider().dataSourceUri())
-        InputLayer = readmap(input_boolean.dataProvider().dataSourceUri())
-        ID = uniqueid(InputLayer)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_SCALAR, context)
-
-        report(ID, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_BOOLEAN]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_boolean.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_BOOLEAN: 'Boolean'}
 
-        return {self.OUTPUT_SCALAR: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        return {self.OUTPUT_SCALAR: pcr.uniqueid(rasters[self.INPUT_BOOLEAN])}
@@ -12,10 +12,10 @@
 """
 
 from qgis.core import (QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterRasterLayer,
-                       QgsProcessingException)
+                       QgsProcessingParameterRasterLayer)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.ldd_index import LddIndex
 
 
 class PCRasterUpstreamAlgorithm(PCRasterAlgorithm):
@@ -78,26 +78,15 @@ class PCRasterUpstreamAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                upstream
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_ldd = self.parameterAsRasterLayer(parameters, self.INPUT_LDD, context)
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        setclone(input_ldd.dataProvider().dataSourceUri())
-        LDD = readmap(input_ldd.dataProvider().dataSourceUri())
-        RasterInput = readmap(input_raster.dataProvider().dataSourceUri())
-        Upstream = upstream(LDD, RasterInput)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_UPSTREAM, context)
-        report(Upstream, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_LDD, self.INPUT_RASTER]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_ldd.crs(), feedback=feedback, context=context)
+    def raster_value_scales(self):  # pylint: disable=missing-function-docstring
+        return {self.INPUT_LDD: 'Ldd'}
 
-        return {self.OUTPUT_UPSTREAM: outputFilePath}
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        index = self.ldd_index(pcr, parameters, self.INPUT_LDD, rasters[self.INPUT_LDD], context)
+        if index is not None and rasters[self.INPUT_RASTER].dataType().name == 'Scalar':
+            values = LddIndex.field_array(pcr, rasters[self.INPUT_RASTER])
+            return {self.OUTPUT_UPSTREAM: LddIndex.to_field(pcr, index.upstream_sum(values), 'Scalar')}
+        return {self.OUTPUT_UPSTREAM: pcr.upstream(rasters[self.INPUT_LDD], rasters[self.INPUT_RASTER])}
@@ -14,8 +14,7 @@
 from qgis.core import (QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterNumber,
-                       QgsProcessingException)
+                       QgsProcessingParameterNumber)
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
 
@@ -30,6 +29,8 @@ class PCRasterWindowHighPassAlgorithm(PCRasterAlgorithm):
     INPUT_WINDOWLENGTH = 'INPUT2'
     OUTPUT_RASTER = 'OUTPUT'
 
+    TILING = PCRasterAlgorithm.TILING_WINDOW
+
     def createInstance(self):  # pylint: disable=missing-function-docstring
         return PCRasterWindowHighPassAlgorithm()
 
@@ -93,31 +94,15 @@ class PCRasterWindowHighPassAlgorithm(PCRasterAlgorithm):
             )
         )
 
-    def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        try:
-            from pcraster import (   # pylint: disable=import-outside-toplevel
-                setclone,
-                readmap,
-                report,
-                windowhighpass,
-                setglobaloption
-            )
-        except ImportError as e:
-            raise QgsProcessingException('PCRaster library is not available') from e
-
-        input_raster = self.parameterAsRasterLayer(parameters, self.INPUT_RASTER, context)
-        lengthunits = self.parameterAsEnum(parameters, self.INPUT_UNITS, context)
-        if lengthunits == 0:
-            setglobaloption("unittrue")
-        else:
-            setglobaloption("unitcell")
-        input_windowlength = self.parameterAsDouble(parameters, self.INPUT_WINDOWLENGTH, context)
-        setclone(input_raster.dataProvider().dataSourceUri())
-        RasterInput = readmap(input_raster.dataProvider().dataSourceUri())
-        RasterOutput = windowhighpass(RasterInput, input_windowlength)
-        outputFilePath = self.parameterAsOutputLayer(parameters, self.OUTPUT_RASTER, context)
-        report(RasterOutput, outputFilePath)
+    def raster_inputs(self):  # pylint: disable=missing-function-docstring
+        return [self.INPUT_RASTER]
 
-        self.set_output_crs(output_file=outputFilePath, crs=input_raster.crs(), feedback=feedback, context=context)
+    def global_options(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return [self.parameter_as_option(parameters, self.INPUT_UNITS, context, ('unittrue', 'unitcell'))]
+
+    def run_operator(self, pcr, rasters, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument
+        input_windowlength = self.parameterAsDouble(parameters, self.INPUT_WINDOWLENGTH, context)
+        return {self.OUTPUT_RASTER: pcr.windowhighpass(rasters[self.INPUT_RASTER], input_windowlength)}
 
-        return {self.OUTPUT_RASTER: outputFilePath}
+    def tile_operator(self, parameters, context):  # pylint: disable=missing-function-docstring
+        return 'windowhighpass', (self.parameterAsDouble(parameters, self.INPUT_WINDOWLENGTH, context),)
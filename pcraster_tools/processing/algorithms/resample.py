@@ -11,16 +11,18 @@
 ***************************************************************************
 """
 
-import os
-
 from qgis.core import (QgsProcessing,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterMultipleLayers,
                        QgsProcessingParameterRasterDestination,
-                       QgsProcessingException
+                       QgsProcessingUtils
                        )
 
 from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.command_runner import CommandRunner
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.raster_writer import RasterWriter
+from pcraster_tools.processing.settings import PCRasterSettings
 
 
 class ResampleAlgorithm(PCRasterAlgorithm):
@@ -45,7 +47,7 @@ class ResampleAlgorithm(PCRasterAlgorithm):
         return self.tr('Data management')
 
     def groupId(self):  # pylint: disable=missing-function-docstring
-        return self.tr('data')
+        return 'data'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
         return self.tr(
@@ -85,19 +87,23 @@ class ResampleAlgorithm(PCRasterAlgorithm):
         )
 
     def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring,unused-argument,too-many-locals
-        input_rasters = []
-        for layer in self.parameterAsLayerList(parameters, self.INPUT_RASTERS, context):
-            if not layer.source().lower().endswith('.map'):
-                raise QgsProcessingException('Only PCRaster .map format can be used as input')
-            input_rasters.append(layer.source())
+        # the resample application only reads PCRaster maps, other formats are converted first
+        temp_folder = QgsProcessingUtils.tempFolder()
+        input_rasters = [GdalLoader.to_pcraster_map(layer.source(), temp_folder)
+                         for layer in self.parameterAsLayerList(parameters, self.INPUT_RASTERS, context)]
         input_mask = self.parameterAsRasterLayer(parameters, self.INPUT_MASK, context)
-        clone = input_mask.dataProvider().dataSourceUri()
+        clone = GdalLoader.to_pcraster_map(input_mask.dataProvider().dataSourceUri(), temp_folder)
 
         dst_filename = self.parameterAsOutputLayer(parameters, self.OUTPUT_PCRASTER, context)
-        rasterstrings = " ".join(input_rasters)
-        cmd = 'resample "{}" "{}" --clone "{}"'.format(rasterstrings, dst_filename, clone)
-        os.system(cmd)
-
-        self.set_output_crs(output_file=dst_filename, crs=input_mask.crs(), feedback=feedback, context=context)
+        # the resample application only writes PCRaster maps, GeoTIFF outputs are converted afterwards
+        map_filename = QgsProcessingUtils.generateTempFilename('resample.map') \
+            if RasterWriter.is_geotiff(dst_filename) else dst_filename
+        cmd = ['resample'] + input_rasters + [map_filename, '--clone', clone]
+        CommandRunner.run(cmd, feedback, timeout=PCRasterSettings.command_timeout())
+
+        if map_filename != dst_filename:
+            RasterWriter.copy_raster(map_filename, dst_filename, self.gdal_crs_wkt(input_mask.crs()))
+        else:
+            self.set_output_crs(output_file=dst_filename, crs=input_mask.crs(), feedback=feedback, context=context)
 
         return {self.OUTPUT_PCRASTER: dst_filename}
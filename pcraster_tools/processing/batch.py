@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import csv
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Dict, List, NamedTuple, Tuple
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (
+    QgsApplication,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeedback
+)
+
+from pcraster_tools.processing.algorithms.manifest import ALGORITHMS
+from pcraster_tools.processing.lazy_algorithm import LazyAlgorithm
+from pcraster_tools.processing.parallel import ParallelExecution
+
+
+class BatchResult(NamedTuple):
+    """
+    The result of running an algorithm on one input set of a batch
+    """
+    index: int
+    ok: bool
+    results: Dict[str, str]
+    error: str
+    elapsed: float
+
+
+class ErrorFeedback(QgsProcessingFeedback):
+    """
+    Feedback which keeps the errors reported by an algorithm
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def reportError(self, error, fatalError=False):  # pylint: disable=missing-function-docstring,unused-argument
+        self.errors.append(error)
+
+
+class BatchExecution:
+    """
+    Runs a PCRaster algorithm on many input sets, e.g. thousands of tiles, in a pool
+    of worker processes.
+
+    Each worker starts its own headless QGIS application once and creates a new
+    algorithm instance per input set, so that every run has its own PCRaster clone.
+    A failing input set is reported and doesn't stop the rest of the batch. When a
+    worker process dies, e.g. by a crash in a native library, the pool is restarted
+    and the input sets which were running are run once more.
+    """
+
+    # wait timeout while polling for cancellation, in seconds
+    POLL_INTERVAL = 0.5
+
+    # number of times an input set is run when the worker pool dies while it is running
+    MAX_ATTEMPTS = 2
+
+    # QGIS application of a worker process
+    _qgis_app = None
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def algorithm_entry(algorithm_id: str):
+        """
+        Returns the manifest entry for an algorithm id, with or without the provider prefix
+        """
+        name = algorithm_id.split(':', 1)[-1]
+        for entry in ALGORITHMS:
+            if entry.name == name:
+                return entry
+        raise QgsProcessingException(BatchExecution.tr('Unknown PCRaster algorithm {}').format(algorithm_id))
+
+    @staticmethod
+    def create_algorithm(algorithm_id: str):
+        """
+        Returns a new, initialized instance of an algorithm
+        """
+        return LazyAlgorithm(BatchExecution.algorithm_entry(algorithm_id)).create()
+
+    @staticmethod
+    def read_table(path: str) -> List[Dict[str, str]]:
+        """
+        Reads the input sets of a batch from a CSV file, with a column per algorithm
+        parameter name and a row per run. Empty cells are left out, so that the
+        parameter's default value is used.
+        """
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return [{name.strip(): value.strip() for name, value in row.items() if name and value and value.strip()}
+                    for row in csv.DictReader(f)]
+
+    @staticmethod
+    def check_parameters(algorithm, items: List[Dict[str, str]]):
+        """
+        Raises a QgsProcessingException if the input sets use names which are not
+        parameters of algorithm
+        """
+        for index, parameters in enumerate(items):
+            for name in parameters:
+                if algorithm.parameterDefinition(name) is None:
+                    raise QgsProcessingException(
+                        BatchExecution.tr('Input set {}: {} is not a parameter of {}').format(
+                            index + 1, name, algorithm.id() or algorithm.name()))
+
+    @staticmethod
+    def init_worker(prefix_path: str):
+        """
+        Starts a headless QGIS application in a worker process
+        """
+        QgsApplication.setPrefixPath(prefix_path, True)
+        BatchExecution._qgis_app = QgsApplication([], False)
+        BatchExecution._qgis_app.initQgis()
+
+    @staticmethod
+    def run_item(algorithm_id: str, index: int, parameters: Dict[str, str]) -> BatchResult:
+        """
+        Runs an algorithm on one input set. Errors are returned in the result rather than raised.
+        """
+        start = time.monotonic()
+        feedback = ErrorFeedback()
+        try:
+            algorithm = BatchExecution.create_algorithm(algorithm_id)
+            results, ok = algorithm.run(parameters, QgsProcessingContext(), feedback)
+        except Exception as e:  # pylint: disable=broad-except
+            return BatchResult(index, False, {}, str(e), time.monotonic() - start)
+
+        error = ''
+        if not ok:
+            error = '\n'.join(feedback.errors) or BatchExecution.tr('{} failed').format(algorithm_id)
+        return BatchResult(index, ok, {name: str(value) for name, value in (results or {}).items()},
+                           error, time.monotonic() - start)
+
+    @staticmethod
+    def report(result: BatchResult, total: int, feedback):
+        """
+        Reports the result of an input set to feedback
+        """
+        if result.ok:
+            feedback.pushInfo(BatchExecution.tr('Input set {}/{} finished in {:.2f} seconds').format(
+                result.index + 1, total, result.elapsed))
+        else:
+            feedback.reportError(BatchExecution.tr('Input set {}/{} failed: {}').format(
+                result.index + 1, total, result.error), False)
+
+    @staticmethod
+    def future_result(future, index: int, start: float) -> BatchResult:
+        """
+        Returns the result of an input set run in a worker process. Errors raised while
+        returning the result, e.g. for a result which can't be pickled, give a failed result.
+        Raises BrokenProcessPool if the worker pool died.
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            return BatchResult(index, False, {}, str(e) or type(e).__name__, time.monotonic() - start)
+
+    @staticmethod
+    def submit(executor, pending: Dict[object, Tuple[int, Dict[str, str], float]], algorithm_id: str,
+               tasks: Deque[Tuple[int, Dict[str, str]]]) -> bool:
+        """
+        Submits the next (index, parameters) task to executor, adding its future to pending.
+        Returns False if the worker pool died, in which case the task is kept in tasks.
+        """
+        if not tasks:
+            return True
+        index, parameters = task = tasks.popleft()
+        try:
+            future = executor.submit(BatchExecution.run_item, algorithm_id, index, parameters)
+        except BrokenProcessPool:
+            tasks.appendleft(task)
+            return False
+        pending[future] = (index, parameters, time.monotonic())
+        return True
+
+    @staticmethod
+    def run(algorithm_id: str, items: List[Dict[str, str]],  # pylint: disable=too-many-locals,too-many-branches
+            workers: int, feedback) -> List[BatchResult]:
+        """
+        Runs the algorithm algorithm_id on each input set in items, a list of parameter
+        dictionaries, using workers processes. With a single worker the input sets are
+        run in the current process.
+
+        Returns the results of the input sets which were run, in input order.
+        """
+        total = len(items)
+        results = []
+        if workers <= 1 or total <= 1:
+            for index, parameters in enumerate(items):
+                if feedback.isCanceled():
+                    break
+                result = BatchExecution.run_item(algorithm_id, index, parameters)
+                BatchExecution.report(result, total, feedback)
+                results.append(result)
+                feedback.setProgress(100 * len(results) / total)
+            return results
+
+        # input sets which were running when the pool died are put back in front
+        tasks = deque(enumerate(items))
+        attempts = {}
+        mp_context = multiprocessing.get_context('spawn')
+        mp_context.set_executable(ParallelExecution.python_executable())
+        while True:
+            running = True
+            with ProcessPoolExecutor(max_workers=min(workers, total), mp_context=mp_context,
+                                     initializer=BatchExecution.init_worker,
+                                     initargs=(QgsApplication.prefixPath(),)) as executor:
+                # keep a bounded number of input sets in flight, so cancellation is quick
+                pending = {}
+                for _ in range(workers * 2):
+                    running = running and BatchExecution.submit(executor, pending, algorithm_id, tasks)
+                while pending:
+                    done, _ = wait(set(pending), timeout=BatchExecution.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    if feedback.isCanceled():
+                        for future in pending:
+                            future.cancel()
+                        return sorted(results, key=lambda result: result.index)
+
+                    for future in done:
+                        index, parameters, start = pending.pop(future)
+                        try:
+                            result = BatchExecution.future_result(future, index, start)
+                        except BrokenProcessPool:
+                            running = False
+                            attempts[index] = attempts.get(index, 0) + 1
+                            if attempts[index] < BatchExecution.MAX_ATTEMPTS:
+                                tasks.appendleft((index, parameters))
+                                continue
+                            result = BatchResult(index, False, {},
+                                                 BatchExecution.tr('The worker process running the input set died'),
+                                                 time.monotonic() - start)
+
+                        BatchExecution.report(result, total, feedback)
+                        results.append(result)
+                        feedback.setProgress(100 * len(results) / total)
+
+                        if running:
+                            running = BatchExecution.submit(executor, pending, algorithm_id, tasks)
+
+            if running or not tasks:
+                break
+            feedback.pushInfo(BatchExecution.tr('A worker process died, restarting the worker processes'))
+
+        return sorted(results, key=lambda result: result.index)
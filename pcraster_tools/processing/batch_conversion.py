@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import fnmatch
+import multiprocessing
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait
+)
+from typing import List, NamedTuple, Optional, Tuple
+
+from osgeo import gdal
+
+from qgis.PyQt.QtCore import QCoreApplication
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.parallel import ParallelExecution
+from pcraster_tools.processing.raster_writer import RasterWriter
+
+
+class CloneGrid(NamedTuple):
+    """
+    The grid outputs are aligned to: size, geotransform and CRS of a clone raster
+    """
+    cols: int
+    rows: int
+    geo_transform: tuple
+    crs_wkt: str
+
+
+class ConversionTask:
+    """
+    A raster to convert in a worker process. Only holds plain values, so that it can
+    be sent to the worker.
+    """
+
+    def __init__(self, index: int, source: str, output: str, *, value_scale_name: str,
+                 grid: Optional[CloneGrid], cache_size: int, threads: str):
+        self.index = index
+        self.source = source
+        self.output = output
+        self.value_scale_name = value_scale_name
+        self.grid = grid
+        self.cache_size = cache_size
+        self.threads = threads
+
+
+class BatchConversion:
+    """
+    Converts many rasters to PCRaster .map files in a pool of worker processes,
+    optionally aligning each of them to the grid of a clone raster.
+
+    Alignment warps the source through an in-memory VRT, so that each raster is read
+    and written only once. The workers only use GDAL.
+    """
+
+    # wait timeout while polling for cancellation, in seconds
+    POLL_INTERVAL = 0.5
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def folder_rasters(folder: str, pattern: str) -> List[str]:
+        """
+        Returns the files in folder with names matching pattern, e.g. '*.tif', in name order
+        """
+        return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                      if fnmatch.fnmatch(name.lower(), pattern.lower())
+                      and os.path.isfile(os.path.join(folder, name)))
+
+    @staticmethod
+    def output_files(sources: List[str], folder: str) -> List[str]:
+        """
+        Returns a .map file in folder for each source, named after the source. Sources with
+        the same name, e.g. from different folders, get a numbered suffix.
+        """
+        outputs = []
+        used = set()
+        for source in sources:
+            base = os.path.splitext(os.path.basename(source))[0]
+            name = '{}.map'.format(base)
+            index = 1
+            while name.lower() in used:
+                name = '{}_{}.map'.format(base, index)
+                index += 1
+            used.add(name.lower())
+            outputs.append(os.path.join(folder, name))
+        return outputs
+
+    @staticmethod
+    def clone_grid(path: str) -> CloneGrid:
+        """
+        Returns the grid of a clone raster
+        """
+        ds = GdalLoader.open(path)
+        return CloneGrid(ds.RasterXSize, ds.RasterYSize, ds.GetGeoTransform(), ds.GetProjection())
+
+    @staticmethod
+    def warp_options(grid: CloneGrid, value_scale_name: str, source_crs_wkt: str) -> dict:
+        """
+        Returns the gdal.Warp keyword arguments aligning a raster to grid
+        """
+        _, data_type, missing_value, _ = GdalLoader.VALUE_SCALES[value_scale_name]
+        west, cell_width, _, north, _, cell_height = grid.geo_transform
+        options = {
+            'format': 'VRT',
+            'outputBounds': (west, north + grid.rows * cell_height, west + grid.cols * cell_width, north),
+            'width': grid.cols,
+            'height': grid.rows,
+            'outputType': data_type,
+            'dstNodata': missing_value,
+            # only scalar values can be interpolated
+            'resampleAlg': 'bilinear' if value_scale_name == 'Scalar' else 'near',
+        }
+        if grid.crs_wkt and source_crs_wkt:
+            options['dstSRS'] = grid.crs_wkt
+        return options
+
+    @staticmethod
+    def convert(task: ConversionTask) -> Tuple[int, str]:
+        """
+        Converts a raster, in a worker process. Returns the task index and an error
+        message, empty if the conversion succeeded.
+        """
+        try:
+            with GdalLoader.gdal_config(task.cache_size, task.threads):
+                if task.grid is None:
+                    RasterWriter.copy_raster(task.source, task.output, value_scale_name=task.value_scale_name)
+                    return task.index, ''
+
+                source_ds = GdalLoader.open(task.source)
+                vrt = '/vsimem/pcraster_convert_{}_{}.vrt'.format(os.getpid(), task.index)
+                aligned = gdal.Warp(vrt, source_ds, **BatchConversion.warp_options(
+                    task.grid, task.value_scale_name, source_ds.GetProjection()))
+                if aligned is None:
+                    return task.index, BatchConversion.tr('Could not align {} to the clone').format(task.source)
+                # close the VRT, so that copy_raster reads the saved file
+                aligned = None
+                try:
+                    RasterWriter.copy_raster(vrt, task.output, task.grid.crs_wkt,
+                                             value_scale_name=task.value_scale_name)
+                finally:
+                    gdal.Unlink(vrt)
+        except Exception as e:  # pylint: disable=broad-except
+            return task.index, str(e)
+        return task.index, ''
+
+    @staticmethod
+    def run(tasks: List[ConversionTask], workers: int, feedback) -> List[Tuple[int, str]]:
+        """
+        Runs the conversion tasks using workers processes, or in the current process with
+        a single worker. Returns the (index, error) results of the tasks which were run.
+        """
+        total = len(tasks)
+        results = []
+        if workers <= 1 or total <= 1:
+            for task in tasks:
+                if feedback.isCanceled():
+                    break
+                results.append(BatchConversion.convert(task))
+                feedback.setProgress(100 * len(results) / total)
+            return results
+
+        remaining = iter(tasks)
+        mp_context = multiprocessing.get_context('spawn')
+        mp_context.set_executable(ParallelExecution.python_executable())
+        with ProcessPoolExecutor(max_workers=min(workers, total), mp_context=mp_context) as executor:
+            # keep a bounded number of rasters in flight, so cancellation is quick
+            pending = {executor.submit(BatchConversion.convert, task)
+                       for task in (next(remaining, None) for _ in range(workers * 2)) if task is not None}
+            while pending:
+                done, pending = wait(pending, timeout=BatchConversion.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if feedback.isCanceled():
+                    for future in pending:
+                        future.cancel()
+                    break
+
+                for future in done:
+                    results.append(future.result())
+                    feedback.setProgress(100 * len(results) / total)
+
+                    task = next(remaining, None)
+                    if task is not None:
+                        pending.add(executor.submit(BatchConversion.convert, task))
+
+        return sorted(results)
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+from typing import Iterator, List
+
+import numpy
+from osgeo import gdal
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+
+class ColumnFiles:
+    """
+    Native implementations of the PCRaster map2col and col2map applications,
+    converting between raster maps and column files of x, y and cell values.
+    """
+
+    # missing value written to column files, as used by map2col
+    MISSING_VALUE = 1e31
+
+    # number of cells converted per block, bounding the memory use
+    BLOCK_CELLS = 256 * 1024
+
+    # approximate number of bytes of a column file parsed at once
+    BLOCK_BYTES = 16 * 1024 * 1024
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def missing_mask(array, no_data) -> numpy.ndarray:
+        """
+        Returns a mask of the missing value cells of a block
+        """
+        mask = numpy.zeros(array.shape, dtype=bool)
+        if no_data is not None:
+            mask |= array == no_data
+        if numpy.issubdtype(array.dtype, numpy.floating):
+            mask |= numpy.isnan(array)
+        return mask
+
+    @staticmethod
+    def value_format(data_type: int) -> str:
+        """
+        Returns the format used to write values of a GDAL data type
+        """
+        if data_type == gdal.GDT_Float32:
+            return '%.7g'
+        if data_type == gdal.GDT_Float64:
+            return '%.15g'
+        # wide enough for all 32 bit integers, while writing the missing value as 1e+31
+        return '%.10g'
+
+    @staticmethod
+    def map_to_columns(paths: List[str], output_file: str, separator: str = ',', feedback=None) -> int:  # pylint: disable=too-many-locals
+        """
+        Writes the cells of the rasters in paths to output_file, one line of x, y and the value
+        on each raster per cell, like map2col. Coordinates are cell centres. Cells which are missing
+        on all rasters are skipped, other missing values are written as MISSING_VALUE.
+
+        The rasters are processed in blocks of rows, so memory use doesn't depend on the raster size.
+        Returns the number of lines written.
+        """
+        datasets = []
+        for path in paths:
+            ds = gdal.Open(path)
+            if ds is None:
+                raise QgsProcessingException(ColumnFiles.tr('Could not open raster {}').format(path))
+            datasets.append(ds)
+
+        rows = datasets[0].RasterYSize
+        cols = datasets[0].RasterXSize
+        for ds, path in zip(datasets, paths):
+            if ds.RasterYSize != rows or ds.RasterXSize != cols:
+                raise QgsProcessingException(
+                    ColumnFiles.tr('Raster {} does not have the same dimensions as {}').format(path, paths[0]))
+
+        west, cell_width, _, north, _, cell_height = datasets[0].GetGeoTransform()
+        bands = [ds.GetRasterBand(1) for ds in datasets]
+        line_format = separator.join(['%.12g', '%.12g'] + [ColumnFiles.value_format(band.DataType) for band in bands]) + '\n'
+
+        x = west + (numpy.arange(cols) + 0.5) * cell_width
+        block_rows = max(1, ColumnFiles.BLOCK_CELLS // cols)
+        written = 0
+        with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
+            for row in range(0, rows, block_rows):
+                if feedback and feedback.isCanceled():
+                    break
+
+                count = min(block_rows, rows - row)
+                values = []
+                missing = numpy.ones((count, cols), dtype=bool)
+                for band in bands:
+                    block = band.ReadAsArray(0, row, cols, count)
+                    block_missing = ColumnFiles.missing_mask(block, band.GetNoDataValue())
+                    missing &= block_missing
+                    block = block.astype(numpy.float64)
+                    block[block_missing] = ColumnFiles.MISSING_VALUE
+                    values.append(block)
+
+                selected = ~missing
+                y = north + (numpy.arange(row, row + count) + 0.5) * cell_height
+                columns = [numpy.broadcast_to(x, (count, cols))[selected],
+                           numpy.broadcast_to(y[:, None], (count, cols))[selected]]
+                columns.extend(block[selected] for block in values)
+
+                # format the whole block in a single operation rather than line by line
+                table = numpy.column_stack(columns)
+                f.write((line_format * len(table)) % tuple(table.ravel().tolist()))
+                written += len(table)
+
+                if feedback:
+                    feedback.setProgress(100 * (row + count) / rows)
+
+        return written
+
+    @staticmethod
+    def read_columns(path: str, feedback=None) -> Iterator[numpy.ndarray]:
+        """
+        Reads a column file in blocks of lines, yielding 2D arrays of the values with one row
+        per line. Columns may be separated by whitespace or commas.
+        """
+        size = max(1, os.path.getsize(path))
+        columns = None
+        read = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            while True:
+                if feedback and feedback.isCanceled():
+                    return
+
+                lines = f.readlines(ColumnFiles.BLOCK_BYTES)
+                if not lines:
+                    return
+                read += sum(len(line) for line in lines)
+
+                text = ''.join(lines).replace(',', ' ')
+                if columns is None:
+                    first = next((line for line in lines if line.strip()), None)
+                    if first is None:
+                        continue
+                    columns = len(first.replace(',', ' ').split())
+
+                try:
+                    values = numpy.array(text.split(), dtype=numpy.float64)
+                except ValueError as e:
+                    raise QgsProcessingException(
+                        ColumnFiles.tr('Column file {} contains non-numeric values').format(path)) from e
+                if values.size % columns:
+                    raise QgsProcessingException(
+                        ColumnFiles.tr('Not all lines of column file {} have {} columns').format(path, columns))
+
+                if feedback:
+                    feedback.setProgress(100 * read / size)
+                yield values.reshape(-1, columns)
+
+    @staticmethod
+    def columns_to_cells(path: str, method: str, geo_transform, rows: int, cols: int, *,
+                         feedback=None) -> numpy.ndarray:
+        """
+        Grids the x, y and value columns (the first three columns) of a column file to the cells of
+        a raster, aggregating the values falling in the same cell with method. Values equal to
+        MISSING_VALUE and coordinates outside the raster are skipped.
+
+        Returns a (rows, cols) array, with MISSING_VALUE for cells without values.
+        """
+        aggregator = CellAggregator(method, rows * cols)
+        for block in ColumnFiles.read_columns(path, feedback):
+            if block.shape[1] < 3:
+                raise QgsProcessingException(
+                    ColumnFiles.tr('Column file {} needs x, y and value columns').format(path))
+
+            values = block[:, 2]
+            defined = values != ColumnFiles.MISSING_VALUE
+            cells, inside = CellAggregator.cell_indices(block[defined, 0], block[defined, 1], geo_transform, rows, cols)
+            aggregator.add(cells, values[defined][inside])
+
+        return aggregator.result(ColumnFiles.MISSING_VALUE).reshape(rows, cols)
+
+
+class CellAggregator:
+    """
+    Aggregates values falling in the same raster cell, for col2map.
+
+    Values are added in blocks as flat cell indices and values. The majority
+    of a cell is the most frequent value, with the highest value winning ties.
+    For the majority, each block is reduced to (cell, value, count) pairs, which
+    are only merged with the earlier pairs once the blocks hold more pairs than
+    the merged pairs, so merging sorts at most twice the pairs added.
+    """
+
+    MAJORITY = 'majority'
+    AVERAGE = 'average'
+    HIGHEST = 'highest'
+    LOWEST = 'lowest'
+
+    def __init__(self, method: str, cell_count: int):
+        self.method = method
+        self.cell_count = cell_count
+        if method == self.AVERAGE:
+            self._total = numpy.zeros(cell_count, dtype=numpy.float64)
+            self._count = numpy.zeros(cell_count, dtype=numpy.int64)
+        elif method in (self.HIGHEST, self.LOWEST):
+            self._value = numpy.full(cell_count, -numpy.inf if method == self.HIGHEST else numpy.inf)
+        elif method == self.MAJORITY:
+            self._pair_cells = numpy.zeros(0, dtype=numpy.int64)
+            self._pair_values = numpy.zeros(0, dtype=numpy.float64)
+            self._pair_counts = numpy.zeros(0, dtype=numpy.int64)
+            # reduced pairs of the blocks added since the last merge
+            self._blocks = []
+            self._block_pairs = 0
+        else:
+            raise ValueError('Unknown aggregation method {}'.format(method))
+
+    @staticmethod
+    def group_starts(keys: numpy.ndarray) -> numpy.ndarray:
+        """
+        Returns the start positions of the runs of equal values in sorted keys
+        """
+        return numpy.flatnonzero(numpy.concatenate(([True], keys[1:] != keys[:-1])))
+
+    @staticmethod
+    def reduce_pairs(cells, values, counts):
+        """
+        Sums the counts of identical (cell, value) pairs
+        """
+        order = numpy.lexsort((values, cells))
+        cells, values, counts = cells[order], values[order], counts[order]
+        changed = numpy.concatenate(([True], (cells[1:] != cells[:-1]) | (values[1:] != values[:-1])))
+        starts = numpy.flatnonzero(changed)
+        return cells[starts], values[starts], numpy.add.reduceat(counts, starts)
+
+    def add(self, cells: numpy.ndarray, values: numpy.ndarray):
+        """
+        Adds values at the flat cell indices cells
+        """
+        if cells.size == 0:
+            return
+
+        if self.method == self.MAJORITY:
+            self._blocks.append(self.reduce_pairs(cells, values, numpy.ones(len(cells), dtype=numpy.int64)))
+            self._block_pairs += len(self._blocks[-1][0])
+            if self._block_pairs > len(self._pair_cells):
+                self.merge_pairs()
+            return
+
+        order = numpy.argsort(cells, kind='stable')
+        cells = cells[order]
+        values = values[order]
+        starts = self.group_starts(cells)
+        unique_cells = cells[starts]
+
+        if self.method == self.AVERAGE:
+            self._total[unique_cells] += numpy.add.reduceat(values, starts)
+            self._count[unique_cells] += numpy.diff(numpy.append(starts, len(cells)))
+        elif self.method == self.HIGHEST:
+            self._value[unique_cells] = numpy.maximum(self._value[unique_cells], numpy.maximum.reduceat(values, starts))
+        else:
+            self._value[unique_cells] = numpy.minimum(self._value[unique_cells], numpy.minimum.reduceat(values, starts))
+
+    def merge_pairs(self):
+        """
+        Merges the pairs of the blocks added since the last merge with the merged pairs
+        """
+        if not self._blocks:
+            return
+        blocks = [(self._pair_cells, self._pair_values, self._pair_counts)] + self._blocks
+        self._pair_cells, self._pair_values, self._pair_counts = self.reduce_pairs(
+            *(numpy.concatenate(arrays) for arrays in zip(*blocks)))
+        self._blocks = []
+        self._block_pairs = 0
+
+    def result(self, missing_value: float) -> numpy.ndarray:
+        """
+        Returns the aggregated value per cell, with missing_value for cells without values
+        """
+        result = numpy.full(self.cell_count, missing_value, dtype=numpy.float64)
+        if self.method == self.MAJORITY:
+            self.merge_pairs()
+        if self.method == self.AVERAGE:
+            defined = self._count > 0
+            result[defined] = self._total[defined] / self._count[defined]
+        elif self.method in (self.HIGHEST, self.LOWEST):
+            defined = numpy.isfinite(self._value)
+            result[defined] = self._value[defined]
+        elif self._pair_cells.size:
+            # sort by cell, then count and value, so the last pair of each cell is its majority
+            order = numpy.lexsort((self._pair_values, self._pair_counts, self._pair_cells))
+            cells = self._pair_cells[order]
+            last = numpy.append(self.group_starts(cells)[1:], len(cells)) - 1
+            result[cells[last]] = self._pair_values[order][last]
+        return result
+
+    @staticmethod
+    def cell_indices(x: numpy.ndarray, y: numpy.ndarray, geo_transform, rows: int, cols: int):
+        """
+        Returns the flat cell indices of the coordinates x and y, and a mask of the
+        coordinates which fall within the raster
+        """
+        west, cell_width, _, north, _, cell_height = geo_transform
+        col = numpy.floor((x - west) / cell_width).astype(numpy.int64)
+        row = numpy.floor((y - north) / cell_height).astype(numpy.int64)
+        inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        return row[inside] * cols + col[inside], inside
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+
+class CommandRunner:
+    """
+    Runs PCRaster command line applications (col2map, map2col, resample...) as
+    subprocesses, streaming their output to the processing feedback.
+
+    Commands are run without a shell, can be canceled from the feedback, are
+    killed after an optional timeout and raise a QgsProcessingException when
+    they fail.
+    """
+
+    # interval for checking cancellation while waiting for output, in seconds
+    POLL_INTERVAL = 0.1
+
+    # number of last output lines kept for error messages and returned to the caller
+    TAIL_LINES = 50
+
+    # number of output lines read ahead of the feedback, after which the reader waits
+    QUEUE_LINES = 1000
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def command_string(command: List[str]) -> str:
+        """
+        Returns a command as a string, for display
+        """
+        return subprocess.list2cmdline(command) if os.name == 'nt' else shlex.join(command)
+
+    @staticmethod
+    def _read_output(stream, lines: queue.Queue):
+        """
+        Reads lines from stream into lines until the stream is closed
+        """
+        for line in iter(stream.readline, ''):
+            lines.put(line.rstrip('\r\n'))
+        stream.close()
+
+    @staticmethod
+    def _stop(process: subprocess.Popen):
+        """
+        Terminates a running process, killing it if it doesn't exit
+        """
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    @staticmethod
+    def _discard_output(lines: queue.Queue, reader: threading.Thread):
+        """
+        Discards the remaining output of a stopped process, so that the reader thread can finish
+        """
+        while reader.is_alive() or not lines.empty():
+            try:
+                lines.get(timeout=CommandRunner.POLL_INTERVAL)
+            except queue.Empty:
+                pass
+
+    @staticmethod
+    def run(command: List[str], feedback, timeout: Optional[float] = None) -> List[str]:
+        """
+        Runs command, a list of the executable and its arguments, and returns its last TAIL_LINES
+        output lines. All lines are streamed to feedback as they are written.
+
+        Raises a QgsProcessingException if the command can't be started, exits with a non-zero
+        exit code, takes longer than timeout seconds or is canceled.
+        """
+        if feedback:
+            feedback.pushCommandInfo(CommandRunner.command_string(command))
+
+        startupinfo = None
+        if os.name == 'nt':
+            # don't open a console window for the command
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,  # pylint: disable=consider-using-with
+                                       stdin=subprocess.DEVNULL, universal_newlines=True, errors='replace',
+                                       startupinfo=startupinfo)
+        except OSError as e:
+            raise QgsProcessingException(
+                CommandRunner.tr('Could not run {}: {}').format(command[0], e)) from e
+
+        lines = queue.Queue(maxsize=CommandRunner.QUEUE_LINES)
+        reader = threading.Thread(target=CommandRunner._read_output, args=(process.stdout, lines), daemon=True)
+        reader.start()
+
+        output = deque(maxlen=CommandRunner.TAIL_LINES)
+        start = time.monotonic()
+        while True:
+            try:
+                line = lines.get(timeout=CommandRunner.POLL_INTERVAL)
+                output.append(line)
+                if feedback and line:
+                    feedback.pushConsoleInfo(line)
+            except queue.Empty:
+                if process.poll() is not None and not reader.is_alive() and lines.empty():
+                    break
+
+            if feedback and feedback.isCanceled():
+                CommandRunner._stop(process)
+                CommandRunner._discard_output(lines, reader)
+                raise QgsProcessingException(CommandRunner.tr('{} was canceled').format(command[0]))
+
+            if timeout and time.monotonic() - start > timeout:
+                CommandRunner._stop(process)
+                CommandRunner._discard_output(lines, reader)
+                raise QgsProcessingException(
+                    CommandRunner.tr('{} did not finish within {} seconds').format(command[0], timeout))
+
+        if process.returncode != 0:
+            message = CommandRunner.tr('{} failed with exit code {}').format(command[0], process.returncode)
+            tail = '\n'.join(line for line in output if line)
+            raise QgsProcessingException('{}:\n{}'.format(message, tail) if tail else message)
+
+        return list(output)
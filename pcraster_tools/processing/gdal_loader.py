@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy
+from osgeo import gdal
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+
+class GdalLoader:
+    """
+    Reads GDAL rasters (GeoTIFF, COG, VRT...) as PCRaster fields, without converting
+    them to PCRaster .map files first.
+
+    Cells are read through GDAL in blocks of rows, converted to the cell type and
+    missing value of the value scale and passed to numpy2pcr.
+    """
+
+    # value scale name: (PCRaster value scale option, GDAL data type, missing value, numpy type)
+    VALUE_SCALES = {
+        'Boolean': ('VS_BOOLEAN', gdal.GDT_Byte, 255, numpy.uint8),
+        'Nominal': ('VS_NOMINAL', gdal.GDT_Int32, -2147483648, numpy.int32),
+        'Ordinal': ('VS_ORDINAL', gdal.GDT_Int32, -2147483648, numpy.int32),
+        'Scalar': ('VS_SCALAR', gdal.GDT_Float32, -3.4028234663852886e+38, numpy.float32),
+        'Directional': ('VS_DIRECTION', gdal.GDT_Float32, -3.4028234663852886e+38, numpy.float32),
+        'Ldd': ('VS_LDD', gdal.GDT_Byte, 255, numpy.uint8),
+    }
+
+    # number of cells converted per block, bounding the memory used next to the field
+    BLOCK_CELLS = 1024 * 1024
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def is_pcraster_map(path: str) -> bool:
+        """
+        Returns True if path is a PCRaster .map file, which PCRaster reads itself
+        """
+        return os.path.splitext(path)[1].lower() == '.map'
+
+    @staticmethod
+    def open(path: str):
+        """
+        Opens a raster with GDAL, raising a QgsProcessingException if it can't be opened
+        """
+        ds = gdal.Open(path)
+        if ds is None:
+            raise QgsProcessingException(GdalLoader.tr('Could not open raster {}').format(path))
+        return ds
+
+    @staticmethod
+    def value_scale_name(band, expected: Optional[str] = None) -> str:
+        """
+        Returns the PCRaster value scale name of a GDAL band, from its PCRASTER_VALUESCALE
+        metadata, else the expected value scale name if given, else its data type (Scalar
+        for floating point, Nominal for integers)
+        """
+        value_scale = band.GetMetadataItem('PCRASTER_VALUESCALE')
+        for name, (option, _, _, _) in GdalLoader.VALUE_SCALES.items():
+            if option == value_scale:
+                return name
+        if expected is not None:
+            return expected
+        if band.DataType in (gdal.GDT_Float32, gdal.GDT_Float64):
+            return 'Scalar'
+        return 'Nominal'
+
+    @staticmethod
+    def block_rows(band) -> int:
+        """
+        Returns the number of rows read at once from band: a multiple of its block height,
+        bounded by BLOCK_CELLS
+        """
+        block_height = band.GetBlockSize()[1]
+        rows = max(1, GdalLoader.BLOCK_CELLS // band.XSize)
+        return max(block_height, rows // block_height * block_height)
+
+    @staticmethod
+    def read_block(band, row: int, count: int, value_scale_name: str):
+        """
+        Reads count rows of band starting at row, converted to the cell type and missing
+        value of value_scale_name. Values are rounded and clipped to the range of integer cell types.
+        """
+        _, _, missing_value, numpy_type = GdalLoader.VALUE_SCALES[value_scale_name]
+        block = band.ReadAsArray(0, row, band.XSize, count)
+
+        no_data = band.GetNoDataValue()
+        mask = numpy.zeros(block.shape, dtype=bool)
+        if no_data is not None:
+            mask |= block == no_data
+        if numpy.issubdtype(block.dtype, numpy.floating):
+            mask |= numpy.isnan(block)
+        if numpy.issubdtype(numpy_type, numpy.integer) and not numpy.can_cast(block.dtype, numpy_type):
+            info = numpy.iinfo(numpy_type)
+            # round and clip as GDAL does, in double precision which represents the integer limits
+            block = numpy.clip(numpy.rint(block.astype(numpy.float64)), info.min, info.max)
+        # replace missing cells before the cast, which can't represent NaN
+        if mask.any():
+            block = numpy.where(mask, missing_value, block)
+        return block.astype(numpy_type, copy=False)
+
+    @staticmethod
+    @contextmanager
+    def gdal_config(cache_size: int = 0, threads: Optional[str] = None):
+        """
+        Context manager setting the GDAL block cache size in bytes (0 to keep the current size)
+        and the number of threads GDAL uses to (de)compress rasters, e.g. '4' or 'ALL_CPUS'
+        """
+        previous_cache_size = gdal.GetCacheMax()
+        previous_threads = gdal.GetConfigOption('GDAL_NUM_THREADS')
+        if cache_size:
+            gdal.SetCacheMax(cache_size)
+        if threads:
+            gdal.SetConfigOption('GDAL_NUM_THREADS', threads)
+        try:
+            yield
+        finally:
+            gdal.SetConfigOption('GDAL_NUM_THREADS', previous_threads)
+            gdal.SetCacheMax(previous_cache_size)
+
+    @staticmethod
+    def set_clone(pcr, path: str):
+        """
+        Sets the PCRaster clone to the extent and cell size of a raster in any GDAL format
+        """
+        if GdalLoader.is_pcraster_map(path):
+            pcr.setclone(path)
+            return
+
+        ds = GdalLoader.open(path)
+        west, cell_width, rotation_x, north, rotation_y, cell_height = ds.GetGeoTransform()
+        if rotation_x or rotation_y or cell_height >= 0:
+            raise QgsProcessingException(GdalLoader.tr('Raster {} is rotated or not north up').format(path))
+        if not numpy.isclose(cell_width, -cell_height):
+            raise QgsProcessingException(GdalLoader.tr('Raster {} does not have square cells').format(path))
+        pcr.setclone(ds.RasterYSize, ds.RasterXSize, cell_width, west, north)
+
+    @staticmethod
+    def read_field(pcr, path: str, value_scale_name: Optional[str] = None, *, expected: Optional[str] = None):
+        """
+        Reads the first band of a raster in any GDAL format as a PCRaster field with value_scale_name,
+        by default derived from the band, or from expected if the band has no value scale metadata.
+        The raster must match the current clone.
+        """
+        ds = GdalLoader.open(path)
+        clone = pcr.clone()
+        if ds.RasterYSize != clone.nrRows() or ds.RasterXSize != clone.nrCols():
+            raise QgsProcessingException(
+                GdalLoader.tr('Raster {} does not have the same dimensions as the clone map').format(path))
+
+        return GdalLoader.band_field(pcr, ds.GetRasterBand(1), value_scale_name, expected=expected)
+
+    @staticmethod
+    def band_field(pcr, band, value_scale_name: Optional[str] = None, *, expected: Optional[str] = None):
+        """
+        Reads a GDAL band as a PCRaster field with value_scale_name, by default derived
+        from the band and expected. The band must match the current clone.
+        """
+        if value_scale_name is None:
+            value_scale_name = GdalLoader.value_scale_name(band, expected)
+        _, _, missing_value, numpy_type = GdalLoader.VALUE_SCALES[value_scale_name]
+        rows, cols = band.YSize, band.XSize
+        array = numpy.empty((rows, cols), dtype=numpy_type)
+        block_rows = GdalLoader.block_rows(band)
+        for row in range(0, rows, block_rows):
+            count = min(block_rows, rows - row)
+            array[row:row + count] = GdalLoader.read_block(band, row, count, value_scale_name)
+
+        return pcr.numpy2pcr(getattr(pcr, value_scale_name), array, missing_value)
+
+    @staticmethod
+    def to_pcraster_map(path: str, folder: str) -> str:
+        """
+        Returns a PCRaster .map version of a raster, for PCRaster applications which only
+        read .map files. .map files are returned as is, other rasters are converted to folder.
+        """
+        if GdalLoader.is_pcraster_map(path):
+            return path
+
+        ds = GdalLoader.open(path)
+        value_scale_name = GdalLoader.value_scale_name(ds.GetRasterBand(1))
+        option, data_type, _, _ = GdalLoader.VALUE_SCALES[value_scale_name]
+        output = os.path.join(folder, '{}.map'.format(os.path.splitext(os.path.basename(path))[0]))
+        index = 1
+        while os.path.exists(output):
+            output = os.path.join(folder, '{}_{}.map'.format(os.path.splitext(os.path.basename(path))[0], index))
+            index += 1
+
+        if gdal.Translate(output, ds, format='PCRaster', outputType=data_type,
+                          creationOptions=['PCRASTER_VALUESCALE={}'.format(option)]) is None:
+            raise QgsProcessingException(GdalLoader.tr('Could not convert {} to PCRaster format').format(path))
+        return output
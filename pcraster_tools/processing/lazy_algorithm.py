@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import importlib
+
+from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.algorithms.manifest import AlgorithmEntry
+
+
+class LazyAlgorithm(PCRasterAlgorithm):
+    """
+    Lightweight stand-in for a PCRaster algorithm, registered with the provider.
+
+    The toolbox metadata comes from the static manifest entry. The algorithm's module
+    is imported when the provider initializes the stand-in, which copies the parameter
+    and output definitions of the algorithm so that they can be queried from the
+    registered algorithm (e.g. by qgis_process help or processing.algorithmHelp).
+    """
+
+    def __init__(self, entry: AlgorithmEntry):
+        super().__init__()
+        self.entry = entry
+        self._algorithm = None
+
+    def algorithm_class(self):
+        """
+        Imports and returns the algorithm class
+        """
+        module = importlib.import_module('pcraster_tools.processing.algorithms.{}'.format(self.entry.module))
+        return getattr(module, self.entry.class_name)
+
+    def algorithm(self) -> PCRasterAlgorithm:
+        """
+        Returns an initialized instance of the algorithm, used for metadata which is not in the manifest
+        """
+        if self._algorithm is None:
+            self._algorithm = self.algorithm_class()()
+            self._algorithm.initAlgorithm()
+        return self._algorithm
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return self.algorithm_class()()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return self.entry.name
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr(self.entry.display_name)
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr(self.entry.group)
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return self.entry.group_id
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.algorithm().shortHelpString()
+
+    def helpUrl(self):  # pylint: disable=missing-function-docstring
+        return self.algorithm().helpUrl()
+
+    def canExecute(self):  # pylint: disable=missing-function-docstring
+        return self.algorithm().canExecute()
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        algorithm = self.algorithm()
+        for definition in algorithm.parameterDefinitions():
+            # destination parameters add their outputs
+            self.addParameter(definition.clone())
+        for output in algorithm.outputDefinitions():
+            if self.outputDefinition(output.name()) is None:
+                self.addOutput(type(output)(output.name(), output.description()))
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import numpy
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.raster_registry import RasterRegistry
+
+
+class LddIndex:
+    """
+    Flow graph of a local drain direction (LDD) raster, stored in flat arrays so that
+    network operators can reuse it instead of rebuilding it for every call.
+
+    Cells are numbered row by row. The index holds:
+
+    * downstream: the downstream cell of each cell, -1 for pits and missing values
+    * order and level_offsets: the cells in topological order, grouped in levels. All
+      upstream cells of a cell are in earlier levels.
+    * upstream_offsets and upstream_cells: the upstream cells of cell i are
+      upstream_cells[upstream_offsets[i]:upstream_offsets[i + 1]]
+
+    Indices are built once per LDD file and kept in memory and in an index folder,
+    keyed on the file path and its (mtime, size) signature.
+    """
+
+    # (row, column) offset of the downstream cell per LDD value, 5 is a pit
+    DIRECTIONS = {1: (1, -1), 2: (1, 0), 3: (1, 1), 4: (0, -1), 6: (0, 1), 7: (-1, -1), 8: (-1, 0), 9: (-1, 1)}
+
+    # number of indices kept in memory
+    MEMORY_ENTRIES = 4
+
+    # size of the index folder above which the least recently used indices are removed, in bytes
+    FOLDER_SIZE = 1024 * 1024 * 1024
+
+    # average number of cells per topological level below which network operators are left to
+    # PCRaster, as each level is one numpy step: LDDs with long flow paths have many small levels
+    MIN_CELLS_PER_LEVEL = 1000
+
+    _lock = threading.Lock()
+    _memory = OrderedDict()
+
+    def __init__(self, shape: Tuple[int, int], downstream, *, order, level_offsets, upstream_offsets,
+                 upstream_cells):
+        self.shape = tuple(int(size) for size in shape)
+        self.downstream = downstream
+        self.order = order
+        self.level_offsets = level_offsets
+        self.upstream_offsets = upstream_offsets
+        self.upstream_cells = upstream_cells
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def build(ldd) -> 'LddIndex':  # pylint: disable=too-many-locals
+        """
+        Builds the index of an LDD array, with 0 or any value outside 1-9 for missing values.
+        Raises a QgsProcessingException if the LDD is not sound.
+        """
+        rows, cols = ldd.shape
+        count = rows * cols
+        index_type = numpy.int32 if count < 2 ** 31 else numpy.int64
+        flat = ldd.ravel()
+        valid = (flat >= 1) & (flat <= 9)
+
+        downstream = numpy.full(count, -1, dtype=index_type)
+        cells = numpy.arange(count, dtype=index_type)
+        row, col = numpy.divmod(cells, cols)
+        for value, (row_offset, col_offset) in LddIndex.DIRECTIONS.items():
+            draining = numpy.flatnonzero(flat == value)
+            target_row = row[draining] + row_offset
+            target_col = col[draining] + col_offset
+            if ((target_row < 0) | (target_row >= rows) | (target_col < 0) | (target_col >= cols)).any():
+                raise QgsProcessingException(LddIndex.tr('LDD is not sound: cells drain out of the raster'))
+            downstream[draining] = target_row * cols + target_col
+        draining = downstream >= 0
+        if not valid[downstream[draining]].all():
+            raise QgsProcessingException(LddIndex.tr('LDD is not sound: cells drain into missing values'))
+
+        # upstream adjacency, grouping the draining cells by their downstream cell
+        sources = numpy.flatnonzero(draining).astype(index_type)
+        sources = sources[numpy.argsort(downstream[sources], kind='stable')]
+        upstream_counts = numpy.bincount(downstream[sources], minlength=count)
+        upstream_offsets = numpy.zeros(count + 1, dtype=index_type)
+        numpy.cumsum(upstream_counts, out=upstream_offsets[1:])
+
+        # topological levels: cells whose upstream cells are all in earlier levels
+        remaining = upstream_counts.astype(index_type)
+        level = numpy.flatnonzero(valid & (remaining == 0)).astype(index_type)
+        levels = []
+        while level.size:
+            levels.append(level)
+            targets = downstream[level]
+            targets = targets[targets >= 0]
+            numpy.subtract.at(remaining, targets, 1)
+            targets = numpy.unique(targets)
+            level = targets[remaining[targets] == 0]
+
+        order = numpy.concatenate(levels) if levels else numpy.zeros(0, dtype=index_type)
+        if order.size != numpy.count_nonzero(valid):
+            raise QgsProcessingException(LddIndex.tr('LDD is not sound: it contains cycles'))
+        level_offsets = numpy.zeros(len(levels) + 1, dtype=index_type)
+        numpy.cumsum([len(level) for level in levels], out=level_offsets[1:])
+
+        return LddIndex((rows, cols), downstream, order=order, level_offsets=level_offsets,
+                        upstream_offsets=upstream_offsets, upstream_cells=sources)
+
+    def cells_per_level(self) -> float:
+        """
+        Returns the average number of cells per topological level
+        """
+        return self.order.size / max(1, self.level_offsets.size - 1)
+
+    def efficient(self) -> bool:
+        """
+        Returns True if operators traversing the levels of the index are expected to be faster
+        than PCRaster, i.e. if the levels hold many cells on average
+        """
+        return self.cells_per_level() >= LddIndex.MIN_CELLS_PER_LEVEL
+
+    def levels(self):
+        """
+        Yields the cells of each topological level, from the sources to the pits
+        """
+        for start, end in zip(self.level_offsets[:-1], self.level_offsets[1:]):
+            yield self.order[start:end]
+
+    def upstream_of(self, cells):
+        """
+        Returns the upstream cells of cells, with for each of them the position in cells
+        of the cell it drains into
+        """
+        starts = self.upstream_offsets[cells]
+        counts = self.upstream_offsets[cells + 1] - starts
+        total = int(counts.sum())
+        segments = numpy.repeat(numpy.arange(len(cells)), counts)
+        positions = numpy.arange(total) - numpy.repeat(numpy.cumsum(counts) - counts - starts, counts)
+        return segments, self.upstream_cells[positions]
+
+    def missing(self):
+        """
+        Returns the flat mask of cells with a missing LDD value
+        """
+        mask = numpy.ones(self.downstream.size, dtype=bool)
+        mask[self.order] = False
+        return mask
+
+    def accuflux(self, material):
+        """
+        Returns the accumulated material flowing out of each cell, as the accuflux operator.
+        material is a (rows, cols) array or a (materials, rows, cols) stack of arrays, which
+        are accumulated in a single traversal of the network. Missing values (NaN) on
+        material make the cell and all cells downstream missing.
+        """
+        stack = material.reshape(-1, self.downstream.size)
+        missing = numpy.isnan(stack) | self.missing()
+        flux = numpy.where(missing, 0.0, stack).astype(numpy.float64)
+        for cells in self.levels():
+            segments, upstream = self.upstream_of(cells)
+            if upstream.size:
+                # upstream cells are grouped by the cell they drain into
+                starts = numpy.flatnonzero(numpy.diff(segments, prepend=-1))
+                targets = cells[segments[starts]]
+                flux[:, targets] += numpy.add.reduceat(flux[:, upstream], starts, axis=1)
+                missing[:, targets] |= numpy.logical_or.reduceat(missing[:, upstream], starts, axis=1)
+        flux[missing] = numpy.nan
+        return flux.reshape(material.shape)
+
+    def downstream_values(self, values):
+        """
+        Returns the value of the downstream cell of each cell, as the downstream operator.
+        Pits get their own value.
+        """
+        values = values.ravel()
+        result = values.astype(numpy.float64)
+        draining = self.downstream >= 0
+        result[draining] = values[self.downstream[draining]]
+        result[self.missing()] = numpy.nan
+        return result.reshape(self.shape)
+
+    def upstream_sum(self, values):
+        """
+        Returns the sum of the values of the upstream cells of each cell, as the upstream
+        operator. A missing value on an upstream cell makes the sum missing.
+        """
+        values = values.ravel()
+        count = values.size
+        draining = numpy.flatnonzero(self.downstream >= 0)
+        targets = self.downstream[draining]
+        missing = numpy.isnan(values[draining])
+        result = numpy.bincount(targets, weights=numpy.where(missing, 0.0, values[draining]), minlength=count)
+        result[numpy.bincount(targets, weights=missing, minlength=count) > 0] = numpy.nan
+        result[self.missing()] = numpy.nan
+        return result.reshape(self.shape)
+
+    def streamorder(self):
+        """
+        Returns the Strahler stream order of each cell, as the streamorder operator
+        """
+        orders = numpy.zeros(self.downstream.size, dtype=numpy.float64)
+        for cells in self.levels():
+            segments, upstream = self.upstream_of(cells)
+            highest = numpy.zeros(len(cells))
+            numpy.maximum.at(highest, segments, orders[upstream])
+            # the order increases where two or more upstream cells have the highest order
+            confluences = numpy.bincount(segments, weights=orders[upstream] == highest[segments],
+                                         minlength=len(cells)) >= 2
+            orders[cells] = numpy.where(highest == 0, 1, highest + confluences)
+        orders[self.missing()] = numpy.nan
+        return orders.reshape(self.shape)
+
+    def save(self, path: str, signature: Tuple[int, int]):
+        """
+        Saves the index to a .npz file, with the signature of the LDD file it was built from
+        """
+        temp_path = '{}.{}.tmp.npz'.format(os.path.splitext(path)[0], os.getpid())
+        numpy.savez(temp_path, shape=numpy.array(self.shape), signature=numpy.array(signature),
+                    downstream=self.downstream, order=self.order, level_offsets=self.level_offsets,
+                    upstream_offsets=self.upstream_offsets, upstream_cells=self.upstream_cells)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(path: str, signature: Tuple[int, int]) -> Optional['LddIndex']:
+        """
+        Loads an index saved with save(), or returns None if it doesn't exist or was
+        built from a different version of the LDD file
+        """
+        try:
+            with numpy.load(path) as data:
+                if tuple(data['signature']) != tuple(signature):
+                    return None
+                # mark the index as recently used, see prune()
+                os.utime(path)
+                return LddIndex(tuple(data['shape']), data['downstream'], order=data['order'],
+                                level_offsets=data['level_offsets'], upstream_offsets=data['upstream_offsets'],
+                                upstream_cells=data['upstream_cells'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def prune(folder: str, max_size: int):
+        """
+        Removes the least recently used indices from folder until their total size is at most max_size
+        """
+        entries = []
+        for entry in os.scandir(folder):
+            if entry.name.startswith('ldd_') and entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    @staticmethod
+    def index_file(folder: str, path: str) -> str:
+        """
+        Returns the file the index of the LDD file at path is saved to
+        """
+        key = hashlib.sha1(RasterRegistry.normalize_path(path).encode('utf-8')).hexdigest()
+        return os.path.join(folder, 'ldd_{}.npz'.format(key))
+
+    @staticmethod
+    def for_file(path: str, ldd_array: Callable, folder: Optional[str] = None) -> 'LddIndex':
+        """
+        Returns the index of the LDD file at path, from memory, from folder or else built from
+        the array returned by ldd_array and saved to folder
+        """
+        signature = RasterRegistry.file_signature(path)
+        key = RasterRegistry.normalize_path(path)
+        with LddIndex._lock:
+            entry = LddIndex._memory.get(key)
+            if entry is not None and entry[0] == signature:
+                LddIndex._memory.move_to_end(key)
+                return entry[1]
+
+        index = None
+        index_file = LddIndex.index_file(folder, path) if folder and signature else None
+        if index_file:
+            index = LddIndex.load(index_file, signature)
+        if index is None:
+            index = LddIndex.build(ldd_array())
+            if index_file:
+                try:
+                    os.makedirs(folder, exist_ok=True)
+                    index.save(index_file, signature)
+                    LddIndex.prune(folder, LddIndex.FOLDER_SIZE)
+                except OSError:
+                    pass
+
+        if signature is not None:
+            with LddIndex._lock:
+                LddIndex._memory[key] = (signature, index)
+                while len(LddIndex._memory) > LddIndex.MEMORY_ENTRIES:
+                    LddIndex._memory.popitem(last=False)
+        return index
+
+    @staticmethod
+    def clear():
+        """
+        Removes the indices kept in memory
+        """
+        with LddIndex._lock:
+            LddIndex._memory.clear()
+
+    @staticmethod
+    def field_array(pcr, field):
+        """
+        Returns the values of a PCRaster field as float64 array, with NaN for missing values
+        """
+        missing_value = GdalLoader.VALUE_SCALES[field.dataType().name][2]
+        array = pcr.pcr2numpy(field, missing_value).astype(numpy.float64)
+        array[array == missing_value] = numpy.nan
+        return array
+
+    @staticmethod
+    def to_field(pcr, array, value_scale_name: str):
+        """
+        Returns an array with NaN for missing values as PCRaster field with value_scale_name
+        """
+        _, _, missing_value, numpy_type = GdalLoader.VALUE_SCALES[value_scale_name]
+        array = numpy.where(numpy.isnan(array), missing_value, array).astype(numpy_type)
+        return pcr.numpy2pcr(getattr(pcr, value_scale_name), array, missing_value)
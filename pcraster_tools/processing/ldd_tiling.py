@@ -0,0 +1,646 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import heapq
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait
+)
+from typing import Callable, List, Optional, Tuple
+
+import numpy
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.ldd_index import LddIndex
+from pcraster_tools.processing.parallel import ParallelExecution
+from pcraster_tools.processing.raster_writer import RasterWriter
+from pcraster_tools.processing.tiling import (
+    Strip,
+    TiledExecution
+)
+
+
+class TiledLddCreation:  # pylint: disable=too-many-public-methods
+    """
+    Creates a local drain direction (LDD) network, or the depression filled DEM, strip by
+    strip, so that the DEM never has to be held in memory as a whole.
+
+    All depressions are filled to their spill elevation with a priority-flood which is
+    stitched across strips (Barnes, 2016): each strip is flooded from its own edges, the
+    spill elevations between the basins of the strip edges are resolved in a small global
+    graph, and a second pass raises each cell to the spill elevation of its basin. Cells
+    drain to their steepest downslope neighbour in the filled DEM. Cells in flat areas drain
+    to the neighbour at the same elevation closest to the edge of the flat, with distances
+    exchanged between strips until they no longer change.
+
+    Pits are only left where cells at the edge of the raster, or next to missing values,
+    have no lower neighbour. Every step is independent of the strip size, so the result is
+    the same for a single strip and any number of strips.
+
+    This is a method of its own, not a tiled version of lddcreate: PCRaster's routing of
+    flat areas and of ties between equally steep neighbours is not reproduced, so the LDD
+    only matches lddcreate (lddout, all thresholds at 9999999 or more) for cells with a
+    single steepest downslope neighbour. The algorithms therefore only use it on request.
+
+    A strip of 2 million cells takes about a second to flood. Routing takes longer for large
+    flat areas, which take an extra round per strip they span: a synthetic DEM of 16 million
+    cells with large filled depressions takes about a minute with a single worker, so a DEM
+    of billions of cells takes hours.
+    """
+
+    # (LDD value, row offset, column offset) of the neighbours, in the order used to break ties
+    NEIGHBOURS = tuple((value, row_offset, col_offset)
+                       for value, (row_offset, col_offset) in sorted(LddIndex.DIRECTIONS.items()))
+
+    # lddcreate thresholds from which all pits are removed, the defaults of the algorithms
+    PIT_THRESHOLD = 9999999
+
+    # wait timeout while polling for cancellation, in seconds
+    POLL_INTERVAL = 0.5
+
+    # cells per strip without the tile rows setting, which bounds the memory used per worker
+    STRIP_CELLS = 4 * 1024 * 1024
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def removes_all_pits(options: List[str], thresholds: List[float]) -> bool:
+        """
+        Returns True if lddcreate with the global options and the outflow depth, core area,
+        core volume and precipitation thresholds fills all depressions, which is what
+        tiled creation does
+        """
+        return 'lddin' not in options and 'lddcut' not in options and \
+            min(thresholds) >= TiledLddCreation.PIT_THRESHOLD
+
+    @staticmethod
+    def strip_rows(rows: int, cols: int, workers: int, tile_rows: int = 0) -> int:
+        """
+        Returns the number of rows per strip: tile_rows if set, otherwise a few strips per
+        worker of at most STRIP_CELLS cells
+        """
+        if tile_rows:
+            return tile_rows
+        return max(1, min(ParallelExecution.strip_rows(rows, workers, 1), TiledLddCreation.STRIP_CELLS // cols))
+
+    @staticmethod
+    def shifted(array, row_offset: int, col_offset: int, fill_value):
+        """
+        Returns the value of the neighbour at (row_offset, col_offset) of each cell of array,
+        fill_value for neighbours outside of the array
+        """
+        rows, cols = array.shape
+        result = numpy.full(array.shape, fill_value, dtype=array.dtype)
+        result[max(0, -row_offset):rows - max(0, row_offset), max(0, -col_offset):cols - max(0, col_offset)] = \
+            array[max(0, row_offset):rows - max(0, -row_offset), max(0, col_offset):cols - max(0, -col_offset)]
+        return result
+
+    @staticmethod
+    def outlets(valid):
+        """
+        Returns the valid cells at the edge of the array or next to missing values, where
+        material leaves the network
+        """
+        surrounded = numpy.ones(valid.shape, dtype=bool)
+        for _, row_offset, col_offset in TiledLddCreation.NEIGHBOURS:
+            surrounded &= TiledLddCreation.shifted(valid, row_offset, col_offset, False)
+        return valid & ~surrounded
+
+    @staticmethod
+    def neighbour_cells(cells, shape: Tuple[int, int]):
+        """
+        Yields the (cells with the neighbour in the array, neighbour cells) of flat cell indices,
+        for each neighbour direction
+        """
+        rows, cols = shape
+        row, col = numpy.divmod(cells, cols)
+        for _, row_offset, col_offset in TiledLddCreation.NEIGHBOURS:
+            target_row = row + row_offset
+            target_col = col + col_offset
+            inside = (target_row >= 0) & (target_row < rows) & (target_col >= 0) & (target_col < cols)
+            yield cells[inside], target_row[inside] * cols + target_col[inside]
+
+    @staticmethod
+    def first_per_cell(cells, values, *others):
+        """
+        Returns the lowest value per cell, with the matching entries of others. Ties keep the
+        first entry, so the result only depends on the order of the inputs.
+        """
+        order = numpy.lexsort((values, cells))
+        cells = cells[order]
+        first = numpy.ones(cells.size, dtype=bool)
+        first[1:] = cells[1:] != cells[:-1]
+        return (cells[first], values[order][first]) + tuple(other[order][first] for other in others)
+
+    @staticmethod
+    def drain_targets(dem, terminal):
+        """
+        Returns the flat index of the lowest neighbour of each cell of dem which is lower than the
+        cell, or of the cell itself for terminal cells and cells without lower neighbour
+        """
+        flat_index = numpy.arange(dem.size).reshape(dem.shape)
+        lowest = dem.copy()
+        targets = flat_index.copy()
+        for _, row_offset, col_offset in TiledLddCreation.NEIGHBOURS:
+            # missing values compare as NaN and are never lower
+            other = TiledLddCreation.shifted(dem, row_offset, col_offset, numpy.nan)
+            lower = other < lowest
+            lowest[lower] = other[lower]
+            targets[lower] = TiledLddCreation.shifted(flat_index, row_offset, col_offset, -1)[lower]
+        targets[terminal] = flat_index[terminal]
+        return targets.ravel()
+
+    @staticmethod
+    def flood(dem, outlet, seeds):  # pylint: disable=too-many-locals
+        """
+        Fills the depressions of dem, with NaN for missing values, relative to the outlet and
+        seed cells. Returns the filled elevations and the basin label of each cell: 0 for cells
+        draining to an outlet, i for cells draining to the i-th seed (row by row) and -1 for
+        missing values.
+
+        Each cell drains down to a local minimum, which gives the basins of the minima. The
+        filled elevation of a cell is its own elevation, raised to the lowest level at which the
+        basin of its minimum is reached from an outlet or seed in the graph of neighbouring basins.
+        """
+        valid = ~numpy.isnan(dem)
+        outlet_cells = numpy.flatnonzero(outlet)
+        seed_cells = numpy.flatnonzero(seeds & ~outlet)
+        targets = TiledLddCreation.drain_targets(dem, outlet | seeds | ~valid)
+
+        # follow the drain paths to their minima, doubling the path length each step
+        while True:
+            next_targets = targets[targets]
+            if numpy.array_equal(next_targets, targets):
+                break
+            targets = next_targets
+
+        minima = numpy.flatnonzero((targets == numpy.arange(targets.size)) & valid.ravel())
+        basin_of_minimum = numpy.full(targets.size, -1, dtype=numpy.int64)
+        basin_of_minimum[minima] = numpy.arange(minima.size)
+        basins = basin_of_minimum[targets].reshape(dem.shape)
+
+        sources = numpy.concatenate((outlet_cells, seed_cells))
+        source_labels = numpy.concatenate((numpy.zeros(outlet_cells.size, dtype=numpy.int64),
+                                           numpy.arange(1, seed_cells.size + 1)))
+        levels, origins = TiledLddCreation.basin_levels(minima.size, *TiledLddCreation.spill_edges(dem, basins),
+                                                        sources=basin_of_minimum[sources],
+                                                        source_levels=dem.ravel()[sources])
+
+        inside = basins >= 0
+        fill = numpy.full(dem.shape, numpy.nan)
+        fill[inside] = numpy.maximum(dem[inside], levels[basins[inside]])
+        labels = numpy.full(dem.shape, -1, dtype=numpy.int64)
+        labels[inside] = source_labels[origins[basins[inside]]]
+        return fill, labels
+
+    @staticmethod
+    def spill_edges(fill, labels):
+        """
+        Returns the (lower label, higher label, spill elevation) arrays of the neighbouring
+        basins in a flooded array, with the lowest elevation at which they meet
+        """
+        parts = []
+        for row_offset, col_offset in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            other_labels = TiledLddCreation.shifted(labels, row_offset, col_offset, -1)
+            other_fill = TiledLddCreation.shifted(fill, row_offset, col_offset, numpy.nan)
+            meet = (labels >= 0) & (other_labels >= 0) & (labels != other_labels)
+            parts.append((numpy.minimum(labels, other_labels)[meet], numpy.maximum(labels, other_labels)[meet],
+                          numpy.maximum(fill, other_fill)[meet]))
+        lower, higher, elevation = (numpy.concatenate(part) for part in zip(*parts))
+        if not lower.size:
+            return lower, higher, elevation
+
+        # keep the lowest elevation per pair of labels
+        pairs = lower * (int(higher.max()) + 1) + higher
+        order = numpy.argsort(pairs)
+        pairs = pairs[order]
+        first = numpy.ones(pairs.size, dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        starts = numpy.flatnonzero(first)
+        return lower[order][starts], higher[order][starts], numpy.minimum.reduceat(elevation[order], starts)
+
+    @staticmethod
+    def basin_levels(count: int, lower, higher, elevation, *,  # pylint: disable=too-many-locals
+                     sources, source_levels):
+        """
+        Returns the lowest level at which each of count basins in the graph of edges is reached
+        when flooding from the sources, starting at their source_levels, and the index of the
+        source reaching each basin
+        """
+        order = numpy.argsort(numpy.concatenate((lower, higher)), kind='stable')
+        targets = numpy.concatenate((higher, lower))[order].tolist()
+        weights = numpy.concatenate((elevation, elevation))[order].tolist()
+        offsets = numpy.zeros(count + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(numpy.concatenate((lower, higher)), minlength=count), out=offsets[1:])
+        offsets = offsets.tolist()
+
+        levels = [math.inf] * count
+        origins = [0] * count
+        for index, (basin, level) in enumerate(zip(sources.tolist(), source_levels.tolist())):
+            if level < levels[basin]:
+                levels[basin] = level
+                origins[basin] = index
+        heap = [(levels[basin], basin) for basin in set(sources.tolist())]
+        heapq.heapify(heap)
+        while heap:
+            level, basin = heapq.heappop(heap)
+            if level > levels[basin]:
+                continue
+            for index in range(offsets[basin], offsets[basin + 1]):
+                other = targets[index]
+                other_level = max(level, weights[index])
+                if other_level < levels[other]:
+                    levels[other] = other_level
+                    origins[other] = origins[basin]
+                    heapq.heappush(heap, (other_level, other))
+        return numpy.array(levels), numpy.array(origins, dtype=numpy.int64)
+
+    @staticmethod
+    def spill_elevations(count: int, lower, higher, elevation):
+        """
+        Returns the spill elevation of each of count labels in the graph of edges: the lowest
+        elevation over which its basin drains to label 0, the outlets
+        """
+        return TiledLddCreation.basin_levels(count, lower, higher, elevation, sources=numpy.zeros(1, dtype=numpy.int64),
+                                             source_levels=numpy.full(1, -numpy.inf))[0]
+
+    @staticmethod
+    def flat_distances(filled, outlet, updated, distances):  # pylint: disable=too-many-locals
+        """
+        Returns the distances, in cells, of the cells in flat areas of the filled DEM to the
+        closest cell draining out of the flat: a cell with a lower neighbour or an outlet.
+        Only updated cells are computed, distances gives the fixed distances of the others.
+        """
+        valid = ~numpy.isnan(filled)
+        lower = numpy.zeros(filled.shape, dtype=bool)
+        equal = numpy.zeros(filled.shape, dtype=bool)
+        for _, row_offset, col_offset in TiledLddCreation.NEIGHBOURS:
+            other = TiledLddCreation.shifted(filled, row_offset, col_offset, numpy.nan)
+            lower |= other < filled
+            equal |= other == filled
+
+        distances = distances.astype(numpy.float64).ravel()
+        sources = (updated & valid & (lower | outlet)).ravel()
+        distances[sources] = 0
+        updated = (updated & valid).ravel() & ~sources
+        flat_filled = filled.ravel()
+
+        # breadth first from the cells with a known distance, through cells of the same elevation
+        frontier = numpy.flatnonzero(numpy.isfinite(distances) & equal.ravel())
+        while frontier.size:
+            candidates = []
+            for cells, targets in TiledLddCreation.neighbour_cells(frontier, filled.shape):
+                values = distances[cells] + 1
+                better = updated[targets] & (flat_filled[targets] == flat_filled[cells]) & (values < distances[targets])
+                candidates.append((targets[better], values[better]))
+
+            cells, values = (numpy.concatenate(parts) for parts in zip(*candidates))
+            frontier, values = TiledLddCreation.first_per_cell(cells, values)
+            distances[frontier] = values
+        return distances.reshape(filled.shape)
+
+    @staticmethod
+    def directions(filled, outlet, distances):  # pylint: disable=too-many-locals
+        """
+        Returns the LDD values of the filled DEM: the steepest downslope neighbour, a pit for
+        outlets without lower neighbour, and the neighbour closest to the edge of the flat
+        for cells in flat areas. Missing values are 0.
+        """
+        ldd = numpy.zeros(filled.shape, dtype=numpy.uint8)
+        steepest = numpy.zeros(filled.shape)
+        closest = numpy.full(filled.shape, numpy.inf)
+        flat_ldd = numpy.zeros(filled.shape, dtype=numpy.uint8)
+        for value, row_offset, col_offset in TiledLddCreation.NEIGHBOURS:
+            other = TiledLddCreation.shifted(filled, row_offset, col_offset, numpy.nan)
+            drop = (filled - other) / math.hypot(row_offset, col_offset)
+            steeper = drop > steepest
+            ldd[steeper] = value
+            steepest[steeper] = drop[steeper]
+
+            other_distances = TiledLddCreation.shifted(distances, row_offset, col_offset, numpy.inf)
+            closer = (other == filled) & (other_distances < closest)
+            flat_ldd[closer] = value
+            closest[closer] = other_distances[closer]
+
+        valid = ~numpy.isnan(filled)
+        flat = valid & (ldd == 0)
+        ldd[flat & outlet] = 5
+        ldd[flat & ~outlet] = flat_ldd[flat & ~outlet]
+        return ldd
+
+    @staticmethod
+    def read_dem(path: str, strip: Strip):
+        """
+        Reads the rows of a strip as float64 array, with NaN for missing values
+        """
+        ds = GdalLoader.open(path)
+        block = GdalLoader.read_block(ds.GetRasterBand(1), strip.read_start, strip.read_rows(), 'Scalar')
+        dem = block.astype(numpy.float64)
+        dem[block == GdalLoader.VALUE_SCALES['Scalar'][2]] = numpy.nan
+        return dem
+
+    @staticmethod
+    def strip_seeds(strip: Strip, outlet, rows: int):
+        """
+        Returns the seed cells of a strip: the cells in its first and last rows which have
+        neighbours in other strips and are not outlets
+        """
+        seeds = numpy.zeros(outlet.shape, dtype=bool)
+        if strip.write_start > 0:
+            seeds[0] = True
+        if strip.write_end < rows:
+            seeds[-1] = True
+        return seeds & ~outlet
+
+    @staticmethod
+    def strip_file(folder: str, strip: Strip) -> str:
+        """
+        Returns the file in folder holding the flooded elevations and basin labels of a strip
+        """
+        return os.path.join(folder, 'strip_{}.npz'.format(strip.write_start))
+
+    @staticmethod
+    def flood_strip(path: str, strip: Strip, rows: int, folder: str):
+        """
+        Floods a strip from its edges, in a worker process, and saves the flooded elevations
+        and basin labels in folder. Returns the strip, the number of seeds, the spill edges of
+        its basins and the (labels, elevations) of its first and last rows.
+        """
+        dem = TiledLddCreation.read_dem(path, strip)
+        outlet = TiledLddCreation.outlets(~numpy.isnan(dem))
+        rows_written = slice(strip.write_offset(), strip.write_offset() + strip.write_end - strip.write_start)
+        dem = dem[rows_written]
+        outlet = outlet[rows_written]
+        seeds = TiledLddCreation.strip_seeds(strip, outlet, rows)
+        fill, labels = TiledLddCreation.flood(dem, outlet, seeds)
+
+        # flooded elevations are elevations of the DEM, which are exact in float32
+        numpy.savez(TiledLddCreation.strip_file(folder, strip), fill=fill.astype(numpy.float32),
+                    labels=labels.astype(numpy.int32))
+        return (strip, int(numpy.count_nonzero(seeds)), TiledLddCreation.spill_edges(fill, labels),
+                (labels[0], fill[0]), (labels[-1], fill[-1]))
+
+    @staticmethod
+    def spill_strip(folder: str, strip: Strip, spill):
+        """
+        Raises the saved flooded elevations of a strip to the spill elevations of their basins,
+        in a worker process. Returns the strip and its filled elevations.
+        """
+        file_name = TiledLddCreation.strip_file(folder, strip)
+        with numpy.load(file_name) as saved:
+            fill = numpy.asarray(saved['fill'], dtype=numpy.float64)
+            labels = numpy.asarray(saved['labels'])
+        os.remove(file_name)
+
+        filled = numpy.maximum(fill, spill[numpy.maximum(labels, 0)])
+        return strip, numpy.where(labels >= 0, filled, numpy.nan)
+
+    @staticmethod
+    def route_strip(path: str, strip: Strip, top, bottom, write: bool = False):
+        """
+        Computes the flat distances of a strip of the filled DEM, in a worker process, with
+        the distances top and bottom of the rows above and below it. Returns the strip and
+        the distances of its first and last rows, or the strip and its LDD values if write.
+        """
+        filled = TiledLddCreation.read_dem(path, strip)
+        outlet = TiledLddCreation.outlets(~numpy.isnan(filled))
+        offset = strip.write_offset()
+        rows_written = slice(offset, offset + strip.write_end - strip.write_start)
+
+        distances = numpy.full(filled.shape, numpy.inf)
+        if offset:
+            distances[0] = top
+        if strip.read_end > strip.write_end:
+            distances[-1] = bottom
+        updated = numpy.zeros(filled.shape, dtype=bool)
+        updated[rows_written] = True
+        distances = TiledLddCreation.flat_distances(filled, outlet, updated, distances)
+
+        if write:
+            return strip, TiledLddCreation.directions(filled, outlet, distances)[rows_written]
+        return strip, distances[rows_written][0], distances[rows_written][-1]
+
+    @staticmethod
+    def run_tasks(function: Callable, tasks: List[tuple], *, workers: int, feedback,
+                  handle: Callable) -> bool:
+        """
+        Runs function on the argument tuples in tasks using workers processes, or in the
+        current process with a single worker, passing the results to handle. Returns False
+        if the run was canceled.
+        """
+        total = len(tasks)
+        completed = 0
+        if workers <= 1 or total <= 1:
+            for task in tasks:
+                if feedback.isCanceled():
+                    return False
+                handle(function(*task))
+                completed += 1
+                feedback.setProgress(100 * completed / total)
+            return True
+
+        remaining = iter(tasks)
+        mp_context = multiprocessing.get_context('spawn')
+        mp_context.set_executable(ParallelExecution.python_executable())
+        with ProcessPoolExecutor(max_workers=min(workers, total), mp_context=mp_context) as executor:
+            # keep a bounded number of strips in flight, so memory use doesn't depend on the raster size
+            pending = {executor.submit(function, *task)
+                       for task in (next(remaining, None) for _ in range(workers * 2)) if task is not None}
+            while pending:
+                done, pending = wait(pending, timeout=TiledLddCreation.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if feedback.isCanceled():
+                    for future in pending:
+                        future.cancel()
+                    return False
+
+                for future in done:
+                    handle(future.result())
+                    completed += 1
+                    feedback.setProgress(100 * completed / total)
+
+                    task = next(remaining, None)
+                    if task is not None:
+                        pending.add(executor.submit(function, *task))
+        return True
+
+    @staticmethod
+    def strip_edges(first, second):
+        """
+        Returns the (lower label, higher label, spill elevation) edges between the (labels,
+        elevations) of the last row of a strip and the first row of the next strip
+        """
+        (labels, elevations), (other_labels, other_elevations) = first, second
+        parts = []
+        for col_offset in (-1, 0, 1):
+            shifted_labels = TiledLddCreation.shifted(other_labels[numpy.newaxis], 0, col_offset, -1)[0]
+            shifted_elevations = TiledLddCreation.shifted(other_elevations[numpy.newaxis], 0, col_offset,
+                                                          numpy.nan)[0]
+            meet = (labels >= 0) & (shifted_labels >= 0) & ((labels > 0) | (shifted_labels > 0))
+            parts.append((numpy.minimum(labels, shifted_labels)[meet], numpy.maximum(labels, shifted_labels)[meet],
+                          numpy.maximum(elevations, shifted_elevations)[meet]))
+        return tuple(numpy.concatenate(part) for part in zip(*parts))
+
+    @staticmethod
+    def global_labels(labels, offset: int):
+        """
+        Returns the global labels of the local labels of a strip whose seeds start after offset
+        """
+        return numpy.where(labels > 0, labels + offset, labels)
+
+    @staticmethod
+    def fill(path: str, strips: List[Strip], *,  # pylint: disable=too-many-locals
+             workers: int, feedback, write: Callable, folder: str) -> bool:
+        """
+        Fills the depressions of the DEM at path strip by strip, passing the (strip, filled
+        elevations) of each strip to write. The flooded strips are kept in folder between the
+        two passes. Returns False if the run was canceled.
+        """
+        rows = GdalLoader.open(path).RasterYSize
+        results = {}
+        if not TiledLddCreation.run_tasks(TiledLddCreation.flood_strip,
+                                          [(path, strip, rows, folder) for strip in strips],
+                                          workers=workers, feedback=feedback,
+                                          handle=lambda result: results.__setitem__(result[0].write_start, result)):
+            return False
+
+        # number the seeds of all strips, with 0 for the outlets of all strips
+        offsets = []
+        edges = []
+        count = 1
+        previous = None
+        for strip in strips:
+            _, seed_count, (lower, higher, elevation), first, last = results.pop(strip.write_start)
+            offsets.append(count - 1)
+            edges.append((TiledLddCreation.global_labels(lower, count - 1),
+                          TiledLddCreation.global_labels(higher, count - 1), elevation))
+            first = (TiledLddCreation.global_labels(first[0], count - 1), first[1])
+            if previous is not None:
+                edges.append(TiledLddCreation.strip_edges(previous, first))
+            previous = (TiledLddCreation.global_labels(last[0], count - 1), last[1])
+            count += seed_count
+
+        spill = TiledLddCreation.spill_elevations(count, *(numpy.concatenate(part) for part in zip(*edges)))
+        tasks = [(folder, strip, numpy.concatenate(([-numpy.inf], spill[offset + 1:next_offset + 1])))
+                 for strip, offset, next_offset in zip(strips, offsets, offsets[1:] + [count - 1])]
+        return TiledLddCreation.run_tasks(TiledLddCreation.spill_strip, tasks, workers=workers, feedback=feedback,
+                                          handle=lambda result: write(*result))
+
+    @staticmethod
+    def route(path: str, strips: List[Strip], *, workers: int, feedback, write: Callable) -> bool:
+        """
+        Creates the LDD of the filled DEM at path strip by strip, passing the (strip, LDD
+        values) of each strip to write. Returns False if the run was canceled.
+        """
+        cols = GdalLoader.open(path).RasterXSize
+        # distances of the first and last rows of each strip
+        boundaries = [[numpy.full(cols, numpy.inf), numpy.full(cols, numpy.inf)] for _ in strips]
+        positions = {strip.write_start: position for position, strip in enumerate(strips)}
+
+        def halo(position):
+            top = boundaries[position - 1][1] if position > 0 else None
+            bottom = boundaries[position + 1][0] if position + 1 < len(strips) else None
+            return top, bottom
+
+        changed = set(range(len(strips)))
+
+        def update(result):
+            strip, first, last = result
+            position = positions[strip.write_start]
+            if position > 0 and not numpy.array_equal(first, boundaries[position][0]):
+                changed.add(position - 1)
+            if position + 1 < len(strips) and not numpy.array_equal(last, boundaries[position][1]):
+                changed.add(position + 1)
+            boundaries[position] = [first, last]
+
+        # exchange the flat distances of the strip edges until they no longer change
+        while changed:
+            tasks = [(path, strips[position], *halo(position)) for position in sorted(changed)]
+            changed.clear()
+            if not TiledLddCreation.run_tasks(TiledLddCreation.route_strip, tasks, workers=workers,
+                                              feedback=feedback, handle=update):
+                return False
+
+        tasks = [(path, strip, *halo(position), True) for position, strip in enumerate(strips)]
+        return TiledLddCreation.run_tasks(TiledLddCreation.route_strip, tasks, workers=workers, feedback=feedback,
+                                          handle=lambda result: write(*result))
+
+    @staticmethod
+    def run(dem_path: str, *, ldd_file: Optional[str] = None,  # pylint: disable=too-many-locals
+            filled_file: Optional[str] = None, strip_rows: int, workers: int, feedback, crs_wkt: str = '') -> bool:
+        """
+        Writes the LDD (ldd_file) and/or the filled DEM (filled_file) of the DEM at dem_path, in
+        strips of strip_rows rows using workers processes, with the CRS crs_wkt. Returns False
+        if the run was canceled.
+        """
+        template = GdalLoader.open(dem_path)
+        strips = list(TiledExecution.strips(template.RasterYSize, strip_rows, 1))
+
+        def create(path, value_scale_name):
+            ds = RasterWriter.create(path, value_scale_name, template.RasterXSize, template.RasterYSize,
+                                     template.GetGeoTransform(), crs_wkt=crs_wkt)
+            if ds is None:
+                raise QgsProcessingException(TiledLddCreation.tr('Could not create output file {}').format(path))
+            return ds
+
+        def writer(ds, value_scale_name):
+            missing_value = GdalLoader.VALUE_SCALES[value_scale_name][2]
+
+            def write(strip, array):
+                missing = numpy.isnan(array) if value_scale_name == 'Scalar' else array == 0
+                ds.GetRasterBand(1).WriteArray(numpy.where(missing, missing_value, array), 0, strip.write_start)
+            return write
+
+        # the flooded strips, and the filled DEM when only the LDD is written, are kept in a temporary folder
+        temp_folder = tempfile.mkdtemp(prefix='pcraster_lddcreate_')
+        filled_path = filled_file or os.path.join(temp_folder, 'filled.tif')
+        try:
+            feedback.pushInfo(TiledLddCreation.tr('Filling depressions in {} strips').format(len(strips)))
+            filled = create(filled_path, 'Scalar')
+            completed = TiledLddCreation.fill(dem_path, strips, workers=workers, feedback=feedback,
+                                              write=writer(filled, 'Scalar'), folder=temp_folder)
+            if filled_file:
+                RasterWriter.finish(filled, filled_file, 'Scalar')
+            else:
+                filled.FlushCache()
+            # close the filled DEM, so that the worker processes can read it
+            filled = None
+            if filled_file:
+                RasterWriter.finalize(filled_file, 'Scalar')
+
+            if completed and ldd_file:
+                feedback.pushInfo(TiledLddCreation.tr('Creating the local drain directions'))
+                ldd = create(ldd_file, 'Ldd')
+                completed = TiledLddCreation.route(filled_path, strips, workers=workers, feedback=feedback,
+                                                   write=writer(ldd, 'Ldd'))
+                RasterWriter.finish(ldd, ldd_file, 'Ldd')
+                # close the LDD
+                ldd = None
+                RasterWriter.finalize(ldd_file, 'Ldd')
+        finally:
+            template = None
+            shutil.rmtree(temp_folder, ignore_errors=True)
+        return completed
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait
+)
+from typing import List, Optional, Tuple
+
+from osgeo import gdal
+
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+from pcraster_tools.processing.raster_writer import RasterWriter
+from pcraster_tools.processing.tiling import (
+    Strip,
+    TiledExecution
+)
+
+
+class StripTask:
+    """
+    A strip of a raster to process in a worker process. Only holds plain values,
+    so that it can be sent to the worker.
+    """
+
+    def __init__(self, strip: Strip, *, inputs: List[Tuple[str, str]], operator: str, arguments: tuple,
+                 options: List[str], geo_transform: tuple, cols: int):
+        self.strip = strip
+        # (file path, value scale name) of the rasters passed to the operator
+        self.inputs = inputs
+        self.operator = operator
+        self.arguments = arguments
+        self.options = options
+        self.geo_transform = geo_transform
+        self.cols = cols
+
+
+class ParallelExecution:
+    """
+    Runs a PCRaster operator on halo-padded strips of a raster in a pool of worker
+    processes, and stitches the results into a single output file.
+
+    The operator is given as the name of a pcraster function and its non-raster
+    arguments, as the algorithm itself can't be used outside of the QGIS process.
+    """
+
+    # wait timeout while polling for cancellation, in seconds
+    POLL_INTERVAL = 0.5
+
+    @staticmethod
+    def python_executable() -> str:
+        """
+        Returns the Python interpreter used to start worker processes. Inside QGIS,
+        sys.executable is the QGIS application rather than Python.
+        """
+        executable = sys.executable
+        if executable and os.path.basename(executable).lower().startswith('python'):
+            return executable
+
+        for folder in (sys.exec_prefix, os.path.join(sys.exec_prefix, 'bin')):
+            for name in ('python3', 'python', 'python3.exe', 'python.exe'):
+                candidate = os.path.join(folder, name)
+                if os.path.isfile(candidate):
+                    return candidate
+        return executable
+
+    @staticmethod
+    def strip_rows(rows: int, workers: int, halo: int, strip_rows: int = 0) -> int:
+        """
+        Returns the number of rows per strip. Without an explicit strip size, the raster is
+        split into a few strips per worker. Strips are at least four times the halo, so that
+        most of the rows read by a worker are also written.
+        """
+        if not strip_rows:
+            strip_rows = int(math.ceil(rows / (workers * 4)))
+        return max(strip_rows, 4 * halo, 1)
+
+    @staticmethod
+    def run_task(task: StripTask):
+        """
+        Processes a strip in a worker process. Returns the strip, the rows to write
+        and the value scale name of the result.
+        """
+        pcr = PCRasterRuntime.module()
+
+        for option in task.options:
+            pcr.setglobaloption(option)
+
+        strip = task.strip
+        west, cell_size, _, north, _, row_height = task.geo_transform
+        pcr.setclone(strip.read_rows(), task.cols, cell_size, west, north + strip.read_start * row_height)
+
+        rasters = [TiledExecution.read_strip(pcr, gdal.Open(path), value_scale_name, strip)
+                   for path, value_scale_name in task.inputs]
+        field = getattr(pcr, task.operator)(*rasters, *task.arguments)
+
+        value_scale_name = field.dataType().name
+        if value_scale_name not in TiledExecution.VALUE_SCALES:
+            return strip, None, value_scale_name
+
+        array = pcr.pcr2numpy(field, TiledExecution.VALUE_SCALES[value_scale_name][2])
+        offset = strip.write_offset()
+        return strip, array[offset:offset + strip.write_end - strip.write_start], value_scale_name
+
+    @staticmethod
+    def run(algorithm, inputs: List[str], output_file: str, *,  # pylint: disable=too-many-locals
+            operator: Tuple[str, tuple], options: List[str], halo: int, workers: int, strip_rows: int,
+            feedback, crs_wkt: str = '') -> Optional[str]:
+        """
+        Runs operator, a (pcraster function name, arguments) tuple, on the raster files in inputs, in the
+        order of the algorithm's raster_inputs(), using workers processes, writing the result to output_file
+        with the CRS crs_wkt.
+
+        Returns output_file, or None if the rasters can't be processed in strips and the algorithm
+        should be run on the whole rasters instead. Raises a QgsProcessingException when canceled,
+        after removing the partial output.
+        """
+        value_scales = algorithm.raster_value_scales()
+        datasets = TiledExecution.open_inputs(algorithm, {str(index): path for index, path in enumerate(inputs)},
+                                              {str(index): value_scales[name]
+                                               for index, name in enumerate(algorithm.raster_inputs())
+                                               if name in value_scales})
+        if not datasets:
+            return None
+
+        template = datasets['0'][0]
+        rows = template.RasterYSize
+        strip_rows = ParallelExecution.strip_rows(rows, workers, halo, strip_rows)
+        if rows <= strip_rows:
+            return None
+
+        task_inputs = [(path, datasets[str(index)][1]) for index, path in enumerate(inputs)]
+        tasks = iter([StripTask(strip, inputs=task_inputs, operator=operator[0], arguments=operator[1],
+                                options=options, geo_transform=template.GetGeoTransform(),
+                                cols=template.RasterXSize)
+                      for strip in TiledExecution.strips(rows, strip_rows, halo)])
+        total = int(math.ceil(rows / strip_rows))
+
+        mp_context = multiprocessing.get_context('spawn')
+        mp_context.set_executable(ParallelExecution.python_executable())
+
+        output = None
+        completed = 0
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+            # keep a bounded number of strips in flight, so memory use doesn't depend on the raster size
+            pending = {executor.submit(ParallelExecution.run_task, task) for task in
+                       (next(tasks, None) for _ in range(workers * 2)) if task is not None}
+            while pending:
+                done, pending = wait(pending, timeout=ParallelExecution.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if feedback.isCanceled():
+                    for future in pending:
+                        future.cancel()
+                    break
+
+                for future in done:
+                    strip, array, value_scale_name = future.result()
+                    if array is None:
+                        # e.g. directional results, which are written as a whole
+                        for other in pending:
+                            other.cancel()
+                        return None
+
+                    if output is None:
+                        output = TiledExecution.create_output(algorithm, output_file, value_scale_name, template,
+                                                              crs_wkt)
+                    output.GetRasterBand(1).WriteArray(array, 0, strip.write_start)
+
+                    completed += 1
+                    feedback.setProgress(100 * completed / total)
+
+                    task = next(tasks, None)
+                    if task is not None:
+                        pending.add(executor.submit(ParallelExecution.run_task, task))
+
+        if feedback.isCanceled():
+            # close the partially written output before removing it
+            output = None
+            TiledExecution.remove_outputs([output_file])
+            raise QgsProcessingException(algorithm.tr('{} was canceled').format(algorithm.displayName()))
+        if output is None:
+            return None
+
+        RasterWriter.finish(output, output_file, value_scale_name)
+        # close the output dataset
+        output = None
+        RasterWriter.finalize(output_file, value_scale_name)
+        return output_file
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import threading
+from typing import Optional
+
+
+class PCRasterRuntime:
+    """
+    Imports the pcraster module once per session and records whether it is
+    available, its version and the import error.
+
+    Used by the plugin, the provider and the algorithms instead of each
+    importing pcraster themselves.
+    """
+
+    _lock = threading.Lock()
+    _probed = False
+    _module = None
+    _version = None
+    _error = None
+
+    @classmethod
+    def _probe(cls):
+        """
+        Imports pcraster, if not yet attempted
+        """
+        if cls._probed:
+            return
+
+        with cls._lock:
+            if cls._probed:
+                return
+            try:
+                import pcraster  # pylint: disable=import-outside-toplevel
+                cls._module = pcraster
+                cls._version = getattr(pcraster, '__version__', None)
+            except ImportError as e:
+                cls._error = str(e)
+            cls._probed = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Returns True if the pcraster module can be imported
+        """
+        cls._probe()
+        return cls._module is not None
+
+    @classmethod
+    def module(cls):
+        """
+        Returns the pcraster module, or None if it is not available
+        """
+        cls._probe()
+        return cls._module
+
+    @classmethod
+    def version(cls) -> Optional[str]:
+        """
+        Returns the version of the pcraster module, if known
+        """
+        cls._probe()
+        return cls._version
+
+    @classmethod
+    def error(cls) -> Optional[str]:
+        """
+        Returns the error raised when importing pcraster, if any
+        """
+        cls._probe()
+        return cls._error
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets the result of the import, so that the next call imports pcraster again
+        """
+        with cls._lock:
+            cls._probed = False
+            cls._module = None
+            cls._version = None
+            cls._error = None
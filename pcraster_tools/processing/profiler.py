@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import ctypes
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class PhaseTiming:
+    """
+    Accumulated wall and CPU time of one phase of an algorithm run
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.calls = 0
+        # highest resident memory sampled during the phase, and its increase over the memory at the start
+        self.peak_rss = None
+        self.rss_increase = None
+
+    def add_memory(self, start_rss: Optional[int], peak_rss: Optional[int]):
+        """
+        Records the resident memory at the start and the peak resident memory of a call
+        """
+        if start_rss is None or peak_rss is None:
+            return
+        self.peak_rss = max(self.peak_rss or 0, peak_rss)
+        self.rss_increase = max(self.rss_increase or 0, peak_rss - start_rss)
+
+    def as_dict(self) -> Dict[str, object]:
+        """
+        Returns the timing as a dictionary, for the profile log
+        """
+        return {'phase': self.name, 'wall': round(self.wall, 6), 'cpu': round(self.cpu, 6),
+                'calls': self.calls, 'peak_rss': self.peak_rss, 'rss_increase': self.rss_increase}
+
+
+class MemorySampler(threading.Thread):
+    """
+    Samples the resident memory of the process while a phase runs, as the lifetime
+    peak of the process doesn't tell which phase used the memory
+    """
+
+    # sampling interval, in seconds
+    INTERVAL = 0.01
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.start_rss = Profiler.current_rss()
+        self.peak_rss = self.start_rss
+        self._done = threading.Event()
+
+    def run(self):  # pylint: disable=missing-function-docstring
+        while not self._done.wait(self.INTERVAL):
+            self.sample()
+
+    def sample(self):
+        """
+        Updates the peak with the current resident memory
+        """
+        rss = Profiler.current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def stop(self) -> Optional[int]:
+        """
+        Stops sampling and returns the peak resident memory in bytes, or None if not known
+        """
+        self._done.set()
+        self.join()
+        self.sample()
+        return self.peak_rss
+
+
+class Profiler:
+    """
+    Records per-phase wall time, CPU time and peak resident memory of an algorithm
+    run, e.g. the time spent reading rasters, running the operator and writing
+    the outputs. The resident memory is sampled while each phase runs.
+
+    CPU time and memory are process-wide, so they include other work running
+    in the QGIS process at the same time.
+    """
+
+    def __init__(self, algorithm_id: str):
+        self.algorithm_id = algorithm_id
+        self.phases: List[PhaseTiming] = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._start_rss = self.current_rss()
+        self._peak_rss = self._start_rss
+
+    @staticmethod
+    def current_rss() -> Optional[int]:
+        """
+        Returns the current resident memory of the process in bytes, or None if not known
+        """
+        try:
+            with open('/proc/self/statm', 'r', encoding='utf-8') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        if os.name == 'nt':
+            class ProcessMemoryCounters(ctypes.Structure):  # pylint: disable=too-few-public-methods
+                """
+                PROCESS_MEMORY_COUNTERS from psapi.h
+                """
+                _fields_ = [('cb', ctypes.c_ulong),
+                            ('PageFaultCount', ctypes.c_ulong),
+                            ('PeakWorkingSetSize', ctypes.c_size_t),
+                            ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t),
+                            ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = ProcessMemoryCounters(cb=ctypes.sizeof(ProcessMemoryCounters))
+            try:
+                process = ctypes.windll.kernel32.GetCurrentProcess()
+                if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                    return counters.WorkingSetSize
+            except (AttributeError, OSError):
+                pass
+        return None
+
+    def phase_timing(self, name: str) -> PhaseTiming:
+        """
+        Returns the timing of a phase, adding it if it was not run before
+        """
+        for phase in self.phases:
+            if phase.name == name:
+                return phase
+        phase = PhaseTiming(name)
+        self.phases.append(phase)
+        return phase
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager timing a phase. A phase which is entered several times,
+        e.g. once per output, accumulates its times.
+        """
+        sampler = MemorySampler()
+        sampler.start()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.phase_timing(name)
+            timing.wall += time.perf_counter() - start_wall
+            timing.cpu += time.process_time() - start_cpu
+            timing.calls += 1
+            peak_rss = sampler.stop()
+            timing.add_memory(sampler.start_rss, peak_rss)
+            if peak_rss is not None:
+                self._peak_rss = max(self._peak_rss or 0, peak_rss)
+
+    def total(self) -> PhaseTiming:
+        """
+        Returns the timing of the whole run so far
+        """
+        total = PhaseTiming('total')
+        total.wall = time.perf_counter() - self._start_wall
+        total.cpu = time.process_time() - self._start_cpu
+        total.calls = 1
+        total.add_memory(self._start_rss, max(self._peak_rss or 0, self.current_rss() or 0) or None)
+        return total
+
+    @staticmethod
+    def format_timing(timing: PhaseTiming) -> str:
+        """
+        Returns a timing as a line of text
+        """
+        text = '{}: {:.3f} s wall, {:.3f} s CPU'.format(timing.name, timing.wall, timing.cpu)
+        if timing.calls > 1:
+            text += ', {} calls'.format(timing.calls)
+        if timing.peak_rss is not None:
+            text += ', peak memory {:.1f} MB (+{:.1f} MB)'.format(timing.peak_rss / (1024 * 1024),
+                                                                timing.rss_increase / (1024 * 1024))
+        return text
+
+    def report(self, feedback):
+        """
+        Pushes the timings to the debug log of feedback
+        """
+        if not feedback:
+            return
+        for timing in self.phases + [self.total()]:
+            feedback.pushDebugInfo(self.format_timing(timing))
+
+    def write_log(self, path: str, status: str = 'ok'):
+        """
+        Appends the timings of the run as a JSON line to the file at path
+        """
+        record = {
+            'algorithm': self.algorithm_id,
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'status': status,
+            'phases': [timing.as_dict() for timing in self.phases],
+            'total': self.total().as_dict(),
+        }
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
@@ -17,14 +17,16 @@
 ***************************************************************************
 """
 
-import inspect
-
 from qgis.PyQt.QtCore import QCoreApplication
 from qgis.core import (QgsProcessingProvider)
 
 from pcraster_tools.gui.gui_utils import GuiUtils
-from pcraster_tools.processing import algorithms
-from pcraster_tools.processing.algorithm import PCRasterAlgorithm
+from pcraster_tools.processing.batch import BatchExecution
+from pcraster_tools.processing.algorithms.manifest import ALGORITHMS
+from pcraster_tools.processing.lazy_algorithm import LazyAlgorithm
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+from pcraster_tools.processing.raster_registry import RasterRegistry
+from pcraster_tools.processing.settings import PCRasterSettings
 
 
 class PCRasterAlgorithmProvider(QgsProcessingProvider):
@@ -41,6 +43,7 @@ class PCRasterAlgorithmProvider(QgsProcessingProvider):
         """
         Called when first loading provider
         """
+        PCRasterSettings.add_settings(self)
         self.refreshAlgorithms()
         return True
 
@@ -48,6 +51,8 @@ class PCRasterAlgorithmProvider(QgsProcessingProvider):
         """
         Called when unloading provider
         """
+        PCRasterSettings.remove_settings()
+        RasterRegistry.instance().clear()
 
     def icon(self):
         """
@@ -71,8 +76,18 @@ class PCRasterAlgorithmProvider(QgsProcessingProvider):
         """
         Provider plugin version
         """
+        if PCRasterRuntime.version():
+            return "QGIS PCRaster Provider version {} (PCRaster {})".format(self.VERSION, PCRasterRuntime.version())
         return "QGIS PCRaster Provider version {}".format(self.VERSION)
 
+    def warningMessage(self):
+        """
+        Warning shown in the toolbox when PCRaster is not available
+        """
+        if not PCRasterRuntime.is_available():
+            return self.tr('PCRaster is not installed -- algorithms will not be available')
+        return ''
+
     def id(self):
         """
         Unique ID for provider
@@ -83,12 +98,17 @@ class PCRasterAlgorithmProvider(QgsProcessingProvider):
         """
         Called when provider must populate its available algorithms
         """
+        # each stand-in imports its algorithm module when it is added, to copy the parameter definitions
+        for entry in ALGORITHMS:
+            self.addAlgorithm(LazyAlgorithm(entry))
 
-        alg_classes = [m[1] for m in inspect.getmembers(algorithms, inspect.isclass) if
-                       issubclass(m[1], PCRasterAlgorithm)]
-
-        for alg_class in alg_classes:
-            self.addAlgorithm(alg_class())
+    @staticmethod
+    def run_batch(algorithm_id: str, items, workers: int, feedback):
+        """
+        Runs a PCRaster algorithm on a list of input sets (parameter dictionaries) in a
+        pool of workers processes, see BatchExecution.run()
+        """
+        return BatchExecution.run(algorithm_id, items, workers, feedback)
 
     def tr(self, string, context=''):
         """
@@ -106,6 +126,12 @@ class PCRasterAlgorithmProvider(QgsProcessingProvider):
 
     def supportedOutputRasterLayerExtensions(self):
         """
-        Only the PCRaster format is output
+        Outputs are written in PCRaster format, or as tiled and compressed GeoTIFF
+        """
+        return ['map', 'tif', 'tiff']
+
+    def defaultRasterFileExtension(self):
+        """
+        Outputs are written in PCRaster format by default
         """
-        return ['map']
+        return 'map'
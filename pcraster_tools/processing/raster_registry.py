@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+CloneGeometry = Tuple[int, int, float, float, float]
+
+
+class RasterRegistry:
+    """
+    Process-wide LRU cache of decoded PCRaster fields.
+
+    Fields read with readmap and fields written by PCRaster algorithms with
+    report are kept here, keyed on the file path and the (mtime, size) state
+    of the file, along with the clone the field was read or computed on. The
+    next PCRaster algorithm reading that file with the same clone (e.g. the
+    following step of a model, or another tool using the same DEM) receives
+    the live field instead of decoding the file again. Entries are ignored as
+    soon as the file on disk is modified or removed.
+
+    The total estimated memory used by the cached fields is limited to the
+    maximum size, evicting the least recently used fields first.
+    """
+
+    # Default memory cap, in bytes
+    DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+    _instance = None
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._size = 0
+
+    @classmethod
+    def instance(cls) -> 'RasterRegistry':
+        """
+        Returns the shared registry instance
+        """
+        if cls._instance is None:
+            cls._instance = RasterRegistry()
+        return cls._instance
+
+    @staticmethod
+    def normalize_path(path: str) -> str:
+        """
+        Returns the key used to store a file path
+        """
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def file_signature(path: str) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (mtime, size) signature for a file, or None if the file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def clone_geometry(clone) -> CloneGeometry:
+        """
+        Returns the (rows, cols, cell size, west, north) geometry of a PCRaster clone
+        """
+        return clone.nrRows(), clone.nrCols(), clone.cellSize(), clone.west(), clone.north()
+
+    def max_size(self) -> int:
+        """
+        Returns the maximum total size of the cached fields, in bytes
+        """
+        return self._max_size
+
+    def set_max_size(self, max_size: int):
+        """
+        Sets the maximum total size of the cached fields, in bytes. A size of 0 disables the cache.
+        """
+        with self._lock:
+            self._max_size = max(0, max_size)
+            self._evict()
+
+    def size(self) -> int:
+        """
+        Returns the estimated total size of the cached fields, in bytes
+        """
+        with self._lock:
+            return self._size
+
+    def register(self, path: str, field, cost: Optional[int] = None, clone: Optional[CloneGeometry] = None) -> bool:
+        """
+        Registers the decoded field for the file at path, read or computed on the clone geometry.
+
+        cost is the estimated memory used by the field in bytes, defaulting to the file size.
+        Returns False if the field could not be registered, e.g. because the file does not exist
+        or the field is larger than the maximum cache size.
+        """
+        signature = self.file_signature(path)
+        if signature is None:
+            return False
+
+        if cost is None:
+            cost = signature[1]
+
+        key = self.normalize_path(path)
+        with self._lock:
+            self._remove(key)
+            if cost > self._max_size:
+                return False
+
+            self._entries[key] = (signature, clone, field, cost)
+            self._size += cost
+            self._evict()
+        return True
+
+    def refresh(self, path: str):
+        """
+        Updates the stored file signature for path after a change which does not
+        affect the cell values, e.g. assigning a CRS to the output
+        """
+        key = self.normalize_path(path)
+        signature = self.file_signature(path)
+        with self._lock:
+            if key not in self._entries:
+                return
+            if signature is None:
+                self._remove(key)
+            else:
+                _, clone, field, cost = self._entries[key]
+                self._entries[key] = (signature, clone, field, cost)
+
+    def field(self, path: str, clone: Optional[CloneGeometry] = None):
+        """
+        Returns the cached field for path, or None if no field is cached, the file
+        has changed since it was cached or the field was cached with another clone geometry
+        """
+        key = self.normalize_path(path)
+        signature = self.file_signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != signature:
+                self._remove(key)
+                return None
+            if entry[1] != clone:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def remove(self, path: str):
+        """
+        Removes any field cached for path
+        """
+        with self._lock:
+            self._remove(self.normalize_path(path))
+
+    def clear(self):
+        """
+        Removes all cached fields
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str):
+        """
+        Removes the entry for key. The lock must be held by the caller.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[3]
+
+    def _evict(self):
+        """
+        Evicts the least recently used entries until the cache fits in the
+        maximum size. The lock must be held by the caller.
+        """
+        while self._entries and self._size > self._max_size:
+            _, (_, _, _, cost) = self._entries.popitem(last=False)
+            self._size -= cost
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+from typing import List, Optional
+
+from osgeo import gdal
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.settings import PCRasterSettings
+
+
+class RasterWriter:
+    """
+    Writes algorithm outputs as PCRaster maps or, for .tif outputs, as tiled and
+    compressed GeoTIFF (optionally Cloud Optimized GeoTIFF) with overviews.
+
+    GeoTIFF outputs keep the PCRaster value scale in the PCRASTER_VALUESCALE band
+    metadata, so that they are read back with the same value scale.
+    """
+
+    GEOTIFF_EXTENSIONS = ('.tif', '.tiff')
+
+    # overviews are built until they fit in a block of this size
+    OVERVIEW_MIN_SIZE = 256
+
+    BLOCK_SIZE = 512
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def is_geotiff(path: str) -> bool:
+        """
+        Returns True if an output is written as GeoTIFF
+        """
+        return os.path.splitext(path)[1].lower() in RasterWriter.GEOTIFF_EXTENSIONS
+
+    @staticmethod
+    def use_cog() -> bool:
+        """
+        Returns True if GeoTIFF outputs are converted to Cloud Optimized GeoTIFF
+        """
+        return PCRasterSettings.geotiff_cog() and gdal.GetDriverByName('COG') is not None
+
+    @staticmethod
+    def resampling(value_scale_name: str) -> str:
+        """
+        Returns the overview resampling method for a value scale. Only scalar
+        values can be averaged.
+        """
+        return 'AVERAGE' if value_scale_name == 'Scalar' else 'NEAREST'
+
+    @staticmethod
+    def overview_levels(cols: int, rows: int) -> List[int]:
+        """
+        Returns the overview decimation factors for a raster
+        """
+        levels = []
+        factor = 2
+        while max(cols, rows) / factor >= RasterWriter.OVERVIEW_MIN_SIZE:
+            levels.append(factor)
+            factor *= 2
+        return levels
+
+    @staticmethod
+    def creation_options(value_scale_name: str, compression: str, bands: int = 1) -> List[str]:
+        """
+        Returns the GeoTIFF creation options for a value scale and compression. Outputs with
+        several bands store each band in tiles of its own, so that writing one band doesn't
+        rewrite the tiles of the others.
+        """
+        options = ['TILED=YES',
+                   'BLOCKXSIZE={}'.format(RasterWriter.BLOCK_SIZE),
+                   'BLOCKYSIZE={}'.format(RasterWriter.BLOCK_SIZE),
+                   'BIGTIFF=IF_SAFER',
+                   'COMPRESS={}'.format(compression)]
+        if compression != 'NONE':
+            # floating point predictor for scalar and directional values, horizontal differencing otherwise
+            data_type = GdalLoader.VALUE_SCALES[value_scale_name][1]
+            options.append('PREDICTOR={}'.format(3 if data_type == gdal.GDT_Float32 else 2))
+        if bands > 1:
+            options.append('INTERLEAVE=BAND')
+        return options
+
+    @staticmethod
+    def create(path: str, value_scale_name: str, cols: int, rows: int, geo_transform, *, crs_wkt: str = '',
+               bands: int = 1):
+        """
+        Creates an output raster for a value scale, as PCRaster map or GeoTIFF depending on
+        the extension of path. Only GeoTIFF outputs can have several bands. Returns None if
+        the raster can't be created.
+        """
+        option, data_type, missing_value, _ = GdalLoader.VALUE_SCALES[value_scale_name]
+        if RasterWriter.is_geotiff(path):
+            ds = gdal.GetDriverByName('GTiff').Create(
+                path, cols, rows, bands, data_type,
+                options=RasterWriter.creation_options(value_scale_name, PCRasterSettings.geotiff_compression(),
+                                                      bands))
+        else:
+            ds = gdal.GetDriverByName('PCRaster').Create(path, cols, rows, 1, data_type,
+                                                         options=['PCRASTER_VALUESCALE={}'.format(option)])
+        if ds is None:
+            return None
+
+        ds.SetGeoTransform(geo_transform)
+        if crs_wkt:
+            ds.SetProjection(crs_wkt)
+        if RasterWriter.is_geotiff(path):
+            for band_number in range(1, bands + 1):
+                band = ds.GetRasterBand(band_number)
+                band.SetNoDataValue(missing_value)
+                band.SetMetadataItem('PCRASTER_VALUESCALE', option)
+        return ds
+
+    @staticmethod
+    def create_stack(path: str, value_scale_name: str, template, labels: List[str], crs_wkt: str = ''):
+        """
+        Creates a GeoTIFF output with the grid of the template dataset and a band per label,
+        e.g. per time step or parameter value
+        """
+        if not RasterWriter.is_geotiff(path):
+            raise QgsProcessingException(RasterWriter.tr('Stacked output {} must be a GeoTIFF file').format(path))
+        ds = RasterWriter.create(path, value_scale_name, template.RasterXSize, template.RasterYSize,
+                                 template.GetGeoTransform(), crs_wkt=crs_wkt, bands=len(labels))
+        if ds is None:
+            raise QgsProcessingException(RasterWriter.tr('Could not create output file {}').format(path))
+        for band_number, label in enumerate(labels, 1):
+            ds.GetRasterBand(band_number).SetDescription(label)
+        return ds
+
+    @staticmethod
+    def finish(ds, path: str, value_scale_name: str):
+        """
+        Completes an output before it is closed, building GeoTIFF overviews
+        """
+        if RasterWriter.is_geotiff(path) and PCRasterSettings.geotiff_overviews() and not RasterWriter.use_cog():
+            levels = RasterWriter.overview_levels(ds.RasterXSize, ds.RasterYSize)
+            if levels:
+                ds.BuildOverviews(RasterWriter.resampling(value_scale_name), levels)
+        ds.FlushCache()
+
+    @staticmethod
+    def finalize(path: str, value_scale_name: str):
+        """
+        Completes an output after it was closed, converting GeoTIFF outputs to Cloud
+        Optimized GeoTIFF if enabled
+        """
+        if not RasterWriter.is_geotiff(path) or not RasterWriter.use_cog():
+            return
+
+        temp_path = path + '.cog.tif'
+        compression = PCRasterSettings.geotiff_compression()
+        options = ['COMPRESS={}'.format(compression),
+                   'BLOCKSIZE={}'.format(RasterWriter.BLOCK_SIZE),
+                   'BIGTIFF=IF_SAFER',
+                   'RESAMPLING={}'.format(RasterWriter.resampling(value_scale_name)),
+                   'OVERVIEWS={}'.format('AUTO' if PCRasterSettings.geotiff_overviews() else 'NONE')]
+        if compression != 'NONE':
+            options.append('PREDICTOR=YES')
+
+        ds = gdal.Translate(temp_path, path, format='COG', creationOptions=options)
+        if ds is None:
+            raise QgsProcessingException(RasterWriter.tr('Could not write Cloud Optimized GeoTIFF {}').format(path))
+        # close the dataset before replacing the output
+        ds = None
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def write_field(pcr, field, path: str, crs_wkt: str = ''):
+        """
+        Writes a PCRaster field covering the current clone to a GeoTIFF output
+        """
+        value_scale_name = field.dataType().name
+        missing_value = GdalLoader.VALUE_SCALES[value_scale_name][2]
+        clone = pcr.clone()
+        geo_transform = (clone.west(), clone.cellSize(), 0, clone.north(), 0, -clone.cellSize())
+
+        ds = RasterWriter.create(path, value_scale_name, clone.nrCols(), clone.nrRows(), geo_transform,
+                                 crs_wkt=crs_wkt)
+        if ds is None:
+            raise QgsProcessingException(RasterWriter.tr('Could not create output file {}').format(path))
+        ds.GetRasterBand(1).WriteArray(pcr.pcr2numpy(field, missing_value))
+        RasterWriter.finish(ds, path, value_scale_name)
+        # close the dataset
+        ds = None
+        RasterWriter.finalize(path, value_scale_name)
+
+    @staticmethod
+    def copy_raster(source: str, path: str, crs_wkt: str = '', *,
+                    value_scale_name: Optional[str] = None, feedback=None) -> bool:
+        """
+        Copies a raster block by block to an output in the format given by the extension of
+        path, converting it to value_scale_name (by default derived from the source band).
+
+        Progress is reported to feedback. Returns False, removing the incomplete output, if
+        feedback is canceled.
+        """
+        source_ds = GdalLoader.open(source)
+        band = source_ds.GetRasterBand(1)
+        if value_scale_name is None:
+            value_scale_name = GdalLoader.value_scale_name(band)
+        rows = source_ds.RasterYSize
+
+        ds = RasterWriter.create(path, value_scale_name, source_ds.RasterXSize, rows, source_ds.GetGeoTransform(),
+                                 crs_wkt=crs_wkt or source_ds.GetProjection())
+        if ds is None:
+            raise QgsProcessingException(RasterWriter.tr('Could not create output file {}').format(path))
+        block_rows = GdalLoader.block_rows(band)
+        for row in range(0, rows, block_rows):
+            if feedback is not None:
+                if feedback.isCanceled():
+                    driver = ds.GetDriver()
+                    ds = None
+                    driver.Delete(path)
+                    return False
+                feedback.setProgress(100 * row / rows)
+            count = min(block_rows, rows - row)
+            ds.GetRasterBand(1).WriteArray(GdalLoader.read_block(band, row, count, value_scale_name), 0, row)
+        RasterWriter.finish(ds, path, value_scale_name)
+        # close the datasets
+        ds = None
+        source_ds = None
+        RasterWriter.finalize(path, value_scale_name)
+        return True
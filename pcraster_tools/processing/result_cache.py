@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from pcraster_tools.processing.raster_registry import RasterRegistry
+
+
+class ResultCache:
+    """
+    On-disk cache of PCRaster algorithm outputs.
+
+    Outputs are stored in a folder per cache key, together with a manifest
+    listing the output parameter names and files. The key is built from the
+    algorithm id, the hashes of the input files, the parameter values and the
+    PCRaster global options, so running the same algorithm again with the same
+    inputs copies the stored outputs instead of recomputing them. The output file
+    formats and writer settings are part of the key as well, and fetched outputs
+    must have the extension of their destination.
+
+    The total size of the stored outputs can be limited, removing the least
+    recently used entries first.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    # GDAL sidecar files which hold e.g. the CRS assigned to an output
+    SIDECAR_SUFFIXES = ('.aux.xml',)
+
+    _instance = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = {}
+
+    @classmethod
+    def instance(cls) -> 'ResultCache':
+        """
+        Returns the shared result cache instance
+        """
+        if cls._instance is None:
+            cls._instance = ResultCache()
+        return cls._instance
+
+    def file_hash(self, path: str) -> Optional[str]:
+        """
+        Returns the SHA-256 hash of the content of the file at path, or None if the
+        file does not exist. Hashes are remembered until the file is modified.
+        """
+        signature = RasterRegistry.file_signature(path)
+        if signature is None:
+            return None
+
+        key = RasterRegistry.normalize_path(path)
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        file_hash = digest.hexdigest()
+
+        with self._lock:
+            self._hashes[key] = (signature, file_hash)
+        return file_hash
+
+    @staticmethod
+    def key(algorithm_id: str, input_hashes: Dict[str, Optional[str]], parameter_values: Dict[str, str],
+            global_options: List[str], *, output_formats: Optional[Dict[str, str]] = None,
+            writer_settings: Optional[Dict[str, object]] = None) -> str:
+        """
+        Returns the cache key for an algorithm run. output_formats maps the output parameter
+        names to their file extensions, writer_settings holds the settings used to write them.
+        """
+        description = json.dumps({
+            'algorithm': algorithm_id,
+            'inputs': input_hashes,
+            'parameters': parameter_values,
+            'options': list(global_options),
+            'outputs': output_formats or {},
+            'writer': writer_settings or {}
+        }, sort_keys=True)
+        return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def entry_folder(folder: str, key: str) -> str:
+        """
+        Returns the folder holding the outputs stored for key
+        """
+        return os.path.join(folder, key[:2], key)
+
+    @staticmethod
+    def copy_file(source: str, destination: str):
+        """
+        Copies a raster file and its GDAL sidecar files
+        """
+        shutil.copyfile(source, destination)
+        for suffix in ResultCache.SIDECAR_SUFFIXES:
+            if os.path.exists(source + suffix):
+                shutil.copyfile(source + suffix, destination + suffix)
+            elif os.path.exists(destination + suffix):
+                os.remove(destination + suffix)
+
+    def fetch(self, folder: str, key: str, outputs: Dict[str, str]) -> bool:
+        """
+        Copies the outputs stored for key to the destination paths in outputs, a dictionary of
+        output parameter names to file paths. Returns False if no matching outputs are stored.
+        """
+        entry = self.entry_folder(folder, key)
+        try:
+            with open(os.path.join(entry, self.MANIFEST), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if set(manifest.keys()) != set(outputs.keys()):
+            return False
+        if any(os.path.splitext(manifest[name])[1].lower() != os.path.splitext(destination)[1].lower()
+               for name, destination in outputs.items()):
+            return False
+        if not all(os.path.exists(os.path.join(entry, file_name)) for file_name in manifest.values()):
+            return False
+
+        for name, destination in outputs.items():
+            self.copy_file(os.path.join(entry, manifest[name]), destination)
+        # mark the entry as recently used, see prune()
+        try:
+            os.utime(os.path.join(entry, self.MANIFEST))
+        except OSError:
+            pass
+        return True
+
+    def store(self, folder: str, key: str, outputs: Dict[str, str], max_size: int = 0) -> bool:
+        """
+        Stores the output files for key, from a dictionary of output parameter names to file paths.
+        With a max_size in bytes, the least recently used entries are removed from folder afterwards.
+        """
+        entry = self.entry_folder(folder, key)
+        parent = os.path.dirname(entry)
+        staging = None
+        try:
+            os.makedirs(parent, exist_ok=True)
+            # write to a temporary folder first, so a partially written entry is never used
+            staging = tempfile.mkdtemp(dir=parent)
+            manifest = {}
+            for index, (name, path) in enumerate(sorted(outputs.items())):
+                file_name = '{}{}'.format(index, os.path.splitext(path)[1])
+                self.copy_file(path, os.path.join(staging, file_name))
+                manifest[name] = file_name
+            with open(os.path.join(staging, self.MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+            if os.path.exists(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+        except OSError:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        if max_size:
+            self.prune(folder, max_size)
+        return True
+
+    @staticmethod
+    def entry_size(entry: str) -> int:
+        """
+        Returns the total size of the files in an entry folder, in bytes
+        """
+        size = 0
+        for file_entry in os.scandir(entry):
+            try:
+                size += file_entry.stat().st_size
+            except OSError:
+                continue
+        return size
+
+    @staticmethod
+    def prune(folder: str, max_size: int):
+        """
+        Removes the least recently used entries from folder until their total size is at most max_size
+        """
+        entries = []
+        for parent in os.scandir(folder):
+            if not parent.is_dir():
+                continue
+            for entry in os.scandir(parent.path):
+                # entries which are still being written have no manifest yet
+                try:
+                    last_used = os.stat(os.path.join(entry.path, ResultCache.MANIFEST)).st_mtime
+                    size = ResultCache.entry_size(entry.path)
+                except OSError:
+                    continue
+                entries.append((last_used, size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    @staticmethod
+    def clear(folder: str):
+        """
+        Removes all outputs stored in folder
+        """
+        if os.path.isdir(folder):
+            shutil.rmtree(folder, ignore_errors=True)
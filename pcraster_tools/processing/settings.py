@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+from typing import Optional
+
+from qgis.core import QgsApplication
+
+from processing.core.ProcessingConfig import (
+    ProcessingConfig,
+    Setting
+)
+
+
+class PCRasterSettings:
+    """
+    Processing settings for the PCRaster provider
+    """
+
+    READ_CACHE_SIZE = 'PCRASTER_READ_CACHE_SIZE'
+    RESULT_CACHE = 'PCRASTER_RESULT_CACHE'
+    RESULT_CACHE_FOLDER = 'PCRASTER_RESULT_CACHE_FOLDER'
+    RESULT_CACHE_SIZE = 'PCRASTER_RESULT_CACHE_SIZE'
+    TILE_ROWS = 'PCRASTER_TILE_ROWS'
+    WORKERS = 'PCRASTER_WORKERS'
+    COMMAND_TIMEOUT = 'PCRASTER_COMMAND_TIMEOUT'
+    PROFILE_LOG = 'PCRASTER_PROFILE_LOG'
+    GEOTIFF_COMPRESSION = 'PCRASTER_GEOTIFF_COMPRESSION'
+    GEOTIFF_OVERVIEWS = 'PCRASTER_GEOTIFF_OVERVIEWS'
+    GEOTIFF_COG = 'PCRASTER_GEOTIFF_COG'
+    GDAL_CACHE_SIZE = 'PCRASTER_GDAL_CACHE_SIZE'
+    GDAL_THREADS = 'PCRASTER_GDAL_THREADS'
+    LDD_INDEX = 'PCRASTER_LDD_INDEX'
+
+    GEOTIFF_COMPRESSIONS = ['DEFLATE', 'LZW', 'ZSTD', 'NONE']
+
+    DEFAULT_READ_CACHE_SIZE = 1024
+    DEFAULT_RESULT_CACHE_SIZE = 4096
+
+    @staticmethod
+    def setting_names():
+        """
+        Returns the names of all PCRaster provider settings
+        """
+        return [PCRasterSettings.READ_CACHE_SIZE,
+                PCRasterSettings.RESULT_CACHE,
+                PCRasterSettings.RESULT_CACHE_FOLDER,
+                PCRasterSettings.RESULT_CACHE_SIZE,
+                PCRasterSettings.TILE_ROWS,
+                PCRasterSettings.WORKERS,
+                PCRasterSettings.COMMAND_TIMEOUT,
+                PCRasterSettings.PROFILE_LOG,
+                PCRasterSettings.GEOTIFF_COMPRESSION,
+                PCRasterSettings.GEOTIFF_OVERVIEWS,
+                PCRasterSettings.GEOTIFF_COG,
+                PCRasterSettings.GDAL_CACHE_SIZE,
+                PCRasterSettings.GDAL_THREADS,
+                PCRasterSettings.LDD_INDEX]
+
+    @staticmethod
+    def default_result_cache_folder() -> str:
+        """
+        Returns the default folder for cached algorithm results
+        """
+        return os.path.join(QgsApplication.qgisSettingsDirPath(), 'pcraster_result_cache')
+
+    @staticmethod
+    def default_ldd_index_folder() -> str:
+        """
+        Returns the folder LDD indices are saved to
+        """
+        return os.path.join(QgsApplication.qgisSettingsDirPath(), 'pcraster_ldd_index')
+
+    @staticmethod
+    def add_settings(provider):
+        """
+        Adds the PCRaster settings to the Processing options, under the provider's group
+        """
+        group = provider.name()
+        ProcessingConfig.settingIcons[group] = provider.icon()
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.READ_CACHE_SIZE,
+                                            provider.tr('Read cache size (MB, 0 to disable)'),
+                                            PCRasterSettings.DEFAULT_READ_CACHE_SIZE,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.RESULT_CACHE,
+                                            provider.tr('Reuse results of identical algorithm runs'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.RESULT_CACHE_FOLDER,
+                                            provider.tr('Result cache folder'),
+                                            PCRasterSettings.default_result_cache_folder(),
+                                            valuetype=Setting.FOLDER))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.RESULT_CACHE_SIZE,
+                                            provider.tr('Result cache size (MB, 0 for no limit)'),
+                                            PCRasterSettings.DEFAULT_RESULT_CACHE_SIZE,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.TILE_ROWS,
+                                            provider.tr('Process large rasters in blocks of rows (rows per block, 0 to disable)'),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.WORKERS,
+                                            provider.tr('Worker processes for window operators (0 to use all cores)'),
+                                            1,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.COMMAND_TIMEOUT,
+                                            provider.tr('Timeout for PCRaster applications (seconds, 0 for no timeout)'),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.PROFILE_LOG,
+                                            provider.tr('Append algorithm timings to profile log (JSON lines file)'),
+                                            '',
+                                            valuetype=Setting.FILE))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.GEOTIFF_COMPRESSION,
+                                            provider.tr('Compression of GeoTIFF outputs'),
+                                            PCRasterSettings.GEOTIFF_COMPRESSIONS[0],
+                                            valuetype=Setting.SELECTION,
+                                            options=PCRasterSettings.GEOTIFF_COMPRESSIONS))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.GEOTIFF_OVERVIEWS,
+                                            provider.tr('Build overviews for GeoTIFF outputs'),
+                                            True))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.GEOTIFF_COG,
+                                            provider.tr('Write GeoTIFF outputs as Cloud Optimized GeoTIFF'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.GDAL_CACHE_SIZE,
+                                            provider.tr('GDAL block cache size for conversions (MB, 0 for GDAL default)'),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.GDAL_THREADS,
+                                            provider.tr('GDAL threads for (de)compression in conversions (0 to use all cores)'),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(group, PCRasterSettings.LDD_INDEX,
+                                            provider.tr('Reuse flow graphs of LDD rasters in network operators'),
+                                            False))
+        ProcessingConfig.readSettings()
+
+    @staticmethod
+    def remove_settings():
+        """
+        Removes the PCRaster settings from the Processing options
+        """
+        for name in PCRasterSettings.setting_names():
+            ProcessingConfig.removeSetting(name)
+
+    @staticmethod
+    def int_setting(name: str, default: int) -> int:
+        """
+        Returns the value of an integer setting, or default if the setting is not set or invalid
+        """
+        value = ProcessingConfig.getSetting(name)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def read_cache_size() -> int:
+        """
+        Returns the maximum memory used by the read cache, in bytes
+        """
+        size = PCRasterSettings.int_setting(PCRasterSettings.READ_CACHE_SIZE,
+                                            PCRasterSettings.DEFAULT_READ_CACHE_SIZE)
+        return max(0, size) * 1024 * 1024
+
+    @staticmethod
+    def result_cache_folder() -> Optional[str]:
+        """
+        Returns the folder used to cache algorithm results, or None if result caching is disabled
+        """
+        if not ProcessingConfig.getSetting(PCRasterSettings.RESULT_CACHE):
+            return None
+        return ProcessingConfig.getSetting(PCRasterSettings.RESULT_CACHE_FOLDER) or \
+            PCRasterSettings.default_result_cache_folder()
+
+    @staticmethod
+    def result_cache_size() -> int:
+        """
+        Returns the maximum total size of the cached algorithm results in bytes, or 0 for no limit
+        """
+        size = PCRasterSettings.int_setting(PCRasterSettings.RESULT_CACHE_SIZE,
+                                            PCRasterSettings.DEFAULT_RESULT_CACHE_SIZE)
+        return max(0, size) * 1024 * 1024
+
+    @staticmethod
+    def tile_rows() -> int:
+        """
+        Returns the number of rows per block for tiled execution, or 0 if tiled execution is disabled
+        """
+        return max(0, PCRasterSettings.int_setting(PCRasterSettings.TILE_ROWS, 0))
+
+    @staticmethod
+    def worker_count() -> int:
+        """
+        Returns the number of worker processes used to run window operators
+        """
+        workers = PCRasterSettings.int_setting(PCRasterSettings.WORKERS, 1)
+        if workers <= 0:
+            return os.cpu_count() or 1
+        return workers
+
+    @staticmethod
+    def command_timeout() -> Optional[int]:
+        """
+        Returns the timeout for PCRaster command line applications in seconds, or None for no timeout
+        """
+        return PCRasterSettings.int_setting(PCRasterSettings.COMMAND_TIMEOUT, 0) or None
+
+    @staticmethod
+    def profile_log() -> Optional[str]:
+        """
+        Returns the file algorithm timings are appended to, or None if profiling to a file is disabled
+        """
+        return ProcessingConfig.getSetting(PCRasterSettings.PROFILE_LOG) or None
+
+    @staticmethod
+    def geotiff_compression() -> str:
+        """
+        Returns the compression used for GeoTIFF outputs
+        """
+        compression = ProcessingConfig.getSetting(PCRasterSettings.GEOTIFF_COMPRESSION, readable=True)
+        if compression not in PCRasterSettings.GEOTIFF_COMPRESSIONS:
+            return PCRasterSettings.GEOTIFF_COMPRESSIONS[0]
+        return compression
+
+    @staticmethod
+    def geotiff_overviews() -> bool:
+        """
+        Returns True if overviews are built for GeoTIFF outputs
+        """
+        return ProcessingConfig.getSetting(PCRasterSettings.GEOTIFF_OVERVIEWS) is not False
+
+    @staticmethod
+    def geotiff_cog() -> bool:
+        """
+        Returns True if GeoTIFF outputs are written as Cloud Optimized GeoTIFF
+        """
+        return bool(ProcessingConfig.getSetting(PCRasterSettings.GEOTIFF_COG))
+
+    @staticmethod
+    def gdal_cache_size() -> int:
+        """
+        Returns the GDAL block cache size used for conversions in bytes, or 0 for the GDAL default
+        """
+        return max(0, PCRasterSettings.int_setting(PCRasterSettings.GDAL_CACHE_SIZE, 0)) * 1024 * 1024
+
+    @staticmethod
+    def gdal_threads() -> str:
+        """
+        Returns the number of threads GDAL uses to (de)compress rasters in conversions,
+        as GDAL_NUM_THREADS value
+        """
+        threads = PCRasterSettings.int_setting(PCRasterSettings.GDAL_THREADS, 0)
+        if threads <= 0:
+            return 'ALL_CPUS'
+        return str(threads)
+
+    @staticmethod
+    def ldd_index_folder() -> Optional[str]:
+        """
+        Returns the folder LDD indices are saved to, or None if LDD indices are disabled
+        """
+        if not ProcessingConfig.getSetting(PCRasterSettings.LDD_INDEX):
+            return None
+        return PCRasterSettings.default_ldd_index_folder()
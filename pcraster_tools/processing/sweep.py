@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import multiprocessing
+import os
+import re
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait
+)
+from typing import List, Union
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.parallel import ParallelExecution
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+from pcraster_tools.processing.raster_writer import RasterWriter
+
+
+class SweepExecution:
+    """
+    Runs a transport operator (accuthreshold, accucapacity or accufraction) for a list
+    of parameter values, e.g. for calibration, in a pool of worker processes.
+
+    Each worker reads the LDD and material once and evaluates the flux and state of
+    the values sent to it. The results are written as bands of two stacked GeoTIFF
+    outputs, one band per parameter value.
+    """
+
+    # operation: (flux function, state function)
+    OPERATIONS = {
+        'accuthreshold': ('accuthresholdflux', 'accuthresholdstate'),
+        'accucapacity': ('accucapacityflux', 'accucapacitystate'),
+        'accufraction': ('accufractionflux', 'accufractionstate'),
+    }
+
+    # wait timeout while polling for cancellation, in seconds
+    POLL_INTERVAL = 0.5
+
+    # LDD and material fields of a worker process
+    _ldd = None
+    _material = None
+
+    @staticmethod
+    def tr(string):
+        """
+        Translates a string
+        """
+        return QCoreApplication.translate('PCRasterTools', string)
+
+    @staticmethod
+    def parse_values(text: str) -> List[float]:
+        """
+        Returns the parameter values in a comma or space separated list, e.g. '0.1, 0.2, 0.5'
+        """
+        values = []
+        for item in re.split(r'[,;\s]+', text.strip()):
+            if not item:
+                continue
+            try:
+                values.append(float(item))
+            except ValueError as e:
+                raise QgsProcessingException(SweepExecution.tr('{} is not a number').format(item)) from e
+        return values
+
+    @staticmethod
+    def label(value: Union[float, str]) -> str:
+        """
+        Returns the band description for a parameter value or raster
+        """
+        if isinstance(value, str):
+            return os.path.splitext(os.path.basename(value))[0]
+        return '{:g}'.format(value)
+
+    @staticmethod
+    def read_field(pcr, path: str, value_scale_name: str):
+        """
+        Reads a raster as field with value_scale_name
+        """
+        if GdalLoader.is_pcraster_map(path):
+            return getattr(pcr, value_scale_name.lower())(pcr.readmap(path))
+        return GdalLoader.read_field(pcr, path, value_scale_name)
+
+    @staticmethod
+    def load_fields(ldd_path: str, material_path: str):
+        """
+        Sets the clone to the LDD and returns the LDD and material fields
+        """
+        pcr = PCRasterRuntime.module()
+        GdalLoader.set_clone(pcr, ldd_path)
+        return SweepExecution.read_field(pcr, ldd_path, 'Ldd'), SweepExecution.read_field(pcr, material_path, 'Scalar')
+
+    @staticmethod
+    def init_worker(ldd_path: str, material_path: str):
+        """
+        Reads the LDD and material in a worker process
+        """
+        SweepExecution._ldd, SweepExecution._material = SweepExecution.load_fields(ldd_path, material_path)
+
+    @staticmethod
+    def run_value(operation: str, index: int, value: Union[float, str], ldd=None, material=None):
+        """
+        Evaluates the operation for a parameter value, a number or a raster file. Returns the
+        index and the flux and state arrays, with the scalar missing value.
+        """
+        pcr = PCRasterRuntime.module()
+        ldd = ldd if ldd is not None else SweepExecution._ldd
+        material = material if material is not None else SweepExecution._material
+        parameter = SweepExecution.read_field(pcr, value, 'Scalar') if isinstance(value, str) else pcr.scalar(value)
+
+        missing_value = GdalLoader.VALUE_SCALES['Scalar'][2]
+        flux_function, state_function = SweepExecution.OPERATIONS[operation]
+        flux = getattr(pcr, flux_function)(ldd, material, parameter)
+        state = getattr(pcr, state_function)(ldd, material, parameter)
+        return index, pcr.pcr2numpy(flux, missing_value), pcr.pcr2numpy(state, missing_value)
+
+    @staticmethod
+    def create_outputs(outputs: List[str], values: List[Union[float, str]], template, crs_wkt: str = ''):
+        """
+        Creates the stacked GeoTIFF outputs with the grid of template, a band per value. The
+        bands are interleaved by band, so writing the results of a value only touches its own tiles.
+        """
+        labels = [SweepExecution.label(value) for value in values]
+        return [RasterWriter.create_stack(path, 'Scalar', template, labels, crs_wkt) for path in outputs]
+
+    @staticmethod
+    def evaluate_parallel(operation: str, values: List[Union[float, str]], *,  # pylint: disable=too-many-locals
+                          ldd_path: str, material_path: str, workers: int, feedback, write) -> int:
+        """
+        Evaluates operation for each value in a pool of workers processes, passing the results
+        to write. Returns the number of values which were evaluated.
+        """
+        total = len(values)
+        completed = 0
+        tasks = iter(enumerate(values))
+        mp_context = multiprocessing.get_context('spawn')
+        mp_context.set_executable(ParallelExecution.python_executable())
+        with ProcessPoolExecutor(max_workers=min(workers, total), mp_context=mp_context,
+                                 initializer=SweepExecution.init_worker,
+                                 initargs=(ldd_path, material_path)) as executor:
+            # keep a bounded number of values in flight, so memory use doesn't depend on their number
+            pending = {executor.submit(SweepExecution.run_value, operation, index, value)
+                       for index, value in (next(tasks, (None, None)) for _ in range(workers * 2))
+                       if index is not None}
+            while pending:
+                done, pending = wait(pending, timeout=SweepExecution.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if feedback.isCanceled():
+                    for future in pending:
+                        future.cancel()
+                    break
+
+                for future in done:
+                    write(future.result())
+                    completed += 1
+                    feedback.setProgress(100 * completed / total)
+
+                    index, value = next(tasks, (None, None))
+                    if index is not None:
+                        pending.add(executor.submit(SweepExecution.run_value, operation, index, value))
+        return completed
+
+    @staticmethod
+    def run(operation: str, values: List[Union[float, str]], *,  # pylint: disable=too-many-locals
+            ldd_path: str, material_path: str, outputs: List[str], workers: int, feedback, crs_wkt: str = '') -> int:
+        """
+        Evaluates operation for each parameter value in values, writing the flux and state
+        of value i to band i + 1 of the (flux, state) GeoTIFF outputs. With a single worker
+        the values are evaluated in the current process.
+
+        Returns the number of values which were evaluated.
+        """
+        datasets = SweepExecution.create_outputs(outputs, values, GdalLoader.open(ldd_path), crs_wkt)
+
+        def write(result):
+            index, *arrays = result
+            for ds, array in zip(datasets, arrays):
+                ds.GetRasterBand(index + 1).WriteArray(array)
+
+        completed = 0
+        if workers <= 1 or len(values) <= 1:
+            fields = SweepExecution.load_fields(ldd_path, material_path)
+            for index, value in enumerate(values):
+                if feedback.isCanceled():
+                    break
+                write(SweepExecution.run_value(operation, index, value, *fields))
+                completed += 1
+                feedback.setProgress(100 * completed / len(values))
+        else:
+            completed = SweepExecution.evaluate_parallel(operation, values, ldd_path=ldd_path,
+                                                         material_path=material_path, workers=workers,
+                                                         feedback=feedback, write=write)
+
+        for path, output in zip(outputs, datasets):
+            RasterWriter.finish(output, path, 'Scalar')
+        # close the outputs
+        output = None
+        datasets = None
+        for path in outputs:
+            RasterWriter.finalize(path, 'Scalar')
+        return completed
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+import os
+from typing import Dict, Iterator, Optional
+
+import numpy
+from osgeo import gdal
+
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+from pcraster_tools.processing.raster_writer import RasterWriter
+
+
+class Strip:
+    """
+    A block of full raster rows processed in one step of a tiled execution.
+
+    Rows read_start to read_end (exclusive) are read, including the halo rows
+    needed by window operators, and rows write_start to write_end are written.
+    """
+
+    def __init__(self, read_start: int, read_end: int, write_start: int, write_end: int):
+        self.read_start = read_start
+        self.read_end = read_end
+        self.write_start = write_start
+        self.write_end = write_end
+
+    def read_rows(self) -> int:
+        """
+        Returns the number of rows read for the strip
+        """
+        return self.read_end - self.read_start
+
+    def write_offset(self) -> int:
+        """
+        Returns the offset of the first written row within the rows read
+        """
+        return self.write_start - self.read_start
+
+    def __eq__(self, other):
+        return (self.read_start, self.read_end, self.write_start, self.write_end) == \
+            (other.read_start, other.read_end, other.write_start, other.write_end)
+
+    def __repr__(self):
+        return '<Strip: read {}-{}, write {}-{}>'.format(self.read_start, self.read_end,
+                                                         self.write_start, self.write_end)
+
+
+class TiledExecution:
+    """
+    Runs a PCRaster operation strip by strip through GDAL windows, so that only a
+    block of rows of each input and output raster is held in memory at a time.
+
+    Local (cell by cell) operators are run on each strip as is. Window operators
+    are given halo rows above and below each strip, so that windows near the strip
+    edges see the same cells as when the whole raster is processed.
+    """
+
+    # value scale name: (PCRaster value scale option, GDAL data type, missing value, numpy type)
+    # of the value scales which can be processed in strips, directional values are not
+    VALUE_SCALES = {name: value_scale for name, value_scale in GdalLoader.VALUE_SCALES.items()
+                    if name != 'Directional'}
+
+    @staticmethod
+    def strips(rows: int, strip_rows: int, halo: int = 0) -> Iterator[Strip]:
+        """
+        Splits rows into strips of at most strip_rows rows, each extended by halo rows
+        on both sides (clipped to the raster)
+        """
+        strip_rows = max(1, strip_rows)
+        for write_start in range(0, rows, strip_rows):
+            write_end = min(rows, write_start + strip_rows)
+            yield Strip(max(0, write_start - halo), min(rows, write_end + halo), write_start, write_end)
+
+    @staticmethod
+    def window_halo(window_length: float, cell_size: float, true_units: bool) -> int:
+        """
+        Returns the number of halo rows needed by a window operator
+        """
+        cells = window_length / cell_size if true_units else window_length
+        # one extra row for cells only partly covered by the window
+        return int(math.ceil(abs(cells) / 2)) + 1
+
+    @staticmethod
+    def value_scale_name(band, expected: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the PCRaster value scale name for a GDAL band, or None if the value
+        scale is not supported in tiled execution. Bands without value scale metadata
+        have the expected value scale name if given.
+        """
+        value_scale = band.GetMetadataItem('PCRASTER_VALUESCALE')
+        if value_scale:
+            for name, (option, _, _, _) in TiledExecution.VALUE_SCALES.items():
+                if option == value_scale:
+                    return name
+            return None
+
+        if expected is not None:
+            return expected if expected in TiledExecution.VALUE_SCALES else None
+        if band.DataType in (gdal.GDT_Float32, gdal.GDT_Float64):
+            return 'Scalar'
+        return 'Nominal'
+
+    @staticmethod
+    def to_pcraster_array(array, value_scale_name: str, no_data=None):
+        """
+        Converts a block read from GDAL to the type and missing value used by
+        PCRaster for value_scale_name
+        """
+        _, _, missing_value, numpy_type = TiledExecution.VALUE_SCALES[value_scale_name]
+        mask = numpy.zeros(array.shape, dtype=bool)
+        if no_data is not None:
+            mask |= array == no_data
+        if numpy.issubdtype(array.dtype, numpy.floating):
+            mask |= numpy.isnan(array)
+
+        result = array.astype(numpy_type)
+        result[mask] = missing_value
+        return result
+
+    @staticmethod
+    def open_inputs(algorithm, inputs: Dict[str, str], value_scales: Optional[Dict[str, str]] = None):
+        """
+        Opens the input raster files with GDAL, using the value_scales of input names to value
+        scale names for rasters without value scale metadata. Returns a dictionary of input names
+        to (dataset, value scale name), or None if an input can't be processed in strips.
+        """
+        value_scales = value_scales or {}
+        datasets = {}
+        rows = cols = None
+        for name, path in inputs.items():
+            ds = gdal.Open(path)
+            if ds is None:
+                return None
+
+            if rows is None:
+                rows, cols = ds.RasterYSize, ds.RasterXSize
+            elif ds.RasterYSize != rows or ds.RasterXSize != cols:
+                raise QgsProcessingException(
+                    algorithm.tr('Input raster {} does not have the same dimensions as the clone map').format(name))
+
+            value_scale_name = TiledExecution.value_scale_name(ds.GetRasterBand(1), value_scales.get(name))
+            if value_scale_name is None:
+                return None
+            datasets[name] = (ds, value_scale_name)
+
+        return datasets
+
+    @staticmethod
+    def read_strip(pcr, ds, value_scale_name: str, strip: Strip):
+        """
+        Reads the rows of a strip from a GDAL dataset as a PCRaster field. The clone
+        must be set to the strip.
+        """
+        band = ds.GetRasterBand(1)
+        array = band.ReadAsArray(0, strip.read_start, ds.RasterXSize, strip.read_rows())
+        array = TiledExecution.to_pcraster_array(array, value_scale_name, band.GetNoDataValue())
+        return pcr.numpy2pcr(getattr(pcr, value_scale_name), array, TiledExecution.VALUE_SCALES[value_scale_name][2])
+
+    @staticmethod
+    def create_output(algorithm, path: str, value_scale_name: str, template, crs_wkt: str = ''):
+        """
+        Creates an output file with value_scale_name, matching the size and location of
+        the template dataset and with the CRS crs_wkt. See RasterWriter for the formats.
+        """
+        ds = RasterWriter.create(path, value_scale_name, template.RasterXSize, template.RasterYSize,
+                                 template.GetGeoTransform(), crs_wkt=crs_wkt)
+        if ds is None:
+            raise QgsProcessingException(algorithm.tr('Could not create output file {}').format(path))
+        return ds
+
+    @staticmethod
+    def remove_outputs(paths):
+        """
+        Removes partially written output files and their GDAL sidecar files
+        """
+        for path in paths:
+            for file_name in (path, path + '.aux.xml'):
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+
+    @staticmethod
+    def run(algorithm, pcr, inputs: Dict[str, str], output_files: Dict[str, str], *,  # pylint: disable=too-many-locals
+            strip_rows: int, halo: int, parameters, context, feedback,
+            crs_wkt: str = '') -> Optional[Dict[str, str]]:
+        """
+        Runs algorithm's PCRaster operator strip by strip on the raster files in inputs, a dictionary
+        of raster input names to file paths, writing the results to output_files with the CRS crs_wkt.
+
+        Returns the dictionary of output names to file paths, or None if the inputs or results
+        can't be processed in strips and the algorithm should be run on the whole rasters instead.
+        Raises a QgsProcessingException when canceled, after removing the partial outputs.
+        """
+        datasets = TiledExecution.open_inputs(algorithm, inputs, algorithm.raster_value_scales())
+        if not datasets:
+            return None
+
+        template = next(iter(datasets.values()))[0]
+        if template.RasterYSize <= strip_rows:
+            return None
+
+        west, cell_size, _, north, _, row_height = template.GetGeoTransform()
+
+        output_datasets = {}
+        value_scale_names = {}
+        strips = list(TiledExecution.strips(template.RasterYSize, strip_rows, halo))
+        for current, strip in enumerate(strips):
+            if feedback.isCanceled():
+                paths = [output_files[name] for name in output_datasets]
+                # close the partially written outputs before removing them
+                output_datasets = None
+                TiledExecution.remove_outputs(paths)
+                raise QgsProcessingException(algorithm.tr('{} was canceled').format(algorithm.displayName()))
+
+            pcr.setclone(strip.read_rows(), template.RasterXSize, cell_size, west, north + strip.read_start * row_height)
+            rasters = {name: TiledExecution.read_strip(pcr, ds, value_scale_name, strip)
+                       for name, (ds, value_scale_name) in datasets.items()}
+
+            results = algorithm.run_operator(pcr, rasters, parameters, context, feedback)
+
+            if not output_datasets:
+                if any(field.dataType().name not in TiledExecution.VALUE_SCALES for field in results.values()):
+                    # e.g. directional results, which are written as a whole
+                    return None
+                value_scale_names = {name: field.dataType().name for name, field in results.items()}
+                output_datasets = {name: TiledExecution.create_output(algorithm, output_files[name],
+                                                                      value_scale_names[name], template, crs_wkt)
+                                   for name in results}
+
+            offset = strip.write_offset()
+            for name, field in results.items():
+                missing_value = TiledExecution.VALUE_SCALES[field.dataType().name][2]
+                array = pcr.pcr2numpy(field, missing_value)
+                output_datasets[name].GetRasterBand(1).WriteArray(
+                    array[offset:offset + strip.write_end - strip.write_start], 0, strip.write_start)
+
+            feedback.setProgress(100 * (current + 1) / len(strips))
+
+        for name, ds in output_datasets.items():
+            RasterWriter.finish(ds, output_files[name], value_scale_names[name])
+        # close the output datasets
+        ds = None
+        output_datasets = None
+        for name, value_scale_name in value_scale_names.items():
+            RasterWriter.finalize(output_files[name], value_scale_name)
+
+        return {name: output_files[name] for name in value_scale_names}
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy
+
+
+class TravelTimeSeries:
+    """
+    Routes a series of material inputs over an LDD with accutraveltimeflux or
+    accutraveltimefractionflux, keeping the material in transit in memory between
+    time steps.
+
+    As in a PCRaster dynamic model, the state of a time step is added to the material
+    input of the next one, so that a whole series is routed in one run.
+    """
+
+    # operation: (flux function, state function, removed function)
+    OPERATIONS = {
+        'accutraveltime': ('accutraveltimeflux', 'accutraveltimestate', None),
+        'accutraveltimefraction': ('accutraveltimefractionflux', 'accutraveltimefractionstate',
+                                   'accutraveltimefractionremoved'),
+    }
+
+    # names of the results of a time step
+    RESULTS = ('flux', 'state', 'removed')
+
+    def __init__(self, pcr, operation: str, ldd, velocity, *, fraction=None, initial_state=None):
+        self.pcr = pcr
+        self.functions = self.OPERATIONS[operation]
+        self.ldd = ldd
+        self.arguments = (velocity,) if fraction is None else (velocity, fraction)
+        self.state = initial_state if initial_state is not None else pcr.scalar(0)
+        self.step_number = 0
+
+    def results(self) -> List[str]:
+        """
+        Returns the names of the results of a time step
+        """
+        return [name for name, function in zip(self.RESULTS, self.functions) if function]
+
+    def step(self, material) -> Dict[str, object]:
+        """
+        Routes the material input of the next time step, together with the material still
+        in transit, and returns the resulting fields by result name
+        """
+        material = material + self.state
+        results = {name: getattr(self.pcr, function)(self.ldd, material, *self.arguments)
+                   for name, function in zip(self.RESULTS, self.functions) if function}
+        self.state = results['state']
+        self.step_number += 1
+        return results
+
+    @staticmethod
+    def report_steps(steps: int, cadence: int) -> List[int]:
+        """
+        Returns the (1-based) time steps whose results are written, every cadence steps
+        """
+        return list(range(cadence, steps + 1, max(1, cadence)))
+
+    @staticmethod
+    def sample_cells(samples) -> Tuple[List[int], numpy.ndarray]:
+        """
+        Returns the sample location ids of a nominal array, with 0 or negative values for
+        cells without sample location, and the first (row by row) flat cell of each id
+        """
+        flat = samples.ravel()
+        cells = numpy.flatnonzero(flat > 0)
+        ids, first = numpy.unique(flat[cells], return_index=True)
+        return [int(sample_id) for sample_id in ids], cells[first]
+
+    @staticmethod
+    def sample_row(step: int, array, cells, missing_value) -> List[str]:
+        """
+        Returns the time series table row of a time step with the values of array at cells,
+        empty for missing values
+        """
+        values = array.ravel()[cells]
+        return [str(step)] + ['' if value == missing_value else '{:.7g}'.format(value) for value in values]
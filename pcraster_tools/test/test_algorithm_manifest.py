@@ -0,0 +1,67 @@
+# coding=utf-8
+"""Algorithm manifest Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import unittest
+
+from pcraster_tools.processing.algorithms.manifest import ALGORITHMS
+from pcraster_tools.processing.lazy_algorithm import LazyAlgorithm
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class AlgorithmManifestTest(unittest.TestCase):
+    """Test the algorithm manifest matches the algorithm classes."""
+
+    def test_entries(self):
+        """
+        Test that manifest entries match the algorithm metadata
+        """
+        for entry in ALGORITHMS:
+            lazy = LazyAlgorithm(entry)
+            algorithm = lazy.createInstance()
+            self.assertEqual(type(algorithm).__name__, entry.class_name)
+            self.assertEqual(algorithm.name(), entry.name)
+            self.assertEqual(algorithm.displayName(), lazy.displayName())
+            self.assertEqual(algorithm.group(), lazy.group())
+            self.assertEqual(algorithm.groupId(), entry.group_id)
+
+    def test_definitions(self):
+        """
+        Test that the stand-ins expose the parameters, outputs and metadata of the algorithms
+        """
+        for entry in ALGORITHMS:
+            lazy = LazyAlgorithm(entry)
+            lazy.initAlgorithm()
+            algorithm = lazy.create()
+            self.assertEqual([definition.name() for definition in lazy.parameterDefinitions()],
+                             [definition.name() for definition in algorithm.parameterDefinitions()])
+            self.assertEqual([output.name() for output in lazy.outputDefinitions()],
+                             [output.name() for output in algorithm.outputDefinitions()])
+            self.assertEqual(lazy.helpUrl(), algorithm.helpUrl())
+            self.assertEqual(lazy.canExecute(), algorithm.canExecute())
+
+    def test_all_modules_listed(self):
+        """
+        Test that every algorithm module is in the manifest
+        """
+        folder = os.path.join(os.path.dirname(__file__), '..', 'processing', 'algorithms')
+        modules = {os.path.splitext(f)[0] for f in os.listdir(folder)
+                   if f.endswith('.py') and f not in ('__init__.py', 'manifest.py')}
+        self.assertEqual(modules, {entry.module for entry in ALGORITHMS})
+        self.assertEqual(len({entry.name for entry in ALGORITHMS}), len(ALGORITHMS))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(AlgorithmManifestTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Batch execution Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import pickle
+import tempfile
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingFeedback
+)
+
+from pcraster_tools.processing.batch import (
+    BatchExecution,
+    BatchResult
+)
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class BatchExecutionTest(unittest.TestCase):
+    """Test BatchExecution work."""
+
+    def test_read_table(self):
+        """
+        Test reading input sets from a CSV file
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'batch.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('INPUT, OUTPUT\n/data/a.map,/out/a.map\n/data/b.map,\n')
+
+            self.assertEqual(BatchExecution.read_table(path),
+                             [{'INPUT': '/data/a.map', 'OUTPUT': '/out/a.map'},
+                              {'INPUT': '/data/b.map'}])
+
+    def test_algorithm_entry(self):
+        """
+        Test finding algorithms by id
+        """
+        self.assertEqual(BatchExecution.algorithm_entry('pcraster:slope').name, 'slope')
+        self.assertEqual(BatchExecution.algorithm_entry('slope').name, 'slope')
+        with self.assertRaises(QgsProcessingException):
+            BatchExecution.algorithm_entry('pcraster:unknown')
+
+        algorithm = BatchExecution.create_algorithm('slope')
+        BatchExecution.check_parameters(algorithm, [{'INPUT': 'a.map'}])
+        with self.assertRaises(QgsProcessingException):
+            BatchExecution.check_parameters(algorithm, [{'DEM': 'a.map'}])
+
+    def test_failed_item(self):
+        """
+        Test that a failing input set is reported without raising
+        """
+        results = BatchExecution.run('slope', [{'INPUT': '/does/not/exist.map'}], 1, QgsProcessingFeedback())
+        self.assertEqual(len(results), 1)
+        self.assertFalse(results[0].ok)
+        self.assertTrue(results[0].error)
+
+    def test_future_result(self):
+        """
+        Test that errors of worker processes give failed results, except for a dead pool
+        """
+        future = Future()
+        future.set_result(BatchResult(3, True, {}, '', 1.0))
+        self.assertTrue(BatchExecution.future_result(future, 3, 0).ok)
+
+        future = Future()
+        future.set_exception(pickle.PicklingError('cannot pickle result'))
+        result = BatchExecution.future_result(future, 3, 0)
+        self.assertEqual((result.index, result.ok, result.error), (3, False, 'cannot pickle result'))
+
+        future = Future()
+        future.set_exception(BrokenProcessPool())
+        with self.assertRaises(BrokenProcessPool):
+            BatchExecution.future_result(future, 3, 0)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(BatchExecutionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
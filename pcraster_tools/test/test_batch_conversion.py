@@ -0,0 +1,92 @@
+# coding=utf-8
+"""Batch conversion Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from osgeo import gdal
+from qgis.core import QgsProcessingFeedback
+
+from pcraster_tools.processing.batch_conversion import (
+    BatchConversion,
+    CloneGrid,
+    ConversionTask
+)
+
+
+class BatchConversionTest(unittest.TestCase):
+    """Test BatchConversion work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_raster(self, name, array, geo_transform):
+        """
+        Creates a GeoTIFF in the temporary folder
+        """
+        path = os.path.join(self.temp_dir, name)
+        ds = gdal.GetDriverByName('GTiff').Create(path, array.shape[1], array.shape[0], 1, gdal.GDT_Float32)
+        ds.SetGeoTransform(geo_transform)
+        ds.GetRasterBand(1).WriteArray(array)
+        return path
+
+    def test_files(self):
+        """
+        Test listing inputs and naming outputs
+        """
+        for name in ('b.tif', 'a.TIF', 'a.tif.aux.xml', 'c.asc'):
+            with open(os.path.join(self.temp_dir, name), 'w', encoding='utf-8'):
+                pass
+        self.assertEqual(BatchConversion.folder_rasters(self.temp_dir, '*.tif'),
+                         [os.path.join(self.temp_dir, 'a.TIF'), os.path.join(self.temp_dir, 'b.tif')])
+
+        self.assertEqual(BatchConversion.output_files(['/x/dem.tif', '/y/dem.tif', '/x/DEM.asc'], '/out'),
+                         [os.path.join('/out', 'dem.map'), os.path.join('/out', 'dem_1.map'),
+                          os.path.join('/out', 'DEM_2.map')])
+
+    def test_convert(self):
+        """
+        Test converting and aligning rasters
+        """
+        source = self.create_raster('source.tif', numpy.arange(16, dtype=numpy.float32).reshape(4, 4),
+                                    (0, 10, 0, 40, 0, -10))
+        clone = self.create_raster('clone.tif', numpy.zeros((3, 2), dtype=numpy.float32),
+                                   (10, 10, 0, 40, 0, -10))
+        grid = BatchConversion.clone_grid(clone)
+        self.assertEqual(grid, CloneGrid(2, 3, (10, 10, 0, 40, 0, -10), ''))
+
+        tasks = [ConversionTask(0, source, os.path.join(self.temp_dir, 'source.map'), value_scale_name='Nominal',
+                                grid=None, cache_size=0, threads='1'),
+                 ConversionTask(1, source, os.path.join(self.temp_dir, 'aligned.map'), value_scale_name='Nominal',
+                                grid=grid, cache_size=0, threads='1'),
+                 ConversionTask(2, os.path.join(self.temp_dir, 'missing.tif'), os.path.join(self.temp_dir, 'x.map'),
+                                value_scale_name='Nominal', grid=None, cache_size=0, threads='1')]
+        results = BatchConversion.run(tasks, 1, QgsProcessingFeedback())
+        self.assertEqual([index for index, error in results if error], [2])
+
+        ds = gdal.Open(os.path.join(self.temp_dir, 'source.map'))
+        self.assertEqual(ds.GetRasterBand(1).GetMetadataItem('PCRASTER_VALUESCALE'), 'VS_NOMINAL')
+        self.assertEqual((ds.RasterXSize, ds.RasterYSize), (4, 4))
+
+        ds = gdal.Open(os.path.join(self.temp_dir, 'aligned.map'))
+        self.assertEqual(ds.GetGeoTransform(), (10, 10, 0, 40, 0, -10))
+        numpy.testing.assert_array_equal(ds.GetRasterBand(1).ReadAsArray(), [[1, 2], [5, 6], [9, 10]])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(BatchConversionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
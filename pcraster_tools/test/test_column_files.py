@@ -0,0 +1,112 @@
+# coding=utf-8
+"""Column files Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from osgeo import gdal
+
+from pcraster_tools.processing.column_files import (
+    CellAggregator,
+    ColumnFiles
+)
+
+
+class ColumnFilesTest(unittest.TestCase):
+    """Test ColumnFiles work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_raster(self, name: str, array, data_type, no_data) -> str:
+        """
+        Creates a GeoTIFF raster with 10 map unit cells at (100, 200) and returns its path
+        """
+        path = os.path.join(self.temp_dir, name)
+        ds = gdal.GetDriverByName('GTiff').Create(path, array.shape[1], array.shape[0], 1, data_type)
+        ds.SetGeoTransform((100, 10, 0, 200, 0, -10))
+        band = ds.GetRasterBand(1)
+        band.SetNoDataValue(no_data)
+        band.WriteArray(array)
+        ds = None
+        return path
+
+    def test_map_to_columns(self):
+        """
+        Test writing rasters to a column file
+        """
+        scalar = self.create_raster('scalar.tif', numpy.array([[1.5, -9999], [-9999, 4]]), gdal.GDT_Float32, -9999)
+        nominal = self.create_raster('nominal.tif', numpy.array([[1, 2], [-1, -1]]), gdal.GDT_Int32, -1)
+
+        output = os.path.join(self.temp_dir, 'out.csv')
+        self.assertEqual(ColumnFiles.map_to_columns([scalar, nominal], output), 3)
+        with open(output, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ['105,195,1.5,1',
+                                                     '115,195,1e+31,2',
+                                                     '115,185,4,1e+31'])
+
+    def test_columns_to_cells(self):
+        """
+        Test gridding a column file
+        """
+        path = os.path.join(self.temp_dir, 'points.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('105,195,1\n106 196 3\n\n115,185,2\n115,195,1e31\n500,500,7\n')
+
+        values = ColumnFiles.columns_to_cells(path, CellAggregator.AVERAGE, (100, 10, 0, 200, 0, -10), 2, 2)
+        self.assertEqual(values.tolist(), [[2, ColumnFiles.MISSING_VALUE], [ColumnFiles.MISSING_VALUE, 2]])
+
+    def test_aggregation(self):
+        """
+        Test aggregating values in cells
+        """
+        cells = numpy.array([0, 0, 0, 2, 2, 1])
+        values = numpy.array([1.0, 3.0, 3.0, 5.0, 4.0, 2.0])
+
+        def aggregate(method):
+            aggregator = CellAggregator(method, 4)
+            # add in two blocks, to check values are combined
+            aggregator.add(cells[:2], values[:2])
+            aggregator.add(cells[2:], values[2:])
+            return aggregator.result(-1).tolist()
+
+        self.assertEqual(aggregate(CellAggregator.AVERAGE), [7 / 3, 2, 4.5, -1])
+        self.assertEqual(aggregate(CellAggregator.HIGHEST), [3, 2, 5, -1])
+        self.assertEqual(aggregate(CellAggregator.LOWEST), [1, 2, 4, -1])
+        # ties are resolved to the highest value
+        self.assertEqual(aggregate(CellAggregator.MAJORITY), [3, 2, 5, -1])
+
+        # many blocks, whose pairs are merged at different times
+        generator = numpy.random.default_rng(1)
+        cells = generator.integers(0, 4, 100)
+        values = generator.integers(0, 3, 100).astype(numpy.float64)
+        whole = CellAggregator(CellAggregator.MAJORITY, 4)
+        whole.add(cells, values)
+        blocks = CellAggregator(CellAggregator.MAJORITY, 4)
+        for start in range(0, 100, 7):
+            blocks.add(cells[start:start + 7], values[start:start + 7])
+        self.assertEqual(blocks.result(-1).tolist(), whole.result(-1).tolist())
+
+        cells, inside = CellAggregator.cell_indices(numpy.array([105, 125, 95, 115]), numpy.array([185, 195, 195, 195]),
+                                                    (100, 10, 0, 200, 0, -10), 2, 2)
+        self.assertEqual(cells.tolist(), [2, 1])
+        self.assertEqual(inside.tolist(), [True, False, False, True])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ColumnFilesTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,72 @@
+# coding=utf-8
+"""Command runner Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import sys
+import unittest
+
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingFeedback
+)
+
+from pcraster_tools.processing.command_runner import CommandRunner
+
+
+class CommandRunnerTest(unittest.TestCase):
+    """Test CommandRunner work."""
+
+    def test_run(self):
+        """
+        Test running commands
+        """
+        output = CommandRunner.run([sys.executable, '-c', 'print("line 1"); print("line 2")'], QgsProcessingFeedback())
+        self.assertEqual(output, ['line 1', 'line 2'])
+
+    def test_output_tail(self):
+        """
+        Test that only the last output lines are kept, and reported when the command fails
+        """
+        script = 'import sys\nfor i in range(1000): print("line", i)\nsys.exit(1)'
+        with self.assertRaises(QgsProcessingException) as context:
+            CommandRunner.run([sys.executable, '-c', script], QgsProcessingFeedback())
+        self.assertIn('line 999', str(context.exception))
+        self.assertNotIn('line 1\n', str(context.exception))
+
+        output = CommandRunner.run([sys.executable, '-c', 'for i in range(1000): print("line", i)'],
+                                   QgsProcessingFeedback())
+        self.assertEqual(len(output), CommandRunner.TAIL_LINES)
+        self.assertEqual(output[-1], 'line 999')
+
+    def test_errors(self):
+        """
+        Test failing, missing and slow commands
+        """
+        feedback = QgsProcessingFeedback()
+        with self.assertRaises(QgsProcessingException):
+            CommandRunner.run([sys.executable, '-c', 'import sys; sys.exit(3)'], feedback)
+        with self.assertRaises(QgsProcessingException):
+            CommandRunner.run(['pcraster_tools_missing_command'], feedback)
+        with self.assertRaises(QgsProcessingException):
+            CommandRunner.run([sys.executable, '-c', 'import time; time.sleep(30)'], feedback, timeout=0.5)
+
+    def test_cancel(self):
+        """
+        Test canceling commands
+        """
+        feedback = QgsProcessingFeedback()
+        feedback.cancel()
+        with self.assertRaises(QgsProcessingException):
+            CommandRunner.run([sys.executable, '-c', 'import time; time.sleep(30)'], feedback)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CommandRunnerTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
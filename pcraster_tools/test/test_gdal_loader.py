@@ -0,0 +1,112 @@
+# coding=utf-8
+"""GDAL loader Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+import pcraster as pcr
+from osgeo import gdal
+
+from pcraster_tools.processing.gdal_loader import GdalLoader
+
+
+class GdalLoaderTest(unittest.TestCase):
+    """Test GdalLoader work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_raster(self, name: str, array, data_type, no_data, value_scale: str = '') -> str:
+        """
+        Creates a GeoTIFF raster with 10 map unit cells at (100, 200) and returns its path.
+        value_scale optionally sets the PCRaster value scale metadata.
+        """
+        path = os.path.join(self.temp_dir, name)
+        ds = gdal.GetDriverByName('GTiff').Create(path, array.shape[1], array.shape[0], 1, data_type)
+        ds.SetGeoTransform((100, 10, 0, 200, 0, -10))
+        band = ds.GetRasterBand(1)
+        band.SetNoDataValue(no_data)
+        if value_scale:
+            band.SetMetadataItem('PCRASTER_VALUESCALE', value_scale)
+        band.WriteArray(array)
+        ds = None
+        return path
+
+    def test_read_field(self):
+        """
+        Test reading GeoTIFF rasters as PCRaster fields
+        """
+        scalar = self.create_raster('scalar.tif', numpy.array([[1.5, -9999, 3], [4, 5, 6]]), gdal.GDT_Float32, -9999)
+        nominal = self.create_raster('nominal.tif', numpy.array([[1, 2, -1], [3, 4, 5]]), gdal.GDT_Int32, -1)
+
+        GdalLoader.set_clone(pcr, scalar)
+        clone = pcr.clone()
+        self.assertEqual((clone.nrRows(), clone.nrCols()), (2, 3))
+        self.assertEqual((clone.west(), clone.north(), clone.cellSize()), (100, 200, 10))
+
+        field = GdalLoader.read_field(pcr, scalar)
+        self.assertEqual(field.dataType(), pcr.VALUESCALE.Scalar)
+        self.assertEqual(pcr.pcr2numpy(field, -1).tolist(), [[1.5, -1, 3], [4, 5, 6]])
+
+        field = GdalLoader.read_field(pcr, nominal)
+        self.assertEqual(field.dataType(), pcr.VALUESCALE.Nominal)
+        self.assertEqual(pcr.pcr2numpy(field, 0).tolist(), [[1, 2, 0], [3, 4, 5]])
+
+        field = GdalLoader.read_field(pcr, nominal, 'Ordinal')
+        self.assertEqual(field.dataType(), pcr.VALUESCALE.Ordinal)
+
+    def test_read_field_expected(self):
+        """
+        Test reading rasters without value scale metadata with the value scale an operator expects
+        """
+        ldd = self.create_raster('ldd.tif', numpy.array([[2, 5, 255], [8, 5, 4]]), gdal.GDT_Byte, 255)
+        scalar = self.create_raster('scalar.tif', numpy.array([[1, 2, 3], [4, 5, 6]]), gdal.GDT_Float32, -9999,
+                                    'VS_SCALAR')
+        GdalLoader.set_clone(pcr, ldd)
+
+        self.assertEqual(GdalLoader.read_field(pcr, ldd).dataType(), pcr.VALUESCALE.Nominal)
+        field = GdalLoader.read_field(pcr, ldd, expected='Ldd')
+        self.assertEqual(field.dataType(), pcr.VALUESCALE.Ldd)
+        self.assertEqual(pcr.pcr2numpy(field, 0).tolist(), [[2, 5, 0], [8, 5, 4]])
+
+        # metadata takes precedence over the expected value scale
+        self.assertEqual(GdalLoader.read_field(pcr, scalar, expected='Ldd').dataType(), pcr.VALUESCALE.Scalar)
+
+    def test_to_pcraster_map(self):
+        """
+        Test converting rasters for PCRaster applications
+        """
+        scalar = self.create_raster('scalar.tif', numpy.array([[1.5, 2]]), gdal.GDT_Float32, -9999)
+        converted = GdalLoader.to_pcraster_map(scalar, self.temp_dir)
+        self.assertEqual(converted, os.path.join(self.temp_dir, 'scalar.map'))
+        self.assertEqual(gdal.Open(converted).GetRasterBand(1).GetMetadataItem('PCRASTER_VALUESCALE'), 'VS_SCALAR')
+        self.assertEqual(GdalLoader.to_pcraster_map(converted, self.temp_dir), converted)
+
+        # value scales which the PCRaster driver can't derive from the data type
+        for name, array, data_type, no_data, value_scale in (
+                ('ldd.tif', numpy.array([[2, 5]]), gdal.GDT_Byte, 255, 'VS_LDD'),
+                ('ordinal.tif', numpy.array([[1, 3]]), gdal.GDT_Int32, -1, 'VS_ORDINAL')):
+            converted = GdalLoader.to_pcraster_map(
+                self.create_raster(name, array, data_type, no_data, value_scale), self.temp_dir)
+            band = gdal.Open(converted).GetRasterBand(1)
+            self.assertEqual(band.GetMetadataItem('PCRASTER_VALUESCALE'), value_scale)
+            self.assertEqual(band.ReadAsArray().tolist(), array.tolist())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(GdalLoaderTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
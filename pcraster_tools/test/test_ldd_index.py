@@ -0,0 +1,169 @@
+# coding=utf-8
+"""LDD index Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.ldd_index import LddIndex
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+
+# all cells drain to the pit in the middle of the bottom row
+LDD = numpy.array([[3, 2, 1],
+                   [3, 2, 1],
+                   [6, 5, 4]], dtype=numpy.uint8)
+
+
+class LddIndexTest(unittest.TestCase):
+    """Test LddIndex work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        LddIndex.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        LddIndex.clear()
+
+    def test_build(self):
+        """
+        Test building the flow graph
+        """
+        index = LddIndex.build(LDD)
+        self.assertEqual(index.shape, (3, 3))
+        numpy.testing.assert_array_equal(index.downstream, [4, 4, 4, 7, 7, 7, 7, -1, 7])
+        self.assertEqual([sorted(cells.tolist()) for cells in index.levels()], [[0, 1, 2, 3, 5, 6, 8], [4], [7]])
+        segments, upstream = index.upstream_of(numpy.array([4, 7]))
+        self.assertEqual(sorted(zip(segments.tolist(), upstream.tolist())),
+                         [(0, 0), (0, 1), (0, 2), (1, 3), (1, 4), (1, 5), (1, 6), (1, 8)])
+
+        with self.assertRaises(QgsProcessingException):
+            LddIndex.build(numpy.array([[6, 4]], dtype=numpy.uint8))
+        with self.assertRaises(QgsProcessingException):
+            LddIndex.build(numpy.array([[4, 5]], dtype=numpy.uint8))
+        with self.assertRaises(QgsProcessingException):
+            LddIndex.build(numpy.array([[6, 0]], dtype=numpy.uint8))
+
+    def test_operators(self):
+        """
+        Test the network operators
+        """
+        index = LddIndex.build(LDD)
+        values = numpy.arange(9, dtype=numpy.float64).reshape(3, 3)
+
+        numpy.testing.assert_array_equal(index.accuflux(numpy.ones((3, 3))), [[1, 1, 1], [1, 4, 1], [1, 9, 1]])
+        material = numpy.ones((3, 3))
+        material[0, 1] = numpy.nan
+        numpy.testing.assert_array_equal(index.accuflux(material),
+                                         [[1, numpy.nan, 1], [1, numpy.nan, 1], [1, numpy.nan, 1]])
+
+        numpy.testing.assert_array_equal(index.downstream_values(values), [[4, 4, 4], [7, 7, 7], [7, 7, 7]])
+        numpy.testing.assert_array_equal(index.upstream_sum(values), [[0, 0, 0], [0, 3, 0], [0, 26, 0]])
+        numpy.testing.assert_array_equal(index.streamorder(), [[1, 1, 1], [1, 2, 1], [1, 2, 1]])
+
+        ldd = LDD.copy()
+        ldd[0, 0] = 0
+        numpy.testing.assert_array_equal(LddIndex.build(ldd).accuflux(numpy.ones((3, 3))),
+                                         [[numpy.nan, 1, 1], [1, 3, 1], [1, 8, 1]])
+
+    def test_for_file(self):
+        """
+        Test reusing indices of LDD files
+        """
+        path = os.path.join(self.temp_dir, 'ldd.map')
+        with open(path, 'wb') as f:
+            f.write(b'ldd')
+        folder = os.path.join(self.temp_dir, 'index')
+        builds = []
+
+        def ldd_array():
+            builds.append(path)
+            return LDD
+
+        index = LddIndex.for_file(path, ldd_array, folder)
+        self.assertIs(LddIndex.for_file(path, ldd_array, folder), index)
+        LddIndex.clear()
+        loaded = LddIndex.for_file(path, ldd_array, folder)
+        numpy.testing.assert_array_equal(loaded.order, index.order)
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(os.listdir(folder), [os.path.basename(LddIndex.index_file(folder, path))])
+
+        with open(path, 'wb') as f:
+            f.write(b'changed ldd')
+        LddIndex.for_file(path, ldd_array, folder)
+        self.assertEqual(len(builds), 2)
+
+    def test_efficient(self):
+        """
+        Test that LDDs with long flow paths are left to PCRaster
+        """
+        # a single flow path, one cell per level
+        path_ldd = numpy.full((1, 2000), 6, dtype=numpy.uint8)
+        path_ldd[0, -1] = 5
+        self.assertEqual(LddIndex.build(path_ldd).cells_per_level(), 1)
+        self.assertFalse(LddIndex.build(path_ldd).efficient())
+
+        # parallel flow paths of two cells
+        parallel_ldd = numpy.full((2, 2000), 5, dtype=numpy.uint8)
+        parallel_ldd[0] = 2
+        self.assertEqual(LddIndex.build(parallel_ldd).cells_per_level(), 2000)
+        self.assertTrue(LddIndex.build(parallel_ldd).efficient())
+
+    def test_prune(self):
+        """
+        Test removing the least recently used indices from the index folder
+        """
+        for number in range(3):
+            with open(os.path.join(self.temp_dir, 'ldd_{}.npz'.format(number)), 'wb') as f:
+                f.write(b'x' * 100)
+            os.utime(f.name, (1000 + number, 1000 + number))
+        with open(os.path.join(self.temp_dir, 'other.txt'), 'wb') as f:
+            f.write(b'x' * 1000)
+
+        LddIndex.prune(self.temp_dir, 250)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['ldd_1.npz', 'ldd_2.npz', 'other.txt'])
+        LddIndex.prune(self.temp_dir, 0)
+        self.assertEqual(os.listdir(self.temp_dir), ['other.txt'])
+
+    def test_matches_pcraster(self):
+        """
+        Test that the network operators match PCRaster
+        """
+        pcr = PCRasterRuntime.module()
+        if pcr is None:
+            self.skipTest('PCRaster is not available')
+
+        dem_path = os.path.join(os.path.dirname(__file__), 'testdata', 'dem.map')
+        pcr.setclone(dem_path)
+        dem = pcr.readmap(dem_path)
+        ldd = pcr.lddcreate(dem, 1e31, 1e31, 1e31, 1e31)
+        index = LddIndex.build(pcr.pcr2numpy(ldd, 0))
+        values = LddIndex.field_array(pcr, dem)
+
+        def assert_matches(array, *fields):
+            expected = numpy.stack([LddIndex.field_array(pcr, field) for field in fields])
+            numpy.testing.assert_allclose(array, expected.reshape(array.shape), rtol=1e-5)
+
+        material = pcr.spatial(pcr.scalar(1))
+        assert_matches(index.accuflux(numpy.stack([LddIndex.field_array(pcr, material), values])),
+                       pcr.accuflux(ldd, material), pcr.accuflux(ldd, dem))
+        assert_matches(index.downstream_values(values), pcr.downstream(ldd, dem))
+        assert_matches(index.upstream_sum(values), pcr.upstream(ldd, dem))
+        assert_matches(index.streamorder(), pcr.streamorder(ldd))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(LddIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,177 @@
+# coding=utf-8
+"""Tiled LDD creation Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from osgeo import gdal
+from qgis.core import QgsProcessingFeedback
+
+from pcraster_tools.processing.ldd_index import LddIndex
+from pcraster_tools.processing.ldd_tiling import TiledLddCreation
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+
+
+class TiledLddCreationTest(unittest.TestCase):
+    """Test TiledLddCreation work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_flood(self):
+        """
+        Test filling a depression relative to outlets and seeds
+        """
+        dem = numpy.array([[5, 5, 5, 5],
+                           [5, 1, 2, 5],
+                           [5, 3, 3, 5],
+                           [5, 5, 5, 5]], dtype=numpy.float64)
+        outlet = TiledLddCreation.outlets(~numpy.isnan(dem))
+        self.assertEqual(numpy.count_nonzero(outlet), 12)
+        self.assertFalse(outlet[1:3, 1:3].any())
+
+        fill, labels = TiledLddCreation.flood(dem, outlet, numpy.zeros(dem.shape, dtype=bool))
+        numpy.testing.assert_array_equal(fill, numpy.full(dem.shape, 5))
+        numpy.testing.assert_array_equal(labels, numpy.zeros(dem.shape))
+
+        # a seed in the last row, draining to another strip, makes its own basin
+        dem[3, 2] = 0
+        outlet[3, 2] = False
+        seeds = numpy.zeros(dem.shape, dtype=bool)
+        seeds[3, 2] = True
+        fill, labels = TiledLddCreation.flood(dem, outlet, seeds)
+        numpy.testing.assert_array_equal(fill[1:3, 1:3], [[3, 3], [3, 3]])
+        numpy.testing.assert_array_equal(labels[1:3, 1:3], [[1, 1], [1, 1]])
+
+        lower, higher, elevation = TiledLddCreation.spill_edges(fill, labels)
+        self.assertEqual((lower.tolist(), higher.tolist(), elevation.tolist()), ([0], [1], [5.0]))
+        numpy.testing.assert_array_equal(TiledLddCreation.spill_elevations(2, lower, higher, elevation),
+                                         [-numpy.inf, 5])
+
+    def test_directions(self):
+        """
+        Test draining flat areas to their outlet
+        """
+        filled = numpy.full((3, 5), 3.0)
+        filled[1] = 2
+        filled[1, 4] = 1
+        outlet = numpy.zeros(filled.shape, dtype=bool)
+        outlet[1, 4] = True
+        distances = TiledLddCreation.flat_distances(filled, outlet, numpy.ones(filled.shape, dtype=bool),
+                                                    numpy.full(filled.shape, numpy.inf))
+        numpy.testing.assert_array_equal(distances[1], [3, 2, 1, 0, 0])
+
+        ldd = TiledLddCreation.directions(filled, outlet, distances)
+        numpy.testing.assert_array_equal(ldd[1], [6, 6, 6, 6, 5])
+        LddIndex.build(ldd)
+
+    def test_strip_rows(self):
+        """
+        Test the default strip size is bounded by the number of cells
+        """
+        self.assertEqual(TiledLddCreation.strip_rows(1000, 100, 1, 7), 7)
+        self.assertEqual(TiledLddCreation.strip_rows(1000, 100, 1), 250)
+        self.assertEqual(TiledLddCreation.strip_rows(100000, 100000, 4), TiledLddCreation.STRIP_CELLS // 100000)
+        self.assertEqual(TiledLddCreation.strip_rows(10, 10 ** 8, 1), 1)
+
+    def write_dem(self, dem):
+        """
+        Writes dem to a GeoTIFF file
+        """
+        path = os.path.join(self.temp_dir, 'dem.tif')
+        ds = gdal.GetDriverByName('GTiff').Create(path, dem.shape[1], dem.shape[0], 1, gdal.GDT_Float32)
+        ds.SetGeoTransform((100, 10, 0, 200, 0, -10))
+        ds.GetRasterBand(1).SetNoDataValue(-9999)
+        ds.GetRasterBand(1).WriteArray(numpy.where(numpy.isnan(dem), -9999, dem))
+        ds = None
+        return path
+
+    def test_strips(self):
+        """
+        Test the results do not depend on the strip size
+        """
+        generator = numpy.random.default_rng(3)
+        # rounded values for flat areas
+        dem = numpy.round(generator.random((23, 17)) * 6)
+        dem[generator.random(dem.shape) < 0.05] = numpy.nan
+        dem_path = self.write_dem(dem)
+
+        results = []
+        for strip_rows in (100, 1, 4):
+            ldd_file = os.path.join(self.temp_dir, 'ldd_{}.tif'.format(strip_rows))
+            filled_file = os.path.join(self.temp_dir, 'filled_{}.tif'.format(strip_rows))
+            self.assertTrue(TiledLddCreation.run(dem_path, ldd_file=ldd_file, filled_file=filled_file,
+                                                 strip_rows=strip_rows, workers=1,
+                                                 feedback=QgsProcessingFeedback()))
+            results.append((gdal.Open(ldd_file).ReadAsArray(), gdal.Open(filled_file).ReadAsArray()))
+
+        ldd, filled = results[0]
+        valid = ~numpy.isnan(dem)
+        self.assertTrue((filled[valid] >= dem[valid]).all())
+        numpy.testing.assert_array_equal(ldd == 255, ~valid)
+        LddIndex.build(ldd)
+        for other_ldd, other_filled in results[1:]:
+            numpy.testing.assert_array_equal(other_ldd, ldd)
+            numpy.testing.assert_array_equal(other_filled, filled)
+
+    def test_differs_from_pcraster(self):  # pylint: disable=too-many-locals
+        """
+        Test where the strip-wise method matches PCRaster: the filled DEM matches lddcreatedem,
+        but the LDD only matches lddcreate for cells with a single steepest downslope neighbour
+        """
+        pcr = PCRasterRuntime.module()
+        if pcr is None:
+            self.skipTest('PCRaster is not available')
+
+        generator = numpy.random.default_rng(5)
+        # pits, flat areas and missing values
+        dem = numpy.round(generator.random((30, 25)) * 20) / 2
+        dem[10:14, 5:12] = 1
+        dem[generator.random(dem.shape) < 0.03] = numpy.nan
+        dem_path = self.write_dem(dem)
+        ldd_file = os.path.join(self.temp_dir, 'ldd.tif')
+        filled_file = os.path.join(self.temp_dir, 'filled.tif')
+        self.assertTrue(TiledLddCreation.run(dem_path, ldd_file=ldd_file, filled_file=filled_file, strip_rows=7,
+                                             workers=1, feedback=QgsProcessingFeedback()))
+        ldd = gdal.Open(ldd_file).ReadAsArray()
+        filled = gdal.Open(filled_file).ReadAsArray().astype(numpy.float64)
+
+        pcr.setclone(dem.shape[0], dem.shape[1], 10, 100, 200)
+        for option in ('lddout', 'lddfill', 'unittrue'):
+            pcr.setglobaloption(option)
+        pcr_dem = pcr.numpy2pcr(pcr.Scalar, numpy.where(numpy.isnan(dem), -9999, dem), -9999)
+        expected_filled = pcr.pcr2numpy(pcr.lddcreatedem(pcr_dem, 1e31, 1e31, 1e31, 1e31), numpy.nan)
+        expected_ldd = pcr.pcr2numpy(pcr.lddcreate(pcr_dem, 1e31, 1e31, 1e31, 1e31), 255)
+
+        valid = ~numpy.isnan(dem)
+        numpy.testing.assert_allclose(filled[valid], expected_filled[valid])
+
+        filled[~valid] = numpy.nan
+        drops = numpy.stack([(filled - TiledLddCreation.shifted(filled, row_offset, col_offset, numpy.nan))
+                             / numpy.hypot(row_offset, col_offset)
+                             for _, row_offset, col_offset in TiledLddCreation.NEIGHBOURS])
+        drops[numpy.isnan(drops)] = 0
+        steepest = drops.max(axis=0)
+        single = valid & (steepest > 0) & (numpy.count_nonzero(drops == steepest, axis=0) == 1)
+        self.assertTrue(single.any())
+        numpy.testing.assert_array_equal(ldd[single], expected_ldd[single])
+        numpy.testing.assert_array_equal(ldd == 255, ~valid)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TiledLddCreationTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
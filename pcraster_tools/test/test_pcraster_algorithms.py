@@ -84,6 +84,27 @@ class TestPCRasterAlgorithms(unittest.TestCase, AlgorithmsTestBase.AlgorithmsTes
         self.assertIn('<SRS', aux_content)
         self.assertIn('GDA94 / Vicgrid', aux_content)
 
+    def test_assign_crs_existing_aux(self):
+        """
+        Test assigning crs to output layers which already have an .aux.xml file
+        """
+        tmpdir = tempfile.mkdtemp()
+        self.cleanup_paths.append(tmpdir)
+
+        for file_name in ('dem.map', 'dem.map.aux.xml'):
+            shutil.copy(os.path.join(os.path.dirname(__file__), 'testdata', file_name), tmpdir)
+        filepath = os.path.join(tmpdir, 'dem.map')
+
+        self.assertTrue(PCRasterAlgorithm.set_output_crs_wkt(filepath, 'EPSG:3111', None, None))
+        with open(os.path.join(tmpdir, 'dem.map.aux.xml'), 'rt', encoding='utf8') as f:
+            aux_content = f.read()
+
+        self.assertIn('GDA94 / Vicgrid', aux_content)
+        self.assertIn('STATISTICS_MEAN', aux_content)
+
+        # the parsed CRS is reused
+        self.assertIs(PCRasterAlgorithm.parse_crs('EPSG:3111'), PCRasterAlgorithm.parse_crs('EPSG:3111'))
+
 
 if __name__ == '__main__':
     nose2.main()
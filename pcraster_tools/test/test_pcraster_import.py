@@ -13,6 +13,8 @@ __copyright__ = 'Copyright 2021, North Road Consulting'
 
 import unittest
 
+from pcraster_tools.processing.pcraster_runtime import PCRasterRuntime
+
 
 class PCRasterTest(unittest.TestCase):
     """Test the PCRaster Environment"""
@@ -23,6 +25,18 @@ class PCRasterTest(unittest.TestCase):
         """
         import pcraster  # pylint: disable=import-outside-toplevel,unused-import
 
+    def test_runtime(self):
+        """
+        Test that the runtime imports pcraster once
+        """
+        PCRasterRuntime.reset()
+        self.assertTrue(PCRasterRuntime.is_available())
+        self.assertIsNone(PCRasterRuntime.error())
+
+        import pcraster  # pylint: disable=import-outside-toplevel
+        self.assertIs(PCRasterRuntime.module(), pcraster)
+        self.assertIs(PCRasterRuntime.module(), PCRasterRuntime.module())
+
 
 if __name__ == '__main__':
     unittest.main()
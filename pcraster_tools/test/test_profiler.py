@@ -0,0 +1,83 @@
+# coding=utf-8
+"""Profiler Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from pcraster_tools.processing.profiler import Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    """Test Profiler work."""
+
+    def test_phases(self):
+        """
+        Test timing phases
+        """
+        profiler = Profiler('pcraster:slope')
+        with profiler.phase('read'):
+            sum(range(10000))
+        with profiler.phase('report'):
+            pass
+        with profiler.phase('report'):
+            pass
+
+        self.assertEqual([phase.name for phase in profiler.phases], ['read', 'report'])
+        self.assertEqual(profiler.phases[1].calls, 2)
+        self.assertGreaterEqual(profiler.phases[0].wall, 0)
+        self.assertGreaterEqual(profiler.total().wall, profiler.phases[0].wall)
+
+    def test_memory(self):
+        """
+        Test sampling the resident memory of phases
+        """
+        profiler = Profiler('pcraster:slope')
+        if profiler.current_rss() is None:
+            self.skipTest('resident memory is not known on this platform')
+
+        with profiler.phase('operator'):
+            data = bytearray(64 * 1024 * 1024)
+            data[::4096] = b'x' * len(data[::4096])
+        del data
+        with profiler.phase('report'):
+            pass
+
+        operator, report = profiler.phases[0], profiler.phases[1]
+        self.assertGreaterEqual(operator.rss_increase, 32 * 1024 * 1024)
+        self.assertLess(report.rss_increase, 32 * 1024 * 1024)
+        self.assertGreaterEqual(profiler.total().peak_rss, operator.peak_rss)
+
+    def test_write_log(self):
+        """
+        Test appending runs to a JSON lines log
+        """
+        profiler = Profiler('pcraster:slope')
+        with profiler.phase('operator'):
+            pass
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'profile.jsonl')
+            profiler.write_log(path)
+            profiler.write_log(path, 'failed')
+            with open(path, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]['algorithm'], 'pcraster:slope')
+        self.assertEqual(records[0]['phases'][0]['phase'], 'operator')
+        self.assertEqual(records[1]['status'], 'failed')
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ProfilerTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,144 @@
+# coding=utf-8
+"""Raster registry Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pcraster_tools.processing.raster_registry import RasterRegistry
+
+
+class RasterRegistryTest(unittest.TestCase):
+    """Test RasterRegistry work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name: str, content: bytes = b'abc') -> str:
+        """
+        Writes a file in the temporary directory and returns its path
+        """
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_register(self):
+        """
+        Test registering and retrieving fields
+        """
+        registry = RasterRegistry()
+        field = object()
+        path = self.write_file('out.map')
+
+        self.assertIsNone(registry.field(path))
+        self.assertFalse(registry.register(os.path.join(self.temp_dir, 'missing.map'), field))
+        self.assertTrue(registry.register(path, field))
+        self.assertIs(registry.field(path), field)
+        self.assertEqual(len(registry), 1)
+
+        registry.remove(path)
+        self.assertIsNone(registry.field(path))
+
+    def test_clone(self):
+        """
+        Test that fields cached with another clone geometry are not returned
+        """
+        registry = RasterRegistry()
+        field = object()
+        path = self.write_file('out.map')
+
+        registry.register(path, field, clone=(2, 3, 10.0, 100.0, 200.0))
+        self.assertIs(registry.field(path, (2, 3, 10.0, 100.0, 200.0)), field)
+        self.assertIsNone(registry.field(path, (2, 3, 5.0, 100.0, 200.0)))
+        self.assertIsNone(registry.field(path, (2, 3, 10.0, 0.0, 200.0)))
+        self.assertIsNone(registry.field(path))
+
+        registry.register(path, field, clone=(4, 6, 5.0, 100.0, 200.0))
+        self.assertIsNone(registry.field(path, (2, 3, 10.0, 100.0, 200.0)))
+        self.assertIs(registry.field(path, (4, 6, 5.0, 100.0, 200.0)), field)
+        self.assertEqual(len(registry), 1)
+
+    def test_invalidated_on_change(self):
+        """
+        Test that fields are discarded when the file changes
+        """
+        registry = RasterRegistry()
+        path = self.write_file('out.map')
+        registry.register(path, object())
+
+        self.write_file('out.map', b'abcdef')
+        self.assertIsNone(registry.field(path))
+        self.assertEqual(len(registry), 0)
+
+        registry.register(path, object())
+        os.remove(path)
+        self.assertIsNone(registry.field(path))
+
+    def test_refresh(self):
+        """
+        Test refreshing the signature of a registered file
+        """
+        registry = RasterRegistry()
+        field = object()
+        path = self.write_file('out.map')
+        registry.register(path, field)
+
+        self.write_file('out.map', b'abcdef')
+        registry.refresh(path)
+        self.assertIs(registry.field(path), field)
+
+    def test_max_size(self):
+        """
+        Test that the least recently used fields are dropped
+        """
+        registry = RasterRegistry(max_size=30)
+        paths = [self.write_file('out{}.map'.format(i)) for i in range(4)]
+        for path in paths[:3]:
+            self.assertTrue(registry.register(path, object(), 10))
+        self.assertEqual(registry.size(), 30)
+
+        # touch the first field, so the second one is evicted
+        self.assertIsNotNone(registry.field(paths[0]))
+        registry.register(paths[3], object(), 10)
+        self.assertEqual(len(registry), 3)
+        self.assertEqual(registry.size(), 30)
+        self.assertIsNotNone(registry.field(paths[0]))
+        self.assertIsNone(registry.field(paths[1]))
+
+        # fields larger than the cache are not kept
+        self.assertFalse(registry.register(paths[1], object(), 31))
+        self.assertIsNone(registry.field(paths[1]))
+
+        registry.set_max_size(10)
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.size(), 10)
+
+        registry.set_max_size(0)
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(registry.size(), 0)
+        self.assertFalse(registry.register(paths[0], object(), 1))
+
+        registry.set_max_size(30)
+        registry.register(paths[0], object())
+        self.assertEqual(registry.size(), 3)
+        registry.clear()
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(registry.size(), 0)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RasterRegistryTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,101 @@
+# coding=utf-8
+"""Raster writer Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from osgeo import gdal
+from qgis.core import QgsProcessingFeedback
+
+from pcraster_tools.processing.raster_writer import RasterWriter
+
+
+class RasterWriterTest(unittest.TestCase):
+    """Test RasterWriter work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_options(self):
+        """
+        Test GeoTIFF options
+        """
+        self.assertTrue(RasterWriter.is_geotiff('/data/out.TIF'))
+        self.assertFalse(RasterWriter.is_geotiff('/data/out.map'))
+
+        self.assertEqual(RasterWriter.overview_levels(200, 100), [])
+        self.assertEqual(RasterWriter.overview_levels(1000, 600), [2])
+        self.assertEqual(RasterWriter.overview_levels(600, 2100), [2, 4, 8])
+
+        self.assertIn('PREDICTOR=3', RasterWriter.creation_options('Scalar', 'DEFLATE'))
+        self.assertIn('PREDICTOR=2', RasterWriter.creation_options('Nominal', 'LZW'))
+        self.assertFalse([option for option in RasterWriter.creation_options('Ldd', 'NONE')
+                          if option.startswith('PREDICTOR')])
+        self.assertNotIn('INTERLEAVE=BAND', RasterWriter.creation_options('Scalar', 'DEFLATE'))
+        self.assertIn('INTERLEAVE=BAND', RasterWriter.creation_options('Scalar', 'DEFLATE', 12))
+
+        self.assertEqual(RasterWriter.resampling('Scalar'), 'AVERAGE')
+        self.assertEqual(RasterWriter.resampling('Nominal'), 'NEAREST')
+
+    def test_create(self):
+        """
+        Test creating GeoTIFF outputs
+        """
+        path = os.path.join(self.temp_dir, 'out.tif')
+        ds = RasterWriter.create(path, 'Nominal', 600, 300, (100, 10, 0, 200, 0, -10))
+        ds.GetRasterBand(1).WriteArray(numpy.ones((300, 600), dtype=numpy.int32))
+        RasterWriter.finish(ds, path, 'Nominal')
+        ds = None
+        RasterWriter.finalize(path, 'Nominal')
+
+        ds = gdal.Open(path)
+        band = ds.GetRasterBand(1)
+        self.assertEqual(band.DataType, gdal.GDT_Int32)
+        self.assertEqual(band.GetMetadataItem('PCRASTER_VALUESCALE'), 'VS_NOMINAL')
+        self.assertEqual(band.GetNoDataValue(), -2147483648)
+        self.assertEqual(band.GetBlockSize(), [512, 512])
+        self.assertEqual(ds.GetGeoTransform(), (100, 10, 0, 200, 0, -10))
+
+    def test_copy_raster(self):
+        """
+        Test converting rasters block by block
+        """
+        source = os.path.join(self.temp_dir, 'source.tif')
+        ds = gdal.GetDriverByName('GTiff').Create(source, 3, 2, 1, gdal.GDT_Float32)
+        ds.SetGeoTransform((100, 10, 0, 200, 0, -10))
+        ds.GetRasterBand(1).SetNoDataValue(-9999)
+        ds.GetRasterBand(1).WriteArray(numpy.array([[1.4, 1.6, -9999], [2, numpy.nan, 3]], dtype=numpy.float32))
+        ds = None
+
+        path = os.path.join(self.temp_dir, 'nominal.tif')
+        self.assertTrue(RasterWriter.copy_raster(source, path, value_scale_name='Nominal',
+                                                 feedback=QgsProcessingFeedback()))
+        band = gdal.Open(path).GetRasterBand(1)
+        self.assertEqual(band.GetMetadataItem('PCRASTER_VALUESCALE'), 'VS_NOMINAL')
+        numpy.testing.assert_array_equal(band.ReadAsArray(),
+                                         [[1, 2, -2147483648], [2, -2147483648, 3]])
+
+        feedback = QgsProcessingFeedback()
+        feedback.cancel()
+        path = os.path.join(self.temp_dir, 'canceled.tif')
+        self.assertFalse(RasterWriter.copy_raster(source, path, feedback=feedback))
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RasterWriterTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
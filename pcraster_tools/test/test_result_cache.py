@@ -0,0 +1,124 @@
+# coding=utf-8
+"""Result cache Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pcraster_tools.processing.result_cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+    """Test ResultCache work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name: str, content: bytes = b'abc') -> str:
+        """
+        Writes a file in the temporary directory and returns its path
+        """
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    @staticmethod
+    def read_file(path: str) -> bytes:
+        """
+        Returns the content of a file
+        """
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_file_hash(self):
+        """
+        Test hashing input files
+        """
+        cache = ResultCache()
+        path = self.write_file('in.map')
+        self.assertIsNone(cache.file_hash(os.path.join(self.temp_dir, 'missing.map')))
+
+        file_hash = cache.file_hash(path)
+        self.assertEqual(file_hash, cache.file_hash(self.write_file('copy.map')))
+        self.assertNotEqual(file_hash, cache.file_hash(self.write_file('in.map', b'abcdef')))
+
+    def test_key(self):
+        """
+        Test building cache keys
+        """
+        key = ResultCache.key('pcraster:slope', {'INPUT': ['a']}, {'UNITS': '0'}, ['unittrue'])
+        self.assertEqual(key, ResultCache.key('pcraster:slope', {'INPUT': ['a']}, {'UNITS': '0'}, ['unittrue']))
+        self.assertNotEqual(key, ResultCache.key('pcraster:slope', {'INPUT': ['b']}, {'UNITS': '0'}, ['unittrue']))
+        self.assertNotEqual(key, ResultCache.key('pcraster:slope', {'INPUT': ['a']}, {'UNITS': '1'}, ['unittrue']))
+        self.assertNotEqual(key, ResultCache.key('pcraster:slope', {'INPUT': ['a']}, {'UNITS': '0'}, ['unitcell']))
+        self.assertNotEqual(key, ResultCache.key('pcraster:aspect', {'INPUT': ['a']}, {'UNITS': '0'}, ['unittrue']))
+
+        key = ResultCache.key('pcraster:slope', {}, {}, [], output_formats={'OUTPUT': '.tif'},
+                              writer_settings={'compression': 'DEFLATE'})
+        self.assertNotEqual(key, ResultCache.key('pcraster:slope', {}, {}, [], output_formats={'OUTPUT': '.map'},
+                                                 writer_settings={'compression': 'DEFLATE'}))
+        self.assertNotEqual(key, ResultCache.key('pcraster:slope', {}, {}, [], output_formats={'OUTPUT': '.tif'},
+                                                 writer_settings={'compression': 'LZW'}))
+
+    def test_store_fetch(self):
+        """
+        Test storing and fetching outputs
+        """
+        cache = ResultCache()
+        key = ResultCache.key('pcraster:slope', {}, {}, [])
+        output = self.write_file('out.map', b'result')
+        self.write_file('out.map.aux.xml', b'crs')
+
+        destination = os.path.join(self.temp_dir, 'dest.map')
+        self.assertFalse(cache.fetch(self.cache_dir, key, {'OUTPUT': destination}))
+
+        self.assertTrue(cache.store(self.cache_dir, key, {'OUTPUT': output}))
+        self.assertFalse(cache.fetch(self.cache_dir, key, {'OTHER': destination}))
+        self.assertFalse(cache.fetch(self.cache_dir, key, {'OUTPUT': os.path.join(self.temp_dir, 'dest.tif')}))
+        self.assertTrue(cache.fetch(self.cache_dir, key, {'OUTPUT': destination}))
+        self.assertEqual(self.read_file(destination), b'result')
+        self.assertEqual(self.read_file(destination + '.aux.xml'), b'crs')
+
+        ResultCache.clear(self.cache_dir)
+        self.assertFalse(cache.fetch(self.cache_dir, key, {'OUTPUT': destination}))
+
+
+    def test_max_size(self):
+        """
+        Test removing the least recently used entries
+        """
+        cache = ResultCache()
+        output = self.write_file('out.map', b'x' * 100)
+        keys = [ResultCache.key('pcraster:slope', {}, {'UNITS': str(index)}, []) for index in range(3)]
+        for index, key in enumerate(keys[:2]):
+            self.assertTrue(cache.store(self.cache_dir, key, {'OUTPUT': output}))
+            manifest = os.path.join(ResultCache.entry_folder(self.cache_dir, key), ResultCache.MANIFEST)
+            os.utime(manifest, (1000 + index, 1000 + index))
+
+        # fetching the oldest entry makes it the most recently used
+        destination = os.path.join(self.temp_dir, 'dest.map')
+        self.assertTrue(cache.fetch(self.cache_dir, keys[0], {'OUTPUT': destination}))
+
+        entry_size = ResultCache.entry_size(ResultCache.entry_folder(self.cache_dir, keys[0]))
+        self.assertTrue(cache.store(self.cache_dir, keys[2], {'OUTPUT': output}, max_size=2 * entry_size))
+        self.assertTrue(cache.fetch(self.cache_dir, keys[0], {'OUTPUT': destination}))
+        self.assertFalse(cache.fetch(self.cache_dir, keys[1], {'OUTPUT': destination}))
+        self.assertTrue(cache.fetch(self.cache_dir, keys[2], {'OUTPUT': destination}))
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ResultCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,67 @@
+# coding=utf-8
+"""Parameter sweep Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from osgeo import gdal
+from qgis.core import QgsProcessingException
+
+from pcraster_tools.processing.sweep import SweepExecution
+
+
+class SweepExecutionTest(unittest.TestCase):
+    """Test SweepExecution work."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_values(self):
+        """
+        Test parsing parameter values
+        """
+        self.assertEqual(SweepExecution.parse_values(' 0.1, 0.5;2 1e3 '), [0.1, 0.5, 2, 1000])
+        self.assertEqual(SweepExecution.parse_values(''), [])
+        with self.assertRaises(QgsProcessingException):
+            SweepExecution.parse_values('0.1, high')
+
+        self.assertEqual(SweepExecution.label(0.25), '0.25')
+        self.assertEqual(SweepExecution.label('/data/capacity_wet.map'), 'capacity_wet')
+
+    def test_create_outputs(self):
+        """
+        Test creating stacked outputs
+        """
+        template = gdal.GetDriverByName('MEM').Create('', 4, 3, 1, gdal.GDT_Byte)
+        template.SetGeoTransform((100, 10, 0, 200, 0, -10))
+        path = os.path.join(self.temp_dir, 'flux.tif')
+        datasets = SweepExecution.create_outputs([path], [0.5, '/data/capacity.map'], template)
+        self.assertEqual(datasets[0].RasterCount, 2)
+        datasets = None
+
+        ds = gdal.Open(path)
+        self.assertEqual([ds.GetRasterBand(band).GetDescription() for band in (1, 2)], ['0.5', 'capacity'])
+        self.assertEqual(ds.GetRasterBand(2).GetMetadataItem('PCRASTER_VALUESCALE'), 'VS_SCALAR')
+        # bands are written one value at a time, so each band has tiles of its own
+        self.assertEqual(ds.GetMetadataItem('INTERLEAVE', 'IMAGE_STRUCTURE'), 'BAND')
+
+        with self.assertRaises(QgsProcessingException):
+            SweepExecution.create_outputs([os.path.join(self.temp_dir, 'flux.map')], [0.5], template)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SweepExecutionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,91 @@
+# coding=utf-8
+"""Tiled execution Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from pcraster_tools.processing.parallel import ParallelExecution
+from pcraster_tools.processing.tiling import (
+    Strip,
+    TiledExecution
+)
+
+
+class TiledExecutionTest(unittest.TestCase):
+    """Test TiledExecution work."""
+
+    def test_strips(self):
+        """
+        Test splitting rows into strips
+        """
+        self.assertEqual(list(TiledExecution.strips(10, 4)),
+                         [Strip(0, 4, 0, 4), Strip(4, 8, 4, 8), Strip(8, 10, 8, 10)])
+        self.assertEqual(list(TiledExecution.strips(10, 4, 2)),
+                         [Strip(0, 6, 0, 4), Strip(2, 10, 4, 8), Strip(6, 10, 8, 10)])
+        self.assertEqual(list(TiledExecution.strips(3, 10, 2)), [Strip(0, 3, 0, 3)])
+
+        strip = Strip(2, 10, 4, 8)
+        self.assertEqual(strip.read_rows(), 8)
+        self.assertEqual(strip.write_offset(), 2)
+
+    def test_window_halo(self):
+        """
+        Test the halo needed by window operators
+        """
+        self.assertEqual(TiledExecution.window_halo(100, 25, True), 3)
+        self.assertEqual(TiledExecution.window_halo(3, 25, False), 3)
+        self.assertEqual(TiledExecution.window_halo(25, 25, True), 2)
+
+    def test_parallel_strip_rows(self):
+        """
+        Test the strip size used by parallel execution
+        """
+        self.assertEqual(ParallelExecution.strip_rows(1000, 4, 2), 63)
+        self.assertEqual(ParallelExecution.strip_rows(1000, 4, 2, 100), 100)
+        self.assertEqual(ParallelExecution.strip_rows(1000, 64, 10), 40)
+        self.assertEqual(ParallelExecution.strip_rows(10, 64, 0), 1)
+
+    def test_to_pcraster_array(self):
+        """
+        Test converting GDAL blocks to PCRaster arrays
+        """
+        array = TiledExecution.to_pcraster_array(numpy.array([[1.5, numpy.nan, -9999]]), 'Scalar', -9999)
+        self.assertEqual(array.dtype, numpy.float32)
+        self.assertEqual(array[0, 0], 1.5)
+        self.assertEqual(array[0, 1], numpy.float32(TiledExecution.VALUE_SCALES['Scalar'][2]))
+        self.assertEqual(array[0, 2], numpy.float32(TiledExecution.VALUE_SCALES['Scalar'][2]))
+
+        array = TiledExecution.to_pcraster_array(numpy.array([[1, 0, 255]], dtype=numpy.uint8), 'Boolean')
+        self.assertEqual(array.tolist(), [[1, 0, 255]])
+
+        array = TiledExecution.to_pcraster_array(numpy.array([[5, -1]], dtype=numpy.int16), 'Nominal', -1)
+        self.assertEqual(array.tolist(), [[5, -2147483648]])
+
+
+    def test_remove_outputs(self):
+        """
+        Test removing partial outputs and their sidecar files
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'out.tif')
+            for path in (output, output + '.aux.xml'):
+                with open(path, 'wb') as f:
+                    f.write(b'partial')
+
+            TiledExecution.remove_outputs([output, os.path.join(folder, 'missing.tif')])
+            self.assertEqual(os.listdir(folder), [])
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TiledExecutionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,66 @@
+# coding=utf-8
+"""Time series Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import types
+import unittest
+
+import numpy
+
+from pcraster_tools.processing.time_series import TravelTimeSeries
+
+
+class TravelTimeSeriesTest(unittest.TestCase):
+    """Test TravelTimeSeries work."""
+
+    def test_report_steps(self):
+        """
+        Test the time steps written at a cadence
+        """
+        self.assertEqual(TravelTimeSeries.report_steps(5, 1), [1, 2, 3, 4, 5])
+        self.assertEqual(TravelTimeSeries.report_steps(10, 4), [4, 8])
+        self.assertEqual(TravelTimeSeries.report_steps(3, 4), [])
+
+    def test_samples(self):
+        """
+        Test time series table rows of sample locations
+        """
+        samples = numpy.array([[0, 3, 3],
+                               [1, 0, -1],
+                               [0, 1, 0]])
+        ids, cells = TravelTimeSeries.sample_cells(samples)
+        self.assertEqual(ids, [1, 3])
+        self.assertEqual(list(cells), [3, 1])
+
+        array = numpy.arange(9, dtype=numpy.float32).reshape((3, 3)) / 4
+        array[1, 0] = -3.4e38
+        self.assertEqual(TravelTimeSeries.sample_row(2, array, cells, numpy.float32(-3.4e38)), ['2', '', '0.25'])
+
+    def test_state(self):
+        """
+        Test the state is added to the material of the next time step
+        """
+        # material in transit is half of the input, the other half flows out
+        pcr = types.SimpleNamespace(scalar=float,
+                                    accutraveltimeflux=lambda ldd, material, velocity: material / 2,
+                                    accutraveltimestate=lambda ldd, material, velocity: material / 2)
+        series = TravelTimeSeries(pcr, 'accutraveltime', None, 1.0)
+        self.assertEqual(series.results(), ['flux', 'state'])
+        self.assertEqual(series.step(4.0), {'flux': 2.0, 'state': 2.0})
+        self.assertEqual(series.step(2.0), {'flux': 2.0, 'state': 2.0})
+        self.assertEqual(series.step_number, 2)
+
+        series = TravelTimeSeries(pcr, 'accutraveltimefraction', None, 1.0, fraction=0.1, initial_state=6.0)
+        self.assertEqual(series.results(), ['flux', 'state', 'removed'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TravelTimeSeriesTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)